@@ -0,0 +1,39 @@
+"""document parse status
+
+Revision ID: 9d4f2a6c8e13
+Revises: 5b1e7c9d3a40
+Create Date: 2026-10-18 11:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f2a6c8e13'
+down_revision: Union[str, Sequence[str], None] = '5b1e7c9d3a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('parse_status', sa.String(), nullable=True))
+    op.add_column('documents', sa.Column('parse_error', sa.Text(), nullable=True))
+    op.add_column('documents', sa.Column('parse_started_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_documents_parse_status'), 'documents', ['parse_status'], unique=False)
+    # CVs parsed before the queue existed
+    op.execute(
+        "UPDATE documents SET parse_status = 'parsed' "
+        "WHERE id IN (SELECT document_id FROM parsed_profiles)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_documents_parse_status'), table_name='documents')
+    op.drop_column('documents', 'parse_started_at')
+    op.drop_column('documents', 'parse_error')
+    op.drop_column('documents', 'parse_status')
@@ -0,0 +1,41 @@
+"""crawl frontier table
+
+Revision ID: b8e4d2a1c7f6
+Revises: a7c3e1f05b92
+Create Date: 2026-10-18 18:41:27.530918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4d2a1c7f6'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e1f05b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('crawl_frontier',
+    sa.Column('board', sa.String(), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.Column('next_due_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_fetched_at', sa.DateTime(), nullable=True),
+    sa.Column('last_status', sa.Integer(), nullable=True),
+    sa.Column('failures', sa.Integer(), nullable=False),
+    sa.Column('discovered_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('board', 'url')
+    )
+    op.create_index('ix_crawl_frontier_board_due', 'crawl_frontier', ['board', 'next_due_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_crawl_frontier_board_due', table_name='crawl_frontier')
+    op.drop_table('crawl_frontier')
@@ -0,0 +1,44 @@
+"""job near duplicates
+
+Revision ID: c4f7a9e2b315
+Revises: b8e4d2a1c7f6
+Create Date: 2026-10-18 19:02:51.114207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f7a9e2b315'
+down_revision: Union[str, Sequence[str], None] = 'b8e4d2a1c7f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('minhash', sa.LargeBinary(), nullable=True))
+    op.add_column('jobs', sa.Column('canonical_job_id', sa.UUID(), nullable=True))
+    op.create_index(op.f('ix_jobs_canonical_job_id'), 'jobs', ['canonical_job_id'], unique=False)
+    op.create_foreign_key('fk_jobs_canonical_job_id', 'jobs', 'jobs', ['canonical_job_id'], ['id'], ondelete='SET NULL')
+    op.create_table('job_lsh_bands',
+    sa.Column('bucket', sa.BigInteger(), nullable=False),
+    sa.Column('job_id', sa.UUID(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('bucket', 'job_id')
+    )
+    op.create_index(op.f('ix_job_lsh_bands_job_id'), 'job_lsh_bands', ['job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_job_lsh_bands_job_id'), table_name='job_lsh_bands')
+    op.drop_table('job_lsh_bands')
+    op.drop_constraint('fk_jobs_canonical_job_id', 'jobs', type_='foreignkey')
+    op.drop_index(op.f('ix_jobs_canonical_job_id'), table_name='jobs')
+    op.drop_column('jobs', 'canonical_job_id')
+    op.drop_column('jobs', 'minhash')
@@ -0,0 +1,40 @@
+"""scrape leases table
+
+Revision ID: d2b6e8f41a07
+Revises: c4f7a9e2b315
+Create Date: 2026-10-18 21:12:44.108362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b6e8f41a07'
+down_revision: Union[str, Sequence[str], None] = 'c4f7a9e2b315'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scrape_leases',
+    sa.Column('board', sa.String(), nullable=False),
+    sa.Column('owner', sa.String(), nullable=True),
+    sa.Column('leased_until', sa.DateTime(), nullable=True),
+    sa.Column('next_due_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_started_at', sa.DateTime(), nullable=True),
+    sa.Column('last_finished_at', sa.DateTime(), nullable=True),
+    sa.Column('failures', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('board')
+    )
+    op.create_index('ix_scrape_leases_due', 'scrape_leases', ['next_due_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_scrape_leases_due', table_name='scrape_leases')
+    op.drop_table('scrape_leases')
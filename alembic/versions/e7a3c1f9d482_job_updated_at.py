@@ -0,0 +1,30 @@
+"""job updated_at
+
+Revision ID: e7a3c1f9d482
+Revises: d2b6e8f41a07
+Create Date: 2026-10-18 23:41:07.552190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c1f9d482'
+down_revision: Union[str, Sequence[str], None] = 'd2b6e8f41a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False))
+    op.create_index(op.f('ix_jobs_updated_at'), 'jobs', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_jobs_updated_at'), table_name='jobs')
+    op.drop_column('jobs', 'updated_at')
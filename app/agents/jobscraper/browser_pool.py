@@ -0,0 +1,86 @@
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """
+    Bounded, thread-safe pool of WebDriver instances
+
+    A driver is checked out by one worker at a time, so no two threads ever
+    share a browser. Drivers are created lazily by factory (up to size at
+    once), reused across pages, and quit and replaced once they have served
+    max_pages pages or raised, which keeps long-running Chrome processes
+    from accumulating memory.
+
+    Usage:
+        with pool.browser() as driver:
+            driver.get(url)
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 2, max_pages: int = 50):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: List[list] = []  # [driver, pages served]
+        self._closed = False
+
+    @contextmanager
+    def browser(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Check out a driver for one page (blocks while all are in use)"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No browser available")
+        try:
+            entry = self._checkout()
+            try:
+                yield entry[0]
+            except BaseException:
+                # State unknown (crashed tab, hung renderer...): never reuse it
+                self._quit(entry[0])
+                raise
+            entry[1] += 1
+            self._checkin(entry)
+        finally:
+            self._slots.release()
+
+    def _checkout(self) -> list:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed")
+            if self._idle:
+                return self._idle.pop()
+        driver = self.factory()
+        if driver is None:
+            raise RuntimeError("Could not start a browser")
+        return [driver, 0]
+
+    def _checkin(self, entry: list) -> None:
+        if entry[1] >= self.max_pages:
+            logger.info(f"♻️ Recycling browser after {entry[1]} pages")
+            self._quit(entry[0])
+            return
+        with self._lock:
+            if not self._closed:
+                self._idle.append(entry)
+                return
+        self._quit(entry[0])
+
+    @staticmethod
+    def _quit(driver: Any) -> None:
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Browser quit failed: {e}")
+
+    def close(self) -> None:
+        """Quit idle drivers; drivers still checked out are quit on return"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver, _ in idle:
+            self._quit(driver)
@@ -0,0 +1,52 @@
+from functools import lru_cache
+from typing import List, Optional, Union
+import lxml.html
+from lxml import etree
+from cssselect import HTMLTranslator
+
+# lxml parsers keep per-thread state, so module-level instances are safe
+# to use from the to_thread() workers that analyse pages
+_BYTES_PARSER = lxml.html.HTMLParser(remove_comments=True)
+_TEXT_PARSER = lxml.html.HTMLParser(remove_comments=True, encoding="utf-8")
+_TRANSLATOR = HTMLTranslator()
+
+# select() on the document includes <html> itself (like soup.select);
+# select_one() on an element only looks below it (like tag.select_one)
+DOCUMENT_SCOPE = "descendant-or-self::"
+ELEMENT_SCOPE = "descendant::"
+
+
+def parse_html(content: Union[bytes, str]) -> Optional[lxml.html.HtmlElement]:
+    """Parse a page with lxml, dropping scripts, styles and comments; None if there is no document"""
+    if isinstance(content, str):
+        content, parser = content.encode("utf-8"), _TEXT_PARSER
+    else:
+        parser = _BYTES_PARSER
+    try:
+        root = lxml.html.document_fromstring(content, parser=parser)
+    except (etree.ParserError, ValueError):
+        return None
+    etree.strip_elements(root, "script", "style", with_tail=False)
+    return root
+
+
+@lru_cache(maxsize=None)
+def compile_selector(css: str, scope: str = DOCUMENT_SCOPE) -> etree.XPath:
+    """CSS selector -> compiled XPath, translated once per process"""
+    return etree.XPath(_TRANSLATOR.css_to_xpath(css, prefix=scope))
+
+
+def select(root, css: str) -> List[lxml.html.HtmlElement]:
+    """All elements matching css, in document order"""
+    return compile_selector(css)(root)
+
+
+def select_one(element, css: str) -> Optional[lxml.html.HtmlElement]:
+    """First descendant of element matching css"""
+    matches = compile_selector(css, ELEMENT_SCOPE)(element)
+    return matches[0] if matches else None
+
+
+def text_of(element) -> str:
+    """Element text with each piece stripped, as BeautifulSoup's get_text(strip=True)"""
+    return "".join(piece.strip() for piece in element.itertext())
@@ -0,0 +1,177 @@
+import asyncio
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+import httpx
+from .politeness import PolitenessScheduler, RETRYABLE_STATUSES
+from .page_archive import PageArchive
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: Optional[int] = None
+    content: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def not_modified(self) -> bool:
+        """304 to a conditional request: content is empty, reuse the cached copy"""
+        return self.error is None and self.status == 304
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and (200 <= self.status < 300 or self.status == 304)
+
+
+class RateLimiter:
+    """Global request rate cap shared by every task of an engine"""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AsyncFetchEngine:
+    """
+    Shared asyncio HTTP client for the scrapers
+
+    One httpx.AsyncClient (HTTP/2 when h2 is installed, pooled keep-alive
+    connections) serves every site. Concurrency is bounded per domain so one
+    board is never hammered, a PolitenessScheduler paces each domain
+    (token bucket, robots.txt, Retry-After, backoff) and a global rate
+    limiter caps requests per second across all domains.
+
+    Usage:
+        async with AsyncFetchEngine(headers=...) as engine:
+            pages = await engine.fetch_many(urls)
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, proxy: Optional[str] = None,
+                 http2: bool = True, max_connections: int = 100, per_domain: int = 4,
+                 rate_per_second: float = 20.0, timeout: float = 20.0, verify: bool = False,
+                 retries: int = 2, scheduler: Optional[PolitenessScheduler] = None,
+                 archive: Optional[PageArchive] = None):
+        self.headers = headers or {}
+        self.proxy = proxy
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.max_connections = max_connections
+        self.per_domain = per_domain
+        self.timeout = timeout
+        self.verify = verify
+        self.retries = retries
+        self.rate_limiter = RateLimiter(rate_per_second)
+        self.scheduler = scheduler or PolitenessScheduler()
+        self.archive = archive
+        self._domain_slots: Dict[str, asyncio.Semaphore] = {}
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "AsyncFetchEngine":
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            headers=self.headers,
+            proxy=self.proxy,
+            verify=self.verify,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+        self.scheduler.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.scheduler.stop()
+        await self.client.aclose()
+        self.client = None
+
+    def domain_slots(self, url: str) -> asyncio.Semaphore:
+        domain = urlparse(url).netloc.lower()
+        slots = self._domain_slots.get(domain)
+        if slots is None:
+            slots = self._domain_slots[domain] = asyncio.Semaphore(self.per_domain)
+        return slots
+
+    async def fetch(self, url: str, retries: Optional[int] = None, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """
+        GET a URL when the scheduler says it is due, retrying transient failures
+
+        Never raises for HTTP or network errors; check FetchResult.ok.
+        A 304 answer to conditional headers counts as ok (see not_modified).
+        """
+        retries = self.retries if retries is None else retries
+        result = FetchResult(url)
+
+        await self.scheduler.load_robots(self.client, url)
+        if not self.scheduler.allowed(url):
+            return FetchResult(url, error="Disallowed by robots.txt")
+
+        for attempt in range(retries):
+            # Waits in the scheduler's queue; a backed-off domain does not block others
+            await self.scheduler.acquire(url)
+            async with self.domain_slots(url):
+                await self.rate_limiter.acquire()
+                started = time.monotonic()
+                try:
+                    response = await self.client.get(url, headers=headers)
+                    result = FetchResult(
+                        url=url,
+                        status=response.status_code,
+                        content=response.content,
+                        headers=dict(response.headers),
+                        elapsed=time.monotonic() - started,
+                    )
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                    self.scheduler.report(url, result.status)
+                    if self.archive is not None and response.status_code != 304:
+                        await self._archive(result)
+                    return result
+                except httpx.HTTPStatusError as e:
+                    result.error = f"HTTP {e.response.status_code}"
+                except httpx.HTTPError as e:
+                    result = FetchResult(url=url, error=f"{type(e).__name__}: {e}", elapsed=time.monotonic() - started)
+
+            # Pushes the domain's next slot out (Retry-After or jittered backoff)
+            self.scheduler.report(url, result.status, result.headers)
+            logger.warning(f"Attempt {attempt + 1} failed for {url}: {result.error}")
+            if result.status is not None and result.status not in RETRYABLE_STATUSES:
+                break  # e.g. 404: retrying will not help
+
+        return result
+
+    async def _archive(self, result: FetchResult) -> None:
+        try:
+            await asyncio.to_thread(self.archive.append, result.url, result.status, result.content)
+        except Exception as e:
+            # Losing a capture must never fail the fetch
+            logger.warning(f"Could not archive {result.url}: {e}")
+
+    async def fetch_many(self, urls: Iterable[str]) -> List[FetchResult]:
+        """Fetch URLs concurrently (within the domain and rate limits), in input order"""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from uuid import uuid4
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def body_hash(content: bytes) -> str:
+    return hashlib.sha256(content or b"").hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    body_hash: Optional[str] = None
+    analysis: Any = None  # whatever the caller derived from the body
+    version: str = ""
+    fetched_at: float = field(default_factory=time.time)
+
+
+class HttpCache:
+    """
+    On-disk conditional-request cache for scraped pages, keyed by URL
+
+    Each entry keeps the page's ETag / Last-Modified validators, a SHA-256
+    of the body and the analysis derived from it. The next fetch sends
+    If-None-Match / If-Modified-Since; on 304, or on a 200 whose body hash
+    is unchanged, the stored analysis is reused instead of re-parsing.
+    Entries written under a different version (i.e. by older analysis
+    code) are ignored.
+    """
+
+    def __init__(self, directory: str, version: str = "1"):
+        self.directory = directory
+        self.version = version
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entry = CacheEntry(**data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+        if entry.url != url or entry.version != self.version:
+            return None
+        return entry
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Validators to send with the next request for url"""
+        entry = self.get(url)
+        headers = {}
+        if entry is None or entry.analysis is None:
+            return headers  # a 304 would leave nothing to reuse
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def put(self, entry: CacheEntry) -> None:
+        entry.version = self.version
+        path = self._path(entry.url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid4().hex}.part"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(asdict(entry), f)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not cache {entry.url}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
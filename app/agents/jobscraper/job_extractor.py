@@ -0,0 +1,136 @@
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import parse_qs, urljoin, urlparse
+from .dom import select, select_one
+
+# "3 days ago", "Posted 1 week ago", "an hour ago"; "30+ days ago" is matched but open-ended
+RELATIVE_DATE = re.compile(r"\b(\d+|an?|one)(\+?)\s*(minute|hour|day|week|month)s?\s+ago\b", re.IGNORECASE)
+UNIT_DELTAS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+}
+
+# Query parameters boards put a job's id in (viewjob?jk=..., job?id=...)
+ID_PARAMS = ("jk", "jobid", "job_id", "jobId", "jid", "vjk", "id", "postingid", "vacancyid", "vacancy_id", "adid", "ad_id")
+
+# Fields copied as text from the siteconfig selectors; "link" becomes url
+TEXT_FIELDS = ("title", "company", "location", "salary", "job_type", "description")
+
+
+def clean_text(element) -> Optional[str]:
+    """Element text with whitespace collapsed, None if empty"""
+    if element is None:
+        return None
+    return " ".join(" ".join(element.itertext()).split()) or None
+
+
+def parse_posted_at(element, now: Optional[datetime] = None) -> Optional[str]:
+    """
+    When a job was posted, from a <time datetime> tag or "... ago" text
+
+    Returns:
+        Naive UTC ISO timestamp (kept as a string so extracted pages can be
+        cached as JSON), or None when the listing does not say
+    """
+    now = now or datetime.utcnow()
+    time_tag = select_one(element, "time[datetime]")
+    if time_tag is not None:
+        try:
+            posted = datetime.fromisoformat(time_tag.get("datetime").strip().replace("Z", "+00:00"))
+            if posted.tzinfo is not None:
+                posted = (posted - posted.utcoffset()).replace(tzinfo=None)
+            return posted.isoformat(timespec="seconds")
+        except ValueError:
+            pass
+
+    text = clean_text(element) or ""
+    # Only explicit phrases; a bare "today" is as likely to be "apply today"
+    lowered = text.lower()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if "just posted" in lowered or "posted today" in lowered:
+        return today.isoformat(timespec="seconds")
+    if "posted yesterday" in lowered:
+        return (today - timedelta(days=1)).isoformat(timespec="seconds")
+
+    match = RELATIVE_DATE.search(text)
+    if match:
+        if match.group(2):
+            # "30+ days ago" is only a lower bound; it stays "30+" as the ad ages
+            return None
+        count, unit = match.group(1).lower(), match.group(3).lower()
+        count = 1 if count in ("a", "an", "one") else int(count)
+        posted = now - count * UNIT_DELTAS[unit]
+        # Truncated to the text's precision so re-scrapes give the same value
+        if unit in ("minute", "hour"):
+            posted = posted.replace(minute=0, second=0, microsecond=0)
+        else:
+            posted = posted.replace(hour=0, minute=0, second=0, microsecond=0)
+        return posted.isoformat(timespec="seconds")
+    return None
+
+
+def external_id(url: str) -> Optional[str]:
+    """A board's own id for the job from its URL's query, None if it has none"""
+    params = parse_qs(urlparse(url).query)
+    for name in ID_PARAMS:
+        value = (params.get(name) or [""])[0].strip()
+        if value:
+            return value
+    return None
+
+
+def extract_job(element, page_url: str, selectors: Dict[str, str], board: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    One job record from a matched container element
+
+    Args:
+        element: lxml element matched by the siteconfig's container_selector
+        page_url: Page the element came from, for resolving relative links
+        selectors: Field name -> CSS selector, relative to the container
+        board: Source board recorded on the job (usually the site's domain)
+
+    Returns:
+        {"title", "company", "location", "salary", "job_type", "description",
+         "url", "external_id", "board", "posted_at"}, or None when the element
+        has no title or no link (not a job listing)
+    """
+    job: Dict[str, Any] = {field: None for field in TEXT_FIELDS}
+    for field in TEXT_FIELDS:
+        if selectors.get(field):
+            job[field] = clean_text(select_one(element, selectors[field]))
+
+    link = None
+    if selectors.get("link"):
+        link = select_one(element, selectors["link"])
+    if link is None or not link.get("href"):
+        # The container itself, or its first link, usually points at the ad
+        link = element if element.get("href") else select_one(element, "a[href]")
+    if link is None or not job["title"]:
+        return None
+
+    url = urljoin(page_url, link.get("href").strip())
+    if urlparse(url).scheme not in ("http", "https"):
+        return None  # javascript:, mailto: ...
+
+    job["url"] = url
+    job["external_id"] = external_id(url)
+    job["board"] = board
+    job["posted_at"] = parse_posted_at(element)
+    return job
+
+
+def iter_jobs(tree, page_url: str, scraping_config: Dict[str, Any], board: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Lazily yield a job record for every container on a parsed page"""
+    selectors = {
+        field: data["selector"]
+        for field, data in scraping_config.get("selectors", {}).items()
+        if isinstance(data, dict) and data.get("selector")
+    }
+    for element in select(tree, scraping_config["container_selector"]):
+        job = extract_job(element, page_url, selectors, board)
+        if job:
+            yield job
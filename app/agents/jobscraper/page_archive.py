@@ -0,0 +1,300 @@
+import os
+import json
+import mmap
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# One fixed-size record per archived page, appended to <segment>.idx
+INDEX_DTYPE = np.dtype([
+    ("url_key", "<u8"),
+    ("host_key", "<u8"),
+    ("body_key", "<u8"),
+    ("fetched_at", "<f8"),
+    ("offset", "<u8"),       # of the page's zstd frame in <segment>.zst
+    ("length", "<u4"),       # compressed frame size
+    ("status", "<u2"),
+    ("reserved", "<u2"),
+])
+
+SEGMENT_SUFFIX = ".zst"
+INDEX_SUFFIX = ".idx"
+# URLs whose last archived body a writer remembers, least recently archived dropped first
+MAX_TRACKED_URLS = 100_000
+
+
+def _key(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def url_key(url: str) -> int:
+    return _key(url.encode("utf-8"))
+
+
+def host_key(url: str) -> int:
+    """Key of a URL's host, without "www." (so board domains match either form)"""
+    host = urlparse(url).netloc.lower()
+    return _key(host[4:].encode("utf-8") if host.startswith("www.") else host.encode("utf-8"))
+
+
+@dataclass
+class ArchivedPage:
+    url: str
+    status: int
+    fetched_at: float
+    content: bytes
+
+
+class PageArchive:
+    """
+    Append-only, zstd-compressed archive of fetched pages
+
+    Pages are appended as independent zstd frames to a segment file; each
+    frame holds a JSON header line (url, status, fetched_at) and the raw
+    body. A fixed-size record per frame (URL, host and body keys, fetch
+    time, offset, length) goes to the segment's .idx file once the frame is
+    on disk, so readers never see a record without its page. Segments are
+    named after their start time and pid, so every scraper process writes
+    its own, and roll over at segment_bytes.
+
+    A body identical to the one this writer last archived for the URL is
+    skipped (for the MAX_TRACKED_URLS most recently archived URLs); 304s
+    have no body and are never archived. With retention_days, segments no
+    process has written to for that long are deleted whenever a writer
+    rolls over to a new segment.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 256 * 1024 * 1024, level: int = 3,
+                 retention_days: float = 0):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is not installed")
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.retention_days = retention_days
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._lock = threading.Lock()
+        self._segment = None
+        self._index = None
+        self._offset = 0
+        self._sequence = 0
+        self._last_body: "OrderedDict[int, int]" = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    def _prune(self) -> int:
+        """Delete segments whose index was last written more than retention_days ago"""
+        cutoff = time.time() - self.retention_days * 86400
+        pruned = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(INDEX_SUFFIX):
+                continue
+            base = os.path.join(self.directory, name[:-len(INDEX_SUFFIX)])
+            try:
+                if os.path.getmtime(base + INDEX_SUFFIX) >= cutoff:
+                    continue
+                # Segment first: an index without its segment is skipped by readers
+                for suffix in (SEGMENT_SUFFIX, INDEX_SUFFIX):
+                    if os.path.exists(base + suffix):
+                        os.remove(base + suffix)
+                pruned += 1
+                logger.info(f"🗑️ Pruned archive segment {os.path.basename(base)}")
+            except OSError as e:
+                logger.warning(f"Could not prune archive segment {base}: {e}")
+        return pruned
+
+    def _roll(self) -> None:
+        self._close_segment()
+        if self.retention_days and self._prune():
+            # The pruned captures may be the only ones of unchanged pages; archive them again
+            self._last_body.clear()
+        self._sequence += 1
+        name = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{os.getpid()}-{self._sequence:04d}"
+        path = os.path.join(self.directory, name)
+        self._segment = open(path + SEGMENT_SUFFIX, "ab")
+        self._index = open(path + INDEX_SUFFIX, "ab")
+        self._offset = self._segment.tell()
+
+    def append(self, url: str, status: int, content: bytes, fetched_at: Optional[float] = None) -> bool:
+        """Archive one page; returns False when its body is unchanged since the last capture"""
+        if not content:
+            return False
+        fetched_at = fetched_at or time.time()
+        key, body = url_key(url), _key(content)
+        header = json.dumps({"url": url, "status": status, "fetched_at": fetched_at}).encode("utf-8")
+
+        with self._lock:
+            if self._last_body.get(key) == body:
+                return False
+            frame = self._compressor.compress(header + b"\n" + content)
+            if self._segment is None or self._offset + len(frame) > self.segment_bytes:
+                self._roll()
+            self._segment.write(frame)
+            self._segment.flush()
+
+            record = np.zeros(1, dtype=INDEX_DTYPE)
+            record[0] = (key, host_key(url), body, fetched_at, self._offset, len(frame), status or 0, 0)
+            self._index.write(record.tobytes())
+            self._index.flush()
+
+            self._offset += len(frame)
+            self._last_body[key] = body
+            self._last_body.move_to_end(key)
+            if len(self._last_body) > MAX_TRACKED_URLS:
+                self._last_body.popitem(last=False)
+        return True
+
+    def _close_segment(self) -> None:
+        for f in (self._segment, self._index):
+            if f is not None:
+                f.close()
+        self._segment = self._index = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
+
+
+class ArchiveReader:
+    """
+    Memory-mapped reader over every segment of a PageArchive directory
+
+    Index files are mapped and viewed as numpy record arrays, so filtering
+    by URL, host or time never reads page data; pages are decompressed
+    straight out of the mapped segment. Segments written after the reader
+    was opened are not seen (open a new reader).
+
+    Usage:
+        with ArchiveReader(directory) as archive:
+            for page in archive.pages(hosts=["talent.com"]):
+                ...
+    """
+
+    def __init__(self, directory: str):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is not installed")
+        self.directory = directory
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._maps: List[mmap.mmap] = []
+        self._segments: List[Tuple[mmap.mmap, np.ndarray]] = []
+        self._open()
+
+    def _map(self, path: str) -> Optional[mmap.mmap]:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def _open(self) -> None:
+        if not os.path.isdir(self.directory):
+            return
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(INDEX_SUFFIX):
+                continue
+            base = os.path.join(self.directory, name[:-len(INDEX_SUFFIX)])
+            index = self._map(base + INDEX_SUFFIX)
+            if index is None or not os.path.exists(base + SEGMENT_SUFFIX):
+                continue
+            segment = self._map(base + SEGMENT_SUFFIX)
+            if segment is None:
+                continue
+            # A writer killed mid-record leaves a partial tail; ignore it
+            count = len(index) // INDEX_DTYPE.itemsize
+            self._segments.append((segment, np.frombuffer(index, dtype=INDEX_DTYPE, count=count)))
+
+    def __len__(self) -> int:
+        return sum(len(records) for _, records in self._segments)
+
+    def _select(self, urls: Optional[Iterable[str]], hosts: Optional[Iterable[str]],
+                since: Optional[float], until: Optional[float]) -> Iterator[Tuple[int, np.ndarray]]:
+        url_keys = np.array([url_key(u) for u in urls], dtype="<u8") if urls is not None else None
+        host_keys = np.array([host_key(f"//{h}") for h in hosts], dtype="<u8") if hosts is not None else None
+        for number, (_, records) in enumerate(self._segments):
+            mask = np.ones(len(records), dtype=bool)
+            if url_keys is not None:
+                mask &= np.isin(records["url_key"], url_keys)
+            if host_keys is not None:
+                mask &= np.isin(records["host_key"], host_keys)
+            if since is not None:
+                mask &= records["fetched_at"] >= since
+            if until is not None:
+                mask &= records["fetched_at"] <= until
+            rows = np.flatnonzero(mask)
+            if len(rows):
+                yield number, rows
+
+    def captures(self, urls: Optional[Iterable[str]] = None, hosts: Optional[Iterable[str]] = None,
+                 since: Optional[float] = None, until: Optional[float] = None,
+                 latest: bool = True) -> List[Tuple[int, int]]:
+        """
+        (segment, row) of matching captures, grouped by host then oldest first
+
+        Args:
+            hosts: Board domains, with or without "www."
+            latest: Keep only the newest capture of each URL (as of until)
+        """
+        selected = [(number, rows, self._segments[number][1][rows]) for number, rows in self._select(urls, hosts, since, until)]
+        if not selected:
+            return []
+        numbers = np.concatenate([np.full(len(rows), number) for number, rows, _ in selected])
+        rows = np.concatenate([rows for _, rows, _ in selected])
+        records = np.concatenate([records for _, _, records in selected])
+
+        if latest:
+            # Last capture per url_key once sorted by (url_key, fetched_at)
+            order = np.lexsort((records["fetched_at"], records["url_key"]))
+            keys = records["url_key"][order]
+            last = np.ones(len(order), dtype=bool)
+            last[:-1] = keys[:-1] != keys[1:]
+            keep = order[last]
+            numbers, rows, records = numbers[keep], rows[keep], records[keep]
+
+        order = np.lexsort((records["fetched_at"], records["host_key"]))
+        return list(zip(numbers[order].tolist(), rows[order].tolist()))
+
+    def read(self, number: int, row: int) -> ArchivedPage:
+        segment, records = self._segments[number]
+        record = records[row]
+        offset, length = int(record["offset"]), int(record["length"])
+        with memoryview(segment)[offset:offset + length] as frame:
+            data = self._decompressor.decompress(frame)
+        header, _, content = data.partition(b"\n")
+        meta = json.loads(header)
+        return ArchivedPage(url=meta["url"], status=meta["status"], fetched_at=meta["fetched_at"], content=content)
+
+    def pages(self, **filters) -> Iterator[ArchivedPage]:
+        """Decompress the captures(**filters) one at a time"""
+        for number, row in self.captures(**filters):
+            yield self.read(number, row)
+
+    def get(self, url: str, at: Optional[float] = None) -> Optional[ArchivedPage]:
+        """Newest capture of url, or the newest one fetched at or before at"""
+        captures = self.captures(urls=[url], until=at)
+        return self.read(*captures[-1]) if captures else None
+
+    def close(self) -> None:
+        self._segments = []
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
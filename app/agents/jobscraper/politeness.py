@@ -0,0 +1,196 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean "slow down", not "this page is broken"
+THROTTLE_STATUSES = {429, 503}
+RETRYABLE_STATUSES = THROTTLE_STATUSES | {408, 500, 502, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class DomainState:
+    """Token bucket plus back-off state for one domain"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.failures = 0
+        self.robots: Optional[RobotFileParser] = None
+        self.robots_loaded = False
+
+    def set_crawl_delay(self, delay: float) -> None:
+        if delay > 0:
+            self.rate = min(self.rate, 1.0 / delay)
+            self.burst = 1
+            self.tokens = min(self.tokens, 1.0)
+
+    def reserve(self, now: float) -> float:
+        """Take a token (possibly on credit) and return when it may be used"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(now + wait, self.blocked_until)
+
+
+class PolitenessScheduler:
+    """
+    Decides when each fetch may go out
+
+    Every domain gets a token bucket (rate per second, burst), narrowed by
+    its robots.txt Crawl-delay. 429/503 responses block the domain for their
+    Retry-After, other failures for a jittered exponential backoff.
+    Waiting fetches sit in one heap ordered by due time and a single
+    dispatcher releases them, so a throttled domain never holds up a ready one
+    and nothing sleeps in a worker.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: int = 4, obey_robots: bool = True,
+                 user_agent: str = "*", base_backoff: float = 1.0, max_backoff: float = 300.0):
+        self.rate = rate
+        self.burst = burst
+        self.obey_robots = obey_robots
+        self.user_agent = user_agent
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.domains: Dict[str, DomainState] = {}
+        self._heap: List[Tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._robots_locks: Dict[str, asyncio.Lock] = {}
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self) -> None:
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+        for _, _, future in self._heap:
+            future.cancel()
+        self._heap.clear()
+
+    def domain(self, url: str) -> DomainState:
+        key = urlparse(url).netloc.lower()
+        state = self.domains.get(key)
+        if state is None:
+            state = self.domains[key] = DomainState(self.rate, self.burst)
+        return state
+
+    async def load_robots(self, client, url: str) -> None:
+        """Fetch robots.txt for the URL's domain once; failures allow everything"""
+        state = self.domain(url)
+        if state.robots_loaded:
+            return
+        parsed = urlparse(url)
+        lock = self._robots_locks.setdefault(parsed.netloc.lower(), asyncio.Lock())
+        async with lock:
+            if state.robots_loaded:
+                return
+            robots = RobotFileParser()
+            try:
+                response = await client.get(f"{parsed.scheme}://{parsed.netloc}/robots.txt", timeout=10)
+                if response.status_code == 200:
+                    robots.parse(response.text.splitlines())
+                    delay = robots.crawl_delay(self.user_agent)
+                    if delay:
+                        state.set_crawl_delay(float(delay))
+                    state.robots = robots
+            except Exception as e:
+                logger.debug(f"robots.txt unavailable for {parsed.netloc}: {e}")
+            state.robots_loaded = True
+
+    def allowed(self, url: str) -> bool:
+        state = self.domain(url)
+        if not self.obey_robots or state.robots is None:
+            return True
+        return state.robots.can_fetch(self.user_agent, url)
+
+    async def acquire(self, url: str) -> None:
+        """Wait until a request to url is due"""
+        due = self.domain(url).reserve(time.monotonic())
+        if due <= time.monotonic():
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (due, next(self._seq), future))
+        self._wakeup.set()
+        await future
+
+    def report(self, url: str, status: Optional[int], headers: Optional[Dict[str, str]] = None) -> None:
+        """
+        Feed a response back; throttling and server or network failures push
+        the domain's next slot out
+
+        Other 4xx (e.g. a 404 on a stale pagination link) are about the page,
+        not the domain, and leave its pace alone.
+        """
+        state = self.domain(url)
+        if status is not None and status < 400:
+            state.failures = 0
+            return
+        if status is not None and status < 500 and status not in THROTTLE_STATUSES:
+            return
+
+        state.failures += 1
+        delay = None
+        if status in THROTTLE_STATUSES:
+            delay = parse_retry_after((headers or {}).get("retry-after") or (headers or {}).get("Retry-After"))
+        if delay is None:
+            delay = self.backoff(state.failures)
+        state.blocked_until = max(state.blocked_until, time.monotonic() + min(delay, self.max_backoff))
+        logger.info(f"⏳ {urlparse(url).netloc} paused {delay:.1f}s (status {status})")
+
+    def backoff(self, failures: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** failures))
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            due, _, future = self._heap[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                # Sleep until the earliest fetch is due, or a new one arrives
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            if not future.done():
+                future.set_result(None)
@@ -0,0 +1,31 @@
+import time
+import argparse
+from app.config import settings
+from .scraper_bot import ProxyEnhancedJobScraper
+
+
+def main():
+    """Re-run detection and extraction over the page archive, offline"""
+    parser = argparse.ArgumentParser(description="Replay archived pages through the scraper without network")
+    parser.add_argument("--dir", default=settings.SCRAPER_ARCHIVE_DIR or None, required=not settings.SCRAPER_ARCHIVE_DIR,
+                        help="Archive directory (default: SCRAPER_ARCHIVE_DIR)")
+    parser.add_argument("--host", action="append", help="Only this board domain (repeatable)")
+    parser.add_argument("--hours", type=float, help="Only pages fetched in the last N hours")
+    args = parser.parse_args()
+
+    since = time.time() - args.hours * 3600 if args.hours else None
+    scraper = ProxyEnhancedJobScraper(use_proxy=False)
+    try:
+        for site in scraper.replay_archive(args.dir, hosts=args.host, since=since):
+            inspection = site["inspection"] or {}
+            print(
+                f"{site['domain']}: {site['pages']} pages, "
+                f"{inspection.get('strategy', '-')} {inspection.get('container_selector', '-')} "
+                f"({inspection.get('total_jobs', 0)} detected), {len(site['jobs'])} jobs extracted"
+            )
+    finally:
+        scraper.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 import requests
 import json
 import time
+import asyncio
+import queue
+import threading
 import logging
 import re
 import os
-from bs4 import BeautifulSoup
 from seleniumwire import webdriver
+from selenium import webdriver as selenium_webdriver
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
@@ -16,9 +19,17 @@ from selenium.webdriver.chrome.service import Service
 from urllib.parse import urlparse, urljoin
 from app.config import settings
 from datetime import datetime
-import concurrent.futures
 import csv
+import glob
+from functools import lru_cache
 import urllib3
+from .fetch import AsyncFetchEngine
+from .politeness import PolitenessScheduler
+from .http_cache import HttpCache, CacheEntry, body_hash
+from .dom import parse_html, select, select_one, text_of
+from .job_extractor import iter_jobs
+from .browser_pool import BrowserPool
+from .page_archive import PageArchive, ArchiveReader, ZSTD_AVAILABLE
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 UNSUPPORTED_DOMAINS = {
@@ -33,22 +44,56 @@ UNSUPPORTED_DOMAINS = {
     
 }
 
+# Bump when the detection strategies change so cached page analyses are redone
+ANALYSIS_VERSION = "1"
+# Likewise for replayed extraction (see replay_async)
+REPLAY_VERSION = "2"
+
+# Listings only need the DOM; the browser pool does not download these
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.css",
+]
+
+
+@lru_cache(maxsize=1)
+def chromedriver_path():
+    """Locate (downloading if needed) chromedriver once per process, not per browser"""
+    return ChromeDriverManager().install()
+
+
 class ProxyEnhancedJobScraper:
     """Job scraper with ScrapeOps proxy integration to avoid blocks"""
     
-    def __init__(self, scrapeops_api_key=None, use_proxy=True, max_workers=5):
+    def __init__(self, scrapeops_api_key=None, use_proxy=True, max_workers=5, frontier=None):
         self.scrapeops_api_key =  settings.SCRAPEOPS_API_KEY or scrapeops_api_key
         self.use_proxy = use_proxy and self.scrapeops_api_key is not None
         self.max_workers = max_workers
-        self.driver = None
+        # Persistent crawl state for replays (due(board, limit, exclude) /
+        # record(board, fetched, discovered)); None crawls every page each time
+        self.frontier = frontier
         self.session = requests.Session()
         self.site_configs = {}
         self.failed_sites = []
         self.successful_sites = []
+        self.last_run = ([], [])
+        self.http_cache = HttpCache(settings.SCRAPER_HTTP_CACHE_DIR, version=ANALYSIS_VERSION)
         
         # Setup logging
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
         self.logger = logging.getLogger(__name__)
+
+        # Raw pages as fetched, so detection and extraction can be re-run offline
+        self.page_archive = None
+        if settings.SCRAPER_ARCHIVE_DIR:
+            if ZSTD_AVAILABLE:
+                self.page_archive = PageArchive(
+                    settings.SCRAPER_ARCHIVE_DIR,
+                    segment_bytes=settings.SCRAPER_ARCHIVE_SEGMENT_MB * 1024 * 1024,
+                    retention_days=settings.SCRAPER_ARCHIVE_RETENTION_DAYS,
+                )
+            else:
+                self.logger.warning("📦 zstandard not installed - page archive disabled")
         
         # Initialize session with proper headers
         self.session.headers.update({
@@ -67,6 +112,13 @@ class ProxyEnhancedJobScraper:
         else:
             self.proxy_config = None
             self.logger.warning("🚫 No proxy configured - may get blocked by some sites")
+
+        # Headless browsers for JS-rendered boards, started on first use
+        self.browser_pool = BrowserPool(
+            self._setup_chrome_driver,
+            size=settings.SCRAPER_BROWSER_POOL_SIZE,
+            max_pages=settings.SCRAPER_BROWSER_MAX_PAGES,
+        )
     
     def _setup_proxy_config(self):
         """Configure ScrapeOps proxy settings"""
@@ -82,7 +134,7 @@ class ProxyEnhancedJobScraper:
         }
     
     def _setup_chrome_driver(self):
-        """Setup Chrome driver with Selenium Wire for proxy support"""
+        """Setup Chrome driver, through Selenium Wire when the proxy needs authenticating"""
         try:
             chrome_options = Options()
             chrome_options.add_argument("--headless")
@@ -101,22 +153,30 @@ class ProxyEnhancedJobScraper:
             chrome_options.add_argument("--proxy-server=direct://")
             chrome_options.add_argument("--proxy-bypass-list=*")
             
-            # Use ChromeDriverManager to automatically download and manage ChromeDriver
-            driver_options = {
-                'request_storage_base_dir': '/tmp/seleniumwire',
-                'request_storage_max_size': 1000,
-            }
+            if settings.SCRAPER_BROWSER_BLOCK_RESOURCES:
+                chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
             
+            service = Service(chromedriver_path())
             if self.proxy_config:
+                # Selenium Wire is only needed for the proxy credentials; it
+                # records nothing unless SCRAPER_BROWSER_CAPTURE_REQUESTS is set
+                driver_options = {
+                    'disable_capture': not settings.SCRAPER_BROWSER_CAPTURE_REQUESTS,
+                    'request_storage': 'memory',
+                    'request_storage_max_size': 100,
+                }
                 driver_options.update(self.proxy_config)
+                driver = webdriver.Chrome(
+                    service=service,
+                    seleniumwire_options=driver_options,
+                    options=chrome_options
+                )
+            else:
+                driver = selenium_webdriver.Chrome(service=service, options=chrome_options)
             
-            # Create driver with proxy support
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(
-                service=service,
-                seleniumwire_options=driver_options,
-                options=chrome_options
-            )
+            if settings.SCRAPER_BROWSER_BLOCK_RESOURCES:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCE_PATTERNS})
             
             # Execute stealth scripts
             driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -234,93 +294,310 @@ class ProxyEnhancedJobScraper:
             "https://crunchboard.com",
         ]
         
-    def inspect_with_proxy(self, url, max_retries=2, allow_fallback=True, max_pages=10):
+    def _make_fetch_engine(self, retries=2):
+        """Shared async HTTP client configured like self.session"""
+        # Hop-by-hop headers are invalid over HTTP/2; httpx manages keep-alive itself
+        headers = {k: v for k, v in self.session.headers.items() if k.lower() not in ('connection', 'upgrade-insecure-requests')}
+        return AsyncFetchEngine(
+            headers=headers,
+            proxy=self.proxy_config['proxy']['https'] if self.use_proxy else None,
+            max_connections=settings.SCRAPER_MAX_CONNECTIONS,
+            per_domain=settings.SCRAPER_PER_DOMAIN_CONCURRENCY,
+            rate_per_second=settings.SCRAPER_RATE_LIMIT,
+            verify=False,
+            retries=retries,
+            archive=self.page_archive,
+            scheduler=PolitenessScheduler(
+                rate=settings.SCRAPER_DOMAIN_RATE,
+                burst=settings.SCRAPER_DOMAIN_BURST,
+                obey_robots=settings.SCRAPER_OBEY_ROBOTS,
+            ),
+        )
+
+    def _analyze_page(self, content, page_url):
+        """Run the detection strategies on one page; returns (results, pagination links)"""
+        # lxml parses an order of magnitude faster than html.parser, and the
+        # strategy selectors below run as XPath compiled once per process
+        tree = parse_html(content)
+        if tree is None:
+            return [], []
+
+        # Your existing strategies
+        strategies = [
+            self._strategy_common_class_names,
+            self._strategy_semantic_html,
+            self._strategy_itemscope_microdata,
+            self._strategy_data_attributes,
+            self._strategy_table_based,
+            self._strategy_list_based
+        ]
+
+        page_results = []
+        for strategy in strategies:
+            result = strategy(tree, page_url)
+            if result and result.get("total_jobs", 0) > 0:
+                result["resolved_url"] = page_url
+                page_results.append(result)
+
+        return page_results, self._extract_pagination_urls(tree, page_url)
+
+    def _analyze_fetched(self, page, analyze=None, cache=None):
         """
-        Inspect a URL with proxy support and follow pagination links.
-        Aggregates results from multiple pages.
+        analyze (default _analyze_page) with the HTTP cache in front: a 304,
+        or a body identical to the cached one, reuses the stored analysis
+        instead of re-parsing
         """
-        self.logger.info(f"🔍 Inspecting {url} with proxy support")
+        analyze = analyze or self._analyze_page
+        cache = cache or self.http_cache
+        cached = cache.get(page.url)
+        digest = None if page.not_modified else body_hash(page.content)
 
-        visited_urls = set()
-        urls_to_visit = [url]
-        all_results = []
+        if cached is not None and cached.analysis is not None and (page.not_modified or digest == cached.body_hash):
+            self.logger.info(f"♻️ Unchanged: {page.url}")
+            if not page.not_modified:
+                self._remember_page(cache, page, digest, cached.analysis)
+            return tuple(cached.analysis)
 
-        while urls_to_visit and len(visited_urls) < max_pages:
-            current_url = urls_to_visit.pop(0)
-            if current_url in visited_urls:
-                continue
+        if page.not_modified:
+            # Entry vanished between request and response; nothing to reuse
+            self.logger.warning(f"304 without a cached copy for {page.url}")
+            return [], []
 
-            visited_urls.add(current_url)
-            self.logger.info(f"📄 Scraping page: {current_url}")
+        analysis = analyze(page.content, page.url)
+        self._remember_page(cache, page, digest, analysis)
+        return analysis
 
-            for attempt in range(max_retries):
-                try:
-                    response = self.session.get(
-                        current_url,
-                        timeout=20,
-                        proxies=self.proxy_config['proxy'] if self.use_proxy else None,
-                        verify=False
-                    )
-                    response.raise_for_status()
-
-                    soup = BeautifulSoup(response.content, "html.parser")
-                    for script in soup(["script", "style"]):
-                        script.decompose()
-
-                    # Your existing strategies
-                    strategies = [
-                        self._strategy_common_class_names,
-                        self._strategy_semantic_html,
-                        self._strategy_itemscope_microdata,
-                        self._strategy_data_attributes,
-                        self._strategy_table_based,
-                        self._strategy_list_based
-                    ]
-
-                    page_results = []
-                    for strategy in strategies:
-                        result = strategy(soup, current_url)
-                        if result and result.get("total_jobs", 0) > 0:
-                            result["resolved_url"] = current_url
-                            page_results.append(result)
-
-                    if page_results:
-                        all_results.extend(page_results)
-
-                    # 🔁 Detect pagination links on this page
-                    pagination_links = self._extract_pagination_urls(soup, current_url)
-                    for link in pagination_links:
-                        if link not in visited_urls and link not in urls_to_visit:
-                            urls_to_visit.append(link)
-
-                    # Stop retry loop on success
-                    break
+    def _remember_page(self, cache, page, digest, analysis):
+        headers = {k.lower(): v for k, v in page.headers.items()}
+        cache.put(CacheEntry(
+            url=page.url,
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            body_hash=digest,
+            analysis=list(analysis),
+        ))
+
+    def _best_result(self, results):
+        """Pick the strongest detection across all pages of a site"""
+        if not results:
+            return None
+        best = dict(max(results, key=lambda r: r.get("total_jobs", 0)))
+        best["pages_scraped"] = sorted({r["resolved_url"] for r in results})
+        return best
+
+    async def _crawl_pages(self, engine, url, max_pages=10, analyze=None, cache=None, frontier=None):
+        """
+        Fetch a URL and follow its pagination links, each level of pagination
+        concurrently through the shared fetch engine; analyze(content, page_url)
+        returns (results, pagination links) per page. Yields each page's
+        results as soon as its level is done, so callers can stream them.
+
+        With a frontier, only pages it reports as due are fetched and every
+        level's outcome is written back, so an interrupted crawl resumes
+        where it stopped and fresh pages are skipped until they are due.
+        """
+        cache = cache or self.http_cache
+        visited_urls = set()
+        if frontier:
+            batch = await asyncio.to_thread(frontier.due, url, max_pages, ())
+        else:
+            batch = [(url, 0)]
+
+        while batch and len(visited_urls) < max_pages:
+            batch = batch[:max_pages - len(visited_urls)]
+            depths = dict(batch)
+            visited_urls.update(depths)
+            self.logger.info(f"📄 Scraping {len(batch)} page(s) of {url}")
+
+            # Conditional requests: unchanged pages come back as 304 with no body
+            pages = await asyncio.gather(*(
+                engine.fetch(page_url, headers=cache.conditional_headers(page_url)) for page_url in depths
+            ))
+            for page in pages:
+                if not page.ok:
+                    self.logger.warning(f"All attempts failed for {page.url}: {page.error}")
 
-                except Exception as e:
-                    self.logger.warning(
-                        f"Attempt {attempt + 1} failed for {current_url}: {str(e)}"
-                    )
-                    time.sleep(2 ** attempt)
+            # Parsing is CPU-bound; keep it off the event loop
+            fetched = [page for page in pages if page.ok]
+            analyses = await asyncio.gather(*(
+                asyncio.to_thread(self._analyze_fetched, page, analyze, cache) for page in fetched
+            ))
+            discovered = {}
+            for page, (page_results, pagination_links) in zip(fetched, analyses):
+                # 🔁 Detect pagination links on this page
+                for link in pagination_links:
+                    if link not in visited_urls:
+                        discovered.setdefault(link, depths[page.url] + 1)
+                yield page_results
 
+            if frontier:
+                await asyncio.to_thread(
+                    frontier.record, url,
+                    [(page.url, page.status, page.ok) for page in pages],
+                    list(discovered.items()),
+                )
+                batch = await asyncio.to_thread(frontier.due, url, max_pages - len(visited_urls), list(visited_urls))
             else:
-                self.logger.warning(f"All attempts failed for {current_url}")
+                batch = list(discovered.items())
+
+    async def inspect_async(self, engine, url, allow_fallback=True, max_pages=10):
+        """
+        Inspect a URL and follow pagination links, fetching each level of
+        pagination concurrently through the shared fetch engine.
+        """
+        self.logger.info(f"🔍 Inspecting {url} with proxy support")
+
+        result = self._best_result([
+            page_result async for page_results in self._crawl_pages(engine, url, max_pages) for page_result in page_results
+        ])
 
         # If nothing found, try fallback once
-        if not all_results and allow_fallback:
+        if not result and allow_fallback:
             self.logger.info(f"🔄 Base URL failed, attempting fallbacks for {url}")
-            fallback_result = self.inspect_with_fallback(url)
-            if fallback_result:
-                all_results.append(fallback_result)
+            result = await self.inspect_with_fallback_async(engine, url)
+
+        return result
+
+    def inspect_with_proxy(self, url, max_retries=2, allow_fallback=True, max_pages=10):
+        """
+        Inspect a URL with proxy support and follow pagination links.
+        Returns the best detection across pages, or None.
+        """
+        async def run():
+            async with self._make_fetch_engine(retries=max_retries) as engine:
+                return await self.inspect_async(engine, url, allow_fallback=allow_fallback, max_pages=max_pages)
+
+        return asyncio.run(run())
+
+    def _extract_page_jobs(self, content, page_url, siteconfig):
+        """
+        Job records on one page, extracted with a saved siteconfig's selectors;
+        returns ([{"page_url", "jobs"}], pagination links) like _analyze_page
+        """
+        tree = parse_html(content)
+        if tree is None:
+            return [], []
+
+        jobs = list(iter_jobs(tree, page_url, siteconfig["scraping_config"], board=siteconfig.get("domain")))
+        return [{"page_url": page_url, "jobs": jobs}], self._extract_pagination_urls(tree, page_url)
+
+    async def replay_async(self, engine, siteconfig, max_pages=10, job_sink=None):
+        """
+        Scrape a known board with its saved selectors, skipping the strategy cascade
+
+        With a job_sink (async callable), each page's job records are handed
+        to it as soon as the page is extracted, so a board is never held in
+        memory; otherwise they are collected under "jobs" in the result.
+        Returns a copy of the siteconfig, or None when the best page yields
+        fewer than SCRAPER_REPLAY_MIN_YIELD of the jobs detected when the
+        config was generated (the board changed and its selectors must be
+        rediscovered).
+        """
+        url = siteconfig["base_url"]
+        self.logger.info(f"⏩ Replaying saved selectors for {url}")
+
+        # Cached extractions are only valid for the selectors that produced them
+        cache = HttpCache(
+            os.path.join(settings.SCRAPER_HTTP_CACHE_DIR, "replay"),
+            version=f"{REPLAY_VERSION}:{siteconfig.get('generated_at')}",
+        )
+        collected = []
+        pages_seen = jobs_found = best_page = 0
+        base_seen = False
+        async for page_results in self._crawl_pages(
+            engine, url, max_pages,
+            analyze=lambda content, page_url: self._extract_page_jobs(content, page_url, siteconfig),
+            cache=cache,
+            frontier=self.frontier,
+        ):
+            for page in page_results:
+                pages_seen += 1
+                base_seen = base_seen or page["page_url"] == url
+                jobs_found += len(page["jobs"])
+                best_page = max(best_page, len(page["jobs"]))
+                if not page["jobs"]:
+                    continue
+                if job_sink:
+                    await job_sink(page["jobs"])
+                else:
+                    collected.extend(page["jobs"])
+
+        expected = siteconfig.get("metadata", {}).get("total_jobs_detected") or 0
+        if pages_seen == 0 and self.frontier:
+            self.logger.info(f"💤 No pages of {url} are due yet")
+        elif (base_seen or not self.frontier) and best_page < max(1, settings.SCRAPER_REPLAY_MIN_YIELD * expected):
+            # Judged on runs that include page 1; deep pages alone may legitimately be short
+            self.logger.warning(f"📉 Replay yield for {url}: {best_page} jobs on the best page, {expected} expected")
+            return None
+
+        replayed = dict(siteconfig)
+        if not job_sink:
+            replayed["jobs"] = collected
+        replayed["jobs_extracted"] = jobs_found
+        replayed["replayed_at"] = datetime.now().isoformat()
+        self.logger.info(f"✅ Replayed {url}: {jobs_found} jobs from {pages_seen} page(s)")
+        return replayed
+
+    def replay_archive(self, directory=None, hosts=None, since=None, until=None):
+        """
+        Re-run detection and extraction over archived pages, without network
+
+        Takes the newest capture of every archived URL (as of until), runs
+        the _strategy_* detection on it and, for boards with a saved
+        siteconfig, extracts jobs with its selectors. Neither the HTTP cache
+        nor the proxies are involved, so changed strategies or selectors can
+        be checked against real pages at disk speed.
+
+        Yields one dict per board domain:
+            {"domain", "pages", "inspection" (best detection or None), "jobs"}
+        """
+        configs = {
+            config.get("domain") or self._extract_domain(base_url): config
+            for base_url, config in self.load_siteconfigs().items()
+        }
+
+        def summary(domain, pages, results, jobs):
+            return {"domain": domain, "pages": pages, "inspection": self._best_result(results), "jobs": jobs}
+
+        with ArchiveReader(directory or settings.SCRAPER_ARCHIVE_DIR) as archive:
+            domain, pages, results, jobs = None, 0, [], []
+            for page in archive.pages(hosts=hosts, since=since, until=until):
+                page_domain = self._extract_domain(page.url)
+                if page_domain != domain:
+                    if domain is not None:
+                        yield summary(domain, pages, results, jobs)
+                    domain, pages, results, jobs = page_domain, 0, [], []
 
-        return all_results if all_results else None
+                pages += 1
+                results.extend(self._analyze_page(page.content, page.url)[0])
+                siteconfig = configs.get(domain)
+                if siteconfig:
+                    extracted, _ = self._extract_page_jobs(page.content, page.url, siteconfig)
+                    for page_jobs in extracted:
+                        jobs.extend(page_jobs["jobs"])
+            if domain is not None:
+                yield summary(domain, pages, results, jobs)
+
+    def load_siteconfigs(self, directory=None):
+        """Saved siteconfigs (see save_siteconfig), keyed by base_url"""
+        directory = directory or settings.SCRAPER_SITECONFIG_DIR
+        configs = {}
+        for filename in sorted(glob.glob(os.path.join(directory, "*.json"))):
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+                configs[config["base_url"]] = config
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.warning(f"Skipping unreadable siteconfig {filename}: {e}")
+        return configs
 
 
-    def _extract_pagination_urls(self, soup, base_url):
+    def _extract_pagination_urls(self, tree, base_url):
         """
         Find pagination links that contain ?page= or /page/ patterns
         """
         links = set()
-        for a in soup.select("a[href]"):
+        for a in select(tree, "a[href]"):
             href = a.get("href")
             if href and re.search(r'(?:\?|/)page=\d+', href):
                 full_url = urljoin(base_url, href)
@@ -330,61 +607,61 @@ class ProxyEnhancedJobScraper:
 
     
     def inspect_with_selenium_proxy(self, url):
-        """Inspect website using Selenium with proxy support"""
-        if not self.driver:
-            self.driver = self._setup_chrome_driver()
-            if not self.driver:
-                return None
-        
+        """Inspect website using a pooled Selenium browser with proxy support"""
         try:
-            self.logger.info(f"🌐 Loading {url} with Selenium + Proxy")
-            self.driver.get(url)
-            
-            # Wait for page to load with multiple strategies
-            wait_strategies = [
-                (By.CSS_SELECTOR, "body"),
-                (By.CSS_SELECTOR, "[class*='job']"),
-                (By.CSS_SELECTOR, "main"),
-                (By.CSS_SELECTOR, "article"),
-                (By.CSS_SELECTOR, "h1, h2, h3")
-            ]
-            
-            for strategy in wait_strategies:
-                try:
-                    WebDriverWait(self.driver, 15).until(
-                        EC.presence_of_element_located(strategy)
-                    )
-                    break
-                except:
-                    continue
-            
-            # Get page source and parse
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Apply detection strategies
-            strategies = [
-                self._strategy_common_class_names,
-                self._strategy_semantic_html,
-                self._strategy_itemscope_microdata,
-                self._strategy_data_attributes
-            ]
-            
-            for strategy in strategies:
-                result = strategy(soup, url)
-                if result and result.get('total_jobs', 0) > 0:
-                    result["js_required"] = True
-                    result["proxy_used"] = self.use_proxy
-                    return result
-            
-            return None
-            
+            with self.browser_pool.browser() as driver:
+                return self._inspect_rendered(driver, url)
         except Exception as e:
             self.logger.error(f"Selenium proxy inspection failed for {url}: {str(e)}")
             return None
+
+    def _inspect_rendered(self, driver, url):
+        self.logger.info(f"🌐 Loading {url} with Selenium + Proxy")
+        driver.get(url)
+        
+        # Wait for page to load with multiple strategies
+        wait_strategies = [
+            (By.CSS_SELECTOR, "body"),
+            (By.CSS_SELECTOR, "[class*='job']"),
+            (By.CSS_SELECTOR, "main"),
+            (By.CSS_SELECTOR, "article"),
+            (By.CSS_SELECTOR, "h1, h2, h3")
+        ]
+        
+        for strategy in wait_strategies:
+            try:
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located(strategy)
+                )
+                break
+            except:
+                continue
+        
+        page_source = driver.page_source
+        if self.page_archive is not None and page_source:
+            self.page_archive.append(url, 200, page_source.encode("utf-8"))
+
+        # Get page source and parse, without script and style elements
+        tree = parse_html(page_source)
+        if tree is None:
+            return None
+        
+        # Apply detection strategies
+        strategies = [
+            self._strategy_common_class_names,
+            self._strategy_semantic_html,
+            self._strategy_itemscope_microdata,
+            self._strategy_data_attributes
+        ]
+        
+        for strategy in strategies:
+            result = strategy(tree, url)
+            if result and result.get('total_jobs', 0) > 0:
+                result["js_required"] = True
+                result["proxy_used"] = self.use_proxy
+                return result
+        
+        return None
     
     def _get_alternative_user_agent(self):
         """Get alternative user agent to rotate"""
@@ -397,7 +674,7 @@ class ProxyEnhancedJobScraper:
         ]
         return user_agents[hash(str(time.time())) % len(user_agents)]
     
-    def _strategy_common_class_names(self, soup, url):
+    def _strategy_common_class_names(self, tree, url):
         """Enhanced strategy with more comprehensive patterns"""
         common_patterns = [
             # Job containers
@@ -432,7 +709,7 @@ class ProxyEnhancedJobScraper:
         
         for pattern in common_patterns:
             try:
-                elements = soup.select(pattern)
+                elements = select(tree, pattern)
                 if elements and len(elements) > 0:
                     result = self._analyze_job_elements(elements, url, pattern, "common_class_names")
                     if result:
@@ -443,7 +720,7 @@ class ProxyEnhancedJobScraper:
         
         return None
     
-    def _strategy_semantic_html(self, soup, url):
+    def _strategy_semantic_html(self, tree, url):
         """Strategy: Look for semantic HTML5 elements"""
         semantic_patterns = [
             'article', 'section[class*="job"]', 'section[class*="career"]',
@@ -454,7 +731,7 @@ class ProxyEnhancedJobScraper:
         
         for pattern in semantic_patterns:
             try:
-                elements = soup.select(pattern)
+                elements = select(tree, pattern)
                 if elements and len(elements) > 2:
                     result = self._analyze_job_elements(elements, url, pattern, "semantic_html")
                     if result:
@@ -465,7 +742,7 @@ class ProxyEnhancedJobScraper:
         
         return None
     
-    def _strategy_itemscope_microdata(self, soup, url):
+    def _strategy_itemscope_microdata(self, tree, url):
         """Strategy: Look for microdata/schema.org markup"""
         microdata_patterns = [
             '[itemtype*="JobPosting"]', '[itemscope][itemtype*="JobPosting"]',
@@ -475,7 +752,7 @@ class ProxyEnhancedJobScraper:
         
         for pattern in microdata_patterns:
             try:
-                elements = soup.select(pattern)
+                elements = select(tree, pattern)
                 if elements and len(elements) > 0:
                     result = self._analyze_job_elements(elements, url, pattern, "microdata")
                     if result:
@@ -486,7 +763,7 @@ class ProxyEnhancedJobScraper:
         
         return None
     
-    def _strategy_data_attributes(self, soup, url):
+    def _strategy_data_attributes(self, tree, url):
         """Strategy: Look for data attributes"""
         data_patterns = [
             '[data-job]', '[data-job-id]', '[data-position]', '[data-role]',
@@ -497,7 +774,7 @@ class ProxyEnhancedJobScraper:
         
         for pattern in data_patterns:
             try:
-                elements = soup.select(pattern)
+                elements = select(tree, pattern)
                 if elements and len(elements) > 0:
                     result = self._analyze_job_elements(elements, url, pattern, "data_attributes")
                     if result:
@@ -508,7 +785,7 @@ class ProxyEnhancedJobScraper:
         
         return None
     
-    def _strategy_table_based(self, soup, url):
+    def _strategy_table_based(self, tree, url):
         """Strategy: Look for table-based job listings"""
         table_selectors = [
             'table.jobs-table tbody tr', 'table.job-table tbody tr',
@@ -519,7 +796,7 @@ class ProxyEnhancedJobScraper:
         
         for pattern in table_selectors:
             try:
-                elements = soup.select(pattern)
+                elements = select(tree, pattern)
                 if elements and len(elements) > 2:
                     result = self._analyze_job_elements(elements, url, pattern, "table_based")
                     if result:
@@ -530,7 +807,7 @@ class ProxyEnhancedJobScraper:
         
         return None
     
-    def _strategy_list_based(self, soup, url):
+    def _strategy_list_based(self, tree, url):
         """Strategy: Look for list-based job listings"""
         list_selectors = [
             'ul.jobs-list li', 'ul.job-list li', 'ul.positions li',
@@ -541,7 +818,7 @@ class ProxyEnhancedJobScraper:
         
         for pattern in list_selectors:
             try:
-                elements = soup.select(pattern)
+                elements = select(tree, pattern)
                 if elements and len(elements) > 2:
                     result = self._analyze_job_elements(elements, url, pattern, "list_based")
                     if result:
@@ -610,43 +887,43 @@ class ProxyEnhancedJobScraper:
         for element in sample_elements:
             # Find title
             for pattern in title_patterns:
-                title_elem = element.select_one(pattern)
-                if title_elem and title_elem.get_text(strip=True):
+                title_elem = select_one(element, pattern)
+                if title_elem is not None and text_of(title_elem):
                     field_selectors["title"].append(pattern)
                     break
             
             # Find company
             for pattern in company_patterns:
-                company_elem = element.select_one(pattern)
-                if company_elem and company_elem.get_text(strip=True):
+                company_elem = select_one(element, pattern)
+                if company_elem is not None and text_of(company_elem):
                     field_selectors["company"].append(pattern)
                     break
             
             # Find location
             for pattern in location_patterns:
-                location_elem = element.select_one(pattern)
-                if location_elem and location_elem.get_text(strip=True):
+                location_elem = select_one(element, pattern)
+                if location_elem is not None and text_of(location_elem):
                     field_selectors["location"].append(pattern)
                     break
             
             # Find salary
             for pattern in salary_patterns:
-                salary_elem = element.select_one(pattern)
-                if salary_elem and salary_elem.get_text(strip=True):
+                salary_elem = select_one(element, pattern)
+                if salary_elem is not None and text_of(salary_elem):
                     field_selectors["salary"].append(pattern)
                     break
             
             # Find link
             for pattern in link_patterns:
-                link_elem = element.select_one(pattern)
-                if link_elem and link_elem.get('href'):
+                link_elem = select_one(element, pattern)
+                if link_elem is not None and link_elem.get('href'):
                     field_selectors["link"].append(pattern)
                     break
             
             # Find description
             for pattern in description_patterns:
-                desc_elem = element.select_one(pattern)
-                if desc_elem and desc_elem.get_text(strip=True):
+                desc_elem = select_one(element, pattern)
+                if desc_elem is not None and text_of(desc_elem):
                     field_selectors["description"].append(pattern)
                     break
         
@@ -677,36 +954,39 @@ class ProxyEnhancedJobScraper:
     def _get_example_text(self, element, selector):
         """Get example text from selector"""
         try:
-            elem = element.select_one(selector)
-            if elem:
-                text = elem.get_text(strip=True)
+            elem = select_one(element, selector)
+            if elem is not None:
+                text = text_of(elem)
                 return text[:100] + "..." if len(text) > 100 else text
         except:
             pass
         return None
     
-    def generate_enhanced_siteconfig(self, url):
-        """Generate enhanced siteconfig with proxy support"""
+    def _is_unsupported(self, url):
         domain = self._extract_domain(url)
         if domain in UNSUPPORTED_DOMAINS:
             self.logger.warning(f"⛔ Skipping unsupported site: {domain}")
             self.failed_sites.append(url)
+            return True
+        return False
+
+    def generate_enhanced_siteconfig(self, url):
+        """Generate enhanced siteconfig with proxy support"""
+        if self._is_unsupported(url):
             return None
         self.logger.info(f"🎯 Generating enhanced siteconfig for {url}")
         
-        # Try multiple inspection methods
-        inspection_result = None
-        
         # Method 1: Proxy-enhanced requests
-        if not inspection_result:
-            inspection_result = self.inspect_with_proxy(url, allow_fallback=False)
+        inspection_result = self.inspect_with_proxy(url, allow_fallback=False)
+        return self._complete_siteconfig(url, inspection_result)
+
+    def _complete_siteconfig(self, url, inspection_result):
+        """Blocking fallbacks (Selenium, basic requests) if needed, then build the siteconfig"""
+        domain = self._extract_domain(url)
         
         # Method 2: Selenium with proxy
         if not inspection_result and self.use_proxy:
-            if not self.driver:
-                self.driver = self._setup_chrome_driver()
-            if self.driver:
-                inspection_result = self.inspect_with_selenium_proxy(url)
+            inspection_result = self.inspect_with_selenium_proxy(url)
         
         # Method 3: Fallback to basic requests
         if not inspection_result:
@@ -784,13 +1064,15 @@ class ProxyEnhancedJobScraper:
             })
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            tree = parse_html(response.content)
+            if tree is None:
+                return None
             
             # Simple job detection
             job_patterns = ['.job', '.jobs', '.position', '[class*="job"]']
             
             for pattern in job_patterns:
-                elements = soup.select(pattern)
+                elements = select(tree, pattern)
                 if elements and len(elements) > 0:
                     return {
                         "url": url,
@@ -980,6 +1262,13 @@ class ProxyEnhancedJobScraper:
             
         ]
     def inspect_with_fallback(self, base_url):
+        async def run():
+            async with self._make_fetch_engine() as engine:
+                return await self.inspect_with_fallback_async(engine, base_url)
+
+        return asyncio.run(run())
+
+    async def inspect_with_fallback_async(self, engine, base_url):
         attempted = set()
 
         fallback_urls = self._get_alternative_urls(base_url)
@@ -991,7 +1280,7 @@ class ProxyEnhancedJobScraper:
             attempted.add(url)
             self.logger.info(f"🔁 Trying fallback URL: {url}")
 
-            result = self.inspect_with_proxy(url, allow_fallback=False)
+            result = await self.inspect_async(engine, url, allow_fallback=False)
 
             if result and result.get("total_jobs", 0) > 0:
                 self.logger.info(f"✅ Jobs found at {url}")
@@ -1004,53 +1293,155 @@ class ProxyEnhancedJobScraper:
         return None
  
     def process_sites_with_proxy(self, websites=None, max_workers=3, max_retries=2):
+        """
+        Scrape many sites concurrently
+
+        Sites with a saved siteconfig are replayed with its selectors; the
+        rest, and sites whose replay yield dropped, get a new siteconfig from
+        the full inspection. Up to SCRAPER_CONCURRENT_SITES sites are handled
+        at once over one shared async HTTP client; max_workers bounds the
+        threads used for the blocking Selenium/basic-requests fallbacks.
+        """
         if websites is None:
             websites = self.get_comprehensive_job_websites()
         
         self.logger.info(f"🚀 Processing {len(websites)} websites with proxy enhancement...")
+        return asyncio.run(self._process_sites_async(websites, max_workers, max_retries))
+
+    def iter_scraped_jobs(self, websites=None, max_workers=3, max_retries=2):
+        """
+        Scrape sites like process_sites_with_proxy, yielding job records as
+        each page is extracted
 
+        The crawl runs on a background thread and hands pages over through a
+        bounded queue (SCRAPER_JOB_QUEUE_PAGES), so a slow consumer such as
+        the database writer throttles the crawl instead of boards piling up
+        in memory. Closing the generator early cancels the crawl. Once
+        exhausted, self.last_run holds (successful_configs, failed_sites).
+        """
+        if websites is None:
+            websites = self.get_comprehensive_job_websites()
+
+        self.logger.info(f"🚀 Streaming jobs from {len(websites)} websites...")
+        pages = queue.Queue(maxsize=settings.SCRAPER_JOB_QUEUE_PAGES)
+        stopped = threading.Event()
+        done = object()
+        outcome = {}
+
+        def put(item):
+            # Gives up once the consumer has gone, so the crawl thread can exit
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+
+        async def job_sink(jobs):
+            await asyncio.to_thread(put, jobs)
+
+        async def run():
+            outcome["task"] = asyncio.current_task()
+            outcome["loop"] = asyncio.get_running_loop()
+            if stopped.is_set():
+                raise asyncio.CancelledError()
+            return await self._process_sites_async(websites, max_workers, max_retries, job_sink)
+
+        def cancel():
+            # The consumer stopped: cancel the crawl rather than let it run to the end
+            loop, task = outcome.get("loop"), outcome.get("task")
+            if loop is not None:
+                try:
+                    loop.call_soon_threadsafe(task.cancel)
+                except RuntimeError:
+                    pass  # the loop already finished
+
+        def crawl():
+            try:
+                outcome["result"] = asyncio.run(run())
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                put(done)
+
+        worker = threading.Thread(target=crawl, name="job-stream", daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = pages.get()
+                if item is done:
+                    break
+                yield from item
+        finally:
+            stopped.set()
+            cancel()
+            worker.join()
+
+        if "error" in outcome:
+            raise outcome["error"]
+        self.last_run = outcome["result"]
+
+    async def _process_sites_async(self, websites, max_workers, max_retries, job_sink=None):
         successful_configs = []
-        failed_sites = websites.copy()
+        failed_sites = list(websites)
         attempt = 0
+        site_slots = asyncio.Semaphore(settings.SCRAPER_CONCURRENT_SITES)
+        blocking_slots = asyncio.Semaphore(max_workers)
+        saved_configs = self.load_siteconfigs()
+
+        async def process_site(engine, url):
+            async with site_slots:
+                if self._is_unsupported(url):
+                    return None
+                saved = saved_configs.get(url)
+                # JS-rendered boards cannot be replayed over plain HTTP
+                if saved and not saved["scraping_config"].get("js_required"):
+                    replayed = await self.replay_async(engine, saved, job_sink=job_sink)
+                    if replayed:
+                        return replayed
+                    self.logger.info(f"🔄 Rediscovering selectors for {url}")
+                self.logger.info(f"🎯 Generating enhanced siteconfig for {url}")
+                inspection_result = await self.inspect_async(engine, url, allow_fallback=False)
+            async with blocking_slots:
+                siteconfig = await asyncio.to_thread(self._complete_siteconfig, url, inspection_result)
+            if not siteconfig:
+                return None
+
+            self.save_siteconfig(siteconfig)
+            saved_configs[url] = siteconfig
+            if siteconfig["scraping_config"].get("js_required"):
+                return siteconfig
+            # Extract this cycle's jobs with the new selectors
+            async with site_slots:
+                return await self.replay_async(engine, siteconfig, job_sink=job_sink) or siteconfig
+
+        async with self._make_fetch_engine(retries=2) as engine:
+            while failed_sites and attempt <= max_retries:
+                attempt += 1
+                self.logger.info(f"🔁 Attempt {attempt} for {len(failed_sites)} sites...")
+                current_failed = []
+
+                results = await asyncio.gather(
+                    *(process_site(engine, url) for url in failed_sites), return_exceptions=True
+                )
+                for url, config in zip(failed_sites, results):
+                    if isinstance(config, asyncio.CancelledError):
+                        # The run was cancelled, not the site: don't count it as a failure
+                        raise config
+                    if isinstance(config, Exception):
+                        current_failed.append(url)
+                        self.logger.error(f"❌ Exception for {url}: {str(config)}")
+                    elif config:
+                        successful_configs.append(config)
+                    else:
+                        current_failed.append(url)
+                        self.logger.warning(f"❌ Failed: {url}")
 
-        while failed_sites and attempt <= max_retries:
-            attempt += 1
-            self.logger.info(f"🔁 Attempt {attempt} for {len(failed_sites)} sites...")
-            current_failed = []
-
-            batch_size = max_workers
-            for i in range(0, len(failed_sites), batch_size):
-                batch = failed_sites[i:i+batch_size]
-                self.logger.info(f"📦 Processing batch {i//batch_size + 1}: {len(batch)} websites")
-
-                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    future_to_url = {executor.submit(self.generate_enhanced_siteconfig, url): url for url in batch}
-                    
-                    for future in concurrent.futures.as_completed(future_to_url):
-                        url = future_to_url[future]
-                        try:
-                            config = future.result(timeout=360)
-                            if config:
-                                successful_configs.append(config)
-
-                                # ✅ Save jobs to DB
-                                job_items = config.get("jobs", [])
-                                # saved_count = save_scraped_jobs(job_items, board_name=url)
-                                # self.logger.info(f"✅ Saved {saved_count} jobs from {url}")
-
-                                # Optional: save config if needed
-                                self.save_siteconfig(config)
-                            else:
-                                current_failed.append(url)
-                                self.logger.warning(f"❌ Failed: {url}")
-                        except Exception as e:
-                            current_failed.append(url)
-                            self.logger.error(f"❌ Exception for {url}: {str(e)}")
-
-            failed_sites = current_failed
-            if failed_sites and attempt <= max_retries:
-                self.logger.info(f"⏳ Waiting 30 seconds before retrying {len(failed_sites)} failed sites...")
-                time.sleep(30)
+                failed_sites = current_failed
+                if failed_sites and attempt <= max_retries:
+                    # No blanket pause: the scheduler already holds back the
+                    # domains that failed, everything else is retried at once
+                    self.logger.info(f"🔁 Retrying {len(failed_sites)} failed sites...")
 
         self._generate_proxy_summary_report(successful_configs, failed_sites)
         return successful_configs, failed_sites
@@ -1060,13 +1451,15 @@ class ProxyEnhancedJobScraper:
         """Save siteconfig to JSON file"""
         if not filename:
             domain = siteconfig['domain'].replace('.', '_')
-            filename = f"proxy_siteconfigs/{domain}_proxy_siteconfig.json"
+            filename = os.path.join(settings.SCRAPER_SITECONFIG_DIR, f"{domain}_proxy_siteconfig.json")
         
         # Ensure directory exists
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         
+        # Scraped jobs go to the database, not into the config
+        config = {k: v for k, v in siteconfig.items() if k not in ("jobs", "jobs_extracted", "replayed_at")}
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(siteconfig, f, indent=2, ensure_ascii=False)
+            json.dump(config, f, indent=2, ensure_ascii=False)
         
         self.logger.info(f"💾 Saved siteconfig: {filename}")
     
@@ -1170,8 +1563,9 @@ class ProxyEnhancedJobScraper:
     
     def close(self):
         """Clean up resources"""
-        if self.driver:
-            self.driver.quit()
+        self.browser_pool.close()
+        if self.page_archive is not None:
+            self.page_archive.close()
         if self.session:
             self.session.close()
 
@@ -1,4 +1,333 @@
+import re
+import time
+import threading
+import logging
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from uuid import UUID
+from sqlalchemy.orm import Session
+from app.database.models import Job, ParsedProfile, UserParsedCV
+from app.utils.keywords import KeywordAutomaton
+
+logger = logging.getLogger(__name__)
+
+# Skill terms that are not already part of the parser's industry keywords
+SKILL_TERMS = [
+    "python", "java", "c++", "javascript", "typescript", "react", "angular", "vue",
+    "node.js", "nodejs", "express", "sql", "mysql", "postgresql", "mongodb", "redis",
+    "elasticsearch", "oracle", "aws", "azure", "gcp", "docker", "kubernetes",
+    "terraform", "ansible", "jenkins", "machine learning", "ai", "data science",
+    "deep learning", "nlp", "computer vision", "html", "css", "sass", "less",
+    "bootstrap", "tailwind", "responsive design", "leadership", "communication",
+    "teamwork", "collaboration", "problem solving", "critical thinking",
+    "adaptability", "creativity", "innovation", "time management",
+    "project management", "agile", "scrum", "kanban", "waterfall", "presentation",
+    "public speaking", "negotiation", "conflict resolution", "git", "github",
+    "gitlab", "jira", "confluence", "slack", "excel", "powerpoint", "sharepoint",
+    "office 365", "photoshop", "illustrator", "figma", "sketch", "adobe xd",
+    "autocad", "solidworks",
+]
+
+# Matches the " (technical)" suffix added by prepare_for_job_matching
+_CATEGORY_SUFFIX = re.compile(r"\s*\([a-z_]+\)$")
+
+# Popcount table for numpy builds without np.bitwise_count
+_POPCOUNT_8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount_rows(words: np.ndarray) -> np.ndarray:
+    """Number of set bits per row of a packed uint64 matrix"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int32)
+    as_bytes = words.view(np.uint8).reshape(words.shape[0], -1)
+    return _POPCOUNT_8[as_bytes].sum(axis=1, dtype=np.int32)
+
+
+class SkillVocabulary:
+    """Shared term -> bit position mapping used to encode both CVs and jobs"""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted({t.lower().strip() for t in terms if t and t.strip()})
+        self.index = {term: i for i, term in enumerate(self.terms)}
+        self.words = max(1, (len(self.terms) + 63) // 64)
+
+        self._automaton = KeywordAutomaton({None: self.terms}).build()
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def extract(self, text: Optional[str]) -> List[str]:
+        """Return the vocabulary terms found in free text"""
+        if not text:
+            return []
+        # Leftmost-longest, so "machine learning" wins over "learning"
+        return sorted({m.keyword for m in self._automaton.find(text, overlapping=False)})
+
+    def term_ids(self, skills: Iterable[str]) -> np.ndarray:
+        """Map skill strings to vocabulary ids, dropping unknown ones"""
+        ids = {self.index[s] for s in (skill.lower().strip() for skill in skills) if s in self.index}
+        return np.fromiter(sorted(ids), dtype=np.int64, count=len(ids))
+
+    def encode(self, skills: Iterable[str]) -> np.ndarray:
+        """Encode a single skill list as one packed bitset row"""
+        return self.encode_many([skills])[0]
+
+    def encode_many(self, skill_lists: Sequence[Iterable[str]]) -> np.ndarray:
+        """
+        Encode many skill lists into a bit-packed (n, words) uint64 matrix
+
+        Args:
+            skill_lists: One iterable of skill strings per row
+
+        Returns:
+            Packed bitset matrix, one row per input
+        """
+        matrix = np.zeros((len(skill_lists), self.words), dtype=np.uint64)
+        rows, ids = [], []
+        for row, skills in enumerate(skill_lists):
+            term_ids = self.term_ids(skills)
+            rows.append(np.full(term_ids.shape, row, dtype=np.int64))
+            ids.append(term_ids)
+
+        if rows:
+            rows = np.concatenate(rows)
+            ids = np.concatenate(ids)
+            bits = np.left_shift(np.uint64(1), (ids & 63).astype(np.uint64))
+            np.bitwise_or.at(matrix, (rows, ids >> 6), bits)
+        return matrix
+
+    def decode(self, row: np.ndarray) -> List[str]:
+        """Turn a packed row back into its skill terms"""
+        bits = np.unpackbits(row.view(np.uint8), bitorder="little")[: len(self.terms)]
+        return [self.terms[i] for i in np.flatnonzero(bits)]
+
+
+_default_vocabulary: Optional[SkillVocabulary] = None
+
+
+def default_vocabulary() -> SkillVocabulary:
+    """Vocabulary built from the CV parser's industry keywords plus SKILL_TERMS"""
+    global _default_vocabulary
+    if _default_vocabulary is None:
+        from app.database.repositories.document_parser import UniversalResumeParser
+
+        terms = list(SKILL_TERMS)
+        for keywords in UniversalResumeParser().industry_keywords.values():
+            terms.extend(keywords)
+        _default_vocabulary = SkillVocabulary(terms)
+    return _default_vocabulary
+
+
+def extract_required_skills(description: Optional[str], vocabulary: Optional[SkillVocabulary] = None) -> List[str]:
+    """Skills a job description asks for, expressed in the shared vocabulary"""
+    return (vocabulary or default_vocabulary()).extract(description)
+
+
+def profile_skills(payload: Dict[str, Any], vocabulary: Optional[SkillVocabulary] = None) -> List[str]:
+    """
+    Collect vocabulary skills from a ParsedProfile.payload
+
+    Handles the parse_cv_task payload (skills section as text), the
+    parse_resume output (categorised skill dict) and the
+    prepare_for_job_matching output ("skill (category)" strings).
+    """
+    vocabulary = vocabulary or default_vocabulary()
+    found = set()
+
+    skills = payload.get("skills")
+    if isinstance(skills, str):
+        found.update(vocabulary.extract(skills))
+    elif isinstance(skills, dict):
+        for items in skills.values():
+            found.update(s.lower() for s in items or [])
+    elif isinstance(skills, list):
+        found.update(_CATEGORY_SUFFIX.sub("", s.lower()) for s in skills if isinstance(s, str))
+
+    found.update(vocabulary.extract(payload.get("summary") if isinstance(payload.get("summary"), str) else None))
+
+    experience = payload.get("experience")
+    if isinstance(experience, dict):
+        for entry in experience.get("entries", []):
+            found.update(vocabulary.extract(f"{entry.get('title', '')} {entry.get('description', '')}"))
+
+    return sorted(s for s in found if s in vocabulary.index)
+
+
 def hard_filter(cv, job):
     required = extract_required_skills(job["description"])
     overlap = set(required) & set(cv["skills"])
     return len(overlap) >= 2
+
+
+class JobMatchIndex:
+    """
+    Bit-packed skill matrix over the job catalogue.
+
+    Every job is one row of a (jobs, words) uint64 matrix. Scoring a CV is a
+    single AND + popcount over the whole matrix (the boolean matrix product
+    of the CV vector with the job matrix), followed by an argpartition for
+    the top-K, so there is no per-job Python work at query time.
+    """
+
+    def __init__(self, vocabulary: Optional[SkillVocabulary] = None):
+        self.vocabulary = vocabulary or default_vocabulary()
+        self.job_ids: np.ndarray = np.empty(0, dtype=object)
+        self.bits = np.zeros((0, self.vocabulary.words), dtype=np.uint64)
+        self.required = np.zeros(0, dtype=np.int32)
+        self.built_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def build(self, job_ids: Sequence[UUID], texts: Sequence[str]) -> "JobMatchIndex":
+        """Encode job texts (title + description) into the matrix"""
+        skill_lists = [self.vocabulary.extract(text) for text in texts]
+        self.job_ids = np.array(list(job_ids), dtype=object)
+        self.bits = self.vocabulary.encode_many(skill_lists)
+        self.required = _popcount_rows(self.bits)
+        self.built_at = time.time()
+        return self
+
+    @classmethod
+    def from_db(cls, db: Session, vocabulary: Optional[SkillVocabulary] = None, chunk_size: int = 5000) -> "JobMatchIndex":
+        """Build the index from every live row of the jobs table"""
+        ids, texts = [], []
+        rows = (
+            db.query(Job.id, Job.title, Job.description)
+            .filter(Job.deleted_at.is_(None), Job.is_canonical())
+            .yield_per(chunk_size)
+        )
+        for job_id, title, description in rows:
+            ids.append(job_id)
+            texts.append(f"{title or ''}\n{description or ''}")
+
+        index = cls(vocabulary).build(ids, texts)
+        logger.info(f"Built job match index: {len(index)} jobs, {len(index.vocabulary)} skills")
+        return index
+
+    def score(self, cv_bits: np.ndarray) -> np.ndarray:
+        """Skill overlap of one encoded CV with every job"""
+        if not len(self.job_ids):
+            return np.zeros(0, dtype=np.int32)
+        return _popcount_rows(self.bits & cv_bits[np.newaxis, :])
+
+    def top_k(self, skills: Iterable[str], k: int = 20, min_overlap: int = 2) -> List[Dict[str, Any]]:
+        """
+        Rank jobs for a CV skill list
+
+        Args:
+            skills: CV skills in the shared vocabulary
+            k: Number of jobs to return
+            min_overlap: Minimum shared skills for a job to qualify (same rule as hard_filter)
+
+        Returns:
+            List of {"job_id", "score", "overlap", "required"} sorted by score
+        """
+        cv_bits = self.vocabulary.encode(skills)
+        cv_count = int(_popcount_rows(cv_bits[np.newaxis, :])[0])
+        if not cv_count or not len(self.job_ids):
+            return []
+
+        overlap = self.score(cv_bits)
+        # Cosine similarity of the two binary vectors
+        scores = overlap / np.sqrt(np.maximum(self.required, 1) * cv_count)
+        scores[overlap < min_overlap] = -1.0
+
+        candidates = np.flatnonzero(scores >= 0)
+        if not len(candidates):
+            return []
+        if len(candidates) > k:
+            part = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[part]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [
+            {
+                "job_id": self.job_ids[i],
+                "score": round(float(scores[i]), 4),
+                "overlap": int(overlap[i]),
+                "required": int(self.required[i]),
+            }
+            for i in ranked
+        ]
+
+
+def encode_profiles(db: Session, vocabulary: Optional[SkillVocabulary] = None):
+    """
+    Encode every ParsedProfile.payload into the shared vocabulary
+
+    Returns:
+        (document_ids, packed bitset matrix)
+    """
+    vocabulary = vocabulary or default_vocabulary()
+    rows = db.query(ParsedProfile.document_id, ParsedProfile.payload).all()
+    document_ids = [document_id for document_id, _ in rows]
+    matrix = vocabulary.encode_many([profile_skills(payload or {}, vocabulary) for _, payload in rows])
+    return document_ids, matrix
+
+
+MATCH_INDEX_TTL = 600  # seconds, one scrape cycle
+
+_rebuild_lock = threading.Lock()
+_match_index: Optional[JobMatchIndex] = None
+
+
+def get_match_index(db: Session, max_age: int = MATCH_INDEX_TTL) -> JobMatchIndex:
+    """
+    Process-wide job index, rebuilt once it is older than max_age seconds
+
+    One caller rebuilds at a time; while it does, the others keep getting
+    the old index (they only wait when there is none yet). The new index
+    is swapped in whole, so readers never see a half-built one.
+    """
+    global _match_index
+    index = _match_index
+    if index is not None and time.time() - index.built_at <= max_age:
+        return index
+    if index is not None and not _rebuild_lock.acquire(blocking=False):
+        return index  # another request is rebuilding it
+    if index is None:
+        _rebuild_lock.acquire()
+    try:
+        # Someone may have rebuilt it while we waited for the lock
+        index = _match_index
+        if index is None or time.time() - index.built_at > max_age:
+            index = _match_index = JobMatchIndex.from_db(db)
+        return index
+    finally:
+        _rebuild_lock.release()
+
+
+def match_jobs_for_user(db: Session, user_id: UUID, k: int = 20, min_overlap: int = 2) -> List[Dict[str, Any]]:
+    """Top-K jobs for the user's current parsed CV"""
+    profile = (
+        db.query(ParsedProfile)
+        .join(UserParsedCV, UserParsedCV.document_id == ParsedProfile.document_id)
+        .filter(UserParsedCV.user_id == user_id)
+        .first()
+    )
+    if not profile:
+        return []
+
+    index = get_match_index(db)
+    matches = index.top_k(profile_skills(profile.payload or {}, index.vocabulary), k=k, min_overlap=min_overlap)
+    if not matches:
+        return []
+
+    jobs = {job.id: job for job in db.query(Job).filter(Job.id.in_([m["job_id"] for m in matches]))}
+    results = []
+    for match in matches:
+        job = jobs.get(match["job_id"])
+        if not job:
+            continue
+        results.append({
+            "job_id": str(job.id),
+            "title": job.title,
+            "company": job.company,
+            "location": job.location,
+            "url": job.url,
+            "score": match["score"],
+            "matched_skills": match["overlap"],
+            "required_skills": match["required"],
+        })
+    return results
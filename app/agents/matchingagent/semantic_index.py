@@ -0,0 +1,491 @@
+import os
+import fcntl
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+import faiss
+import numpy as np
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.utils.nlp import get_nlp, disabled_for, TOKENS
+from app.database.models import Job, ParsedProfile, UserParsedCV
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "jobs.faiss"
+META_FILE = "jobs_meta.npz"
+LOCK_FILE = "jobs.lock"
+
+# Below this many vectors an exact flat index is both faster and needs no training
+IVF_MIN_TRAIN = 20_000
+IVF_NPROBE = 16
+# Physically drop tombstoned vectors once they make up this share of the index
+COMPACT_RATIO = 0.1
+MAX_TEXT_CHARS = 2000
+# jobs.updated_at is when the writing transaction started, not when it
+# committed: each sync re-reads this much before its watermark so late
+# commits are still seen (rows already synced unchanged are skipped)
+SYNC_OVERLAP_SECONDS = 900
+
+
+def embed_texts(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Embed texts with the spaCy static word vectors (mean of token vectors)
+
+    Only the tokenizer runs; the statistical pipeline is not needed for
+    doc.vector, which keeps embedding cheap enough for the scrape cycle.
+
+    Returns:
+        (L2-normalised float32 matrix, boolean mask of rows that had a vector)
+    """
+    nlp = get_nlp()
+    dim = nlp.vocab.vectors_length
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, doc in enumerate(nlp.pipe((t[:MAX_TEXT_CHARS] for t in texts), disable=disabled_for(TOKENS))):
+        matrix[i] = doc.vector
+
+    valid = np.linalg.norm(matrix, axis=1) > 0
+    if valid.any():
+        faiss.normalize_L2(matrix)
+    return matrix, valid
+
+
+def job_text(title: Optional[str], description: Optional[str]) -> str:
+    return f"{title or ''}\n{description or ''}".strip()
+
+
+class SemanticJobIndex:
+    """
+    Persistent ANN index over job title + description embeddings.
+
+    FAISS only stores int64 labels, so each job UUID gets a sequential label
+    kept in a sidecar file. Deleted or expired jobs are tombstoned and
+    filtered at query time; they are physically removed when the index is
+    compacted. A read-only index can be memory-mapped so several worker
+    processes share the same pages. The watermark (jobs.updated_at) saved
+    with the index is how far it has caught up with the jobs table.
+    """
+
+    def __init__(self, index_dir: str = None):
+        self.index_dir = index_dir or settings.JOB_INDEX_DIR
+        self.index = None
+        self.read_only = False
+        self.next_label = 0
+        self.label_to_job: Dict[int, UUID] = {}
+        self.job_to_label: Dict[UUID, int] = {}
+        self.tombstones = set()
+        self.watermark: Optional[datetime] = None
+        self._synced: Dict[UUID, datetime] = {}  # updated_at of jobs synced within the overlap
+        self._expired_before: Optional[datetime] = None  # cutoff of the last sync_tombstones
+        self._lock = threading.RLock()
+        self._version = None  # saved files this copy matches, see writer()
+
+    def __len__(self) -> int:
+        return len(self.job_to_label)
+
+    # ------------------------------------------------------------------ build
+    def _new_index(self, vectors: np.ndarray):
+        dim = vectors.shape[1]
+        if len(vectors) >= IVF_MIN_TRAIN:
+            nlist = int(4 * np.sqrt(len(vectors)))
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            index.nprobe = IVF_NPROBE
+            return index
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+
+    def rebuild(self, db: Session, chunk_size: int = 5000) -> "SemanticJobIndex":
+        """Rebuild the whole index from the live, canonical, unexpired rows of the jobs table"""
+        watermark = _db_now(db)
+        ids, texts = [], []
+        rows = (
+            db.query(Job.id, Job.title, Job.description)
+            .filter(Job.deleted_at.is_(None), Job.is_canonical(), _unexpired(_expiry_cutoff()))
+            .yield_per(chunk_size)
+        )
+        for job_id, title, description in rows:
+            ids.append(job_id)
+            texts.append(job_text(title, description))
+
+        vectors, valid = embed_texts(texts)
+        vectors = vectors[valid]
+        ids = [job_id for job_id, ok in zip(ids, valid) if ok]
+
+        with self._lock:
+            self.index = self._new_index(vectors) if len(vectors) else None
+            self.read_only = False
+            self.next_label = 0
+            self.label_to_job, self.job_to_label = {}, {}
+            self.tombstones = set()
+            self.watermark = watermark
+            self._synced = {}
+            if len(vectors):
+                self._add_vectors(ids, vectors)
+
+        logger.info(f"Rebuilt semantic job index with {len(ids)} jobs")
+        return self
+
+    # ------------------------------------------------------------ incremental
+    def _add_vectors(self, job_ids: Sequence[UUID], vectors: np.ndarray) -> None:
+        labels = np.arange(self.next_label, self.next_label + len(job_ids), dtype=np.int64)
+        self.index.add_with_ids(vectors, labels)
+        for label, job_id in zip(labels.tolist(), job_ids):
+            self.label_to_job[label] = job_id
+            self.job_to_label[job_id] = label
+        self.next_label += len(job_ids)
+
+    def add_jobs(self, jobs: Iterable[Job]) -> int:
+        """
+        Add (or replace) jobs, typically the rows written by a scrape cycle
+
+        Returns:
+            Number of jobs embedded into the index
+        """
+        jobs = [job for job in jobs if job.deleted_at is None]
+        if not jobs:
+            return 0
+
+        vectors, valid = embed_texts([job_text(job.title, job.description) for job in jobs])
+        job_ids = [job.id for job, ok in zip(jobs, valid) if ok]
+        vectors = vectors[valid]
+        if not job_ids:
+            return 0
+
+        with self._lock:
+            if self.read_only:
+                raise RuntimeError("Semantic job index was loaded read-only (mmap)")
+            if self.index is None:
+                self.index = self._new_index(vectors)
+            # An updated job gets a new vector; the old one becomes a tombstone
+            self._tombstone([job_id for job_id in job_ids if job_id in self.job_to_label])
+            self._add_vectors(job_ids, vectors)
+        return len(job_ids)
+
+    def sync_changed(self, db: Session, chunk_size: int = 1000) -> int:
+        """
+        Catch up with the jobs table: re-embed the jobs written since the watermark
+
+        The window starts SYNC_OVERLAP_SECONDS before the watermark, so rows
+        of a transaction that committed after the previous sync are not
+        skipped; rows the overlap already synced unchanged are not embedded
+        again. Duplicates, deleted and expired jobs are tombstoned instead.
+
+        Returns:
+            Number of jobs embedded into the index
+        """
+        until = _db_now(db)
+        since = self.watermark - timedelta(seconds=SYNC_OVERLAP_SECONDS) if self.watermark else None
+        query = db.query(Job)
+        if since is not None:
+            query = query.filter(Job.updated_at >= since)
+
+        cutoff = _expiry_cutoff()
+        added, batch = 0, []
+        for job in query.yield_per(chunk_size):
+            if self._synced.get(job.id) == job.updated_at:
+                continue
+            batch.append(job)
+            if len(batch) >= chunk_size:
+                added += self._sync_batch(batch, cutoff)
+                batch = []
+        added += self._sync_batch(batch, cutoff)
+        with self._lock:
+            self.watermark = until
+            horizon = until - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+            self._synced = {job_id: at for job_id, at in self._synced.items() if at >= horizon}
+        return added
+
+    def _sync_batch(self, jobs: List[Job], cutoff: datetime) -> int:
+        # Only one copy of a cross-board duplicate is searchable
+        stale = {
+            job.id for job in jobs
+            if job.deleted_at is not None
+            or job.canonical_job_id not in (None, job.id)
+            or (job.posted_at is not None and job.posted_at < cutoff)
+        }
+        self.remove_jobs(stale)
+        added = self.add_jobs(job for job in jobs if job.id not in stale)
+        with self._lock:
+            self._synced.update((job.id, job.updated_at) for job in jobs)
+        return added
+
+    def _tombstone(self, job_ids: Iterable[UUID]) -> int:
+        count = 0
+        for job_id in job_ids:
+            label = self.job_to_label.pop(job_id, None)
+            if label is not None:
+                self.tombstones.add(label)
+                count += 1
+        return count
+
+    def remove_jobs(self, job_ids: Iterable[UUID]) -> int:
+        """Tombstone jobs so they no longer show up in search results"""
+        with self._lock:
+            return self._tombstone(job_ids)
+
+    def sync_tombstones(self, db: Session, max_age_days: int = None, chunk_size: int = 5000) -> int:
+        """
+        Tombstone indexed jobs that aged past max_age_days since the last call
+
+        Only jobs whose posted_at crossed the cutoff since the previous call
+        are read; the first call in a process checks the indexed ids
+        instead (also catching deleted ones), so neither grows with the
+        history of the table. Deletes and duplicates otherwise arrive
+        through sync_changed, as they touch updated_at.
+        """
+        cutoff = _expiry_cutoff(max_age_days)
+        if self._expired_before is not None:
+            stale = [
+                job_id for (job_id,) in
+                db.query(Job.id).filter(Job.posted_at >= self._expired_before, Job.posted_at < cutoff)
+            ]
+        else:
+            with self._lock:
+                indexed = list(self.job_to_label)
+            stale = []
+            for start in range(0, len(indexed), chunk_size):
+                stale.extend(
+                    job_id for (job_id,) in
+                    db.query(Job.id).filter(
+                        Job.id.in_(indexed[start:start + chunk_size]),
+                        or_(Job.deleted_at.isnot(None), Job.posted_at < cutoff),
+                    )
+                )
+        with self._lock:
+            self._expired_before = cutoff
+            removed = self._tombstone(job_id for job_id in stale if job_id in self.job_to_label)
+        if removed:
+            logger.info(f"Tombstoned {removed} expired/deleted jobs in semantic index")
+        return removed
+
+    def compact(self) -> int:
+        """Physically remove tombstoned vectors from the FAISS index"""
+        with self._lock:
+            if self.read_only or self.index is None or not self.tombstones:
+                return 0
+            labels = np.fromiter(self.tombstones, dtype=np.int64, count=len(self.tombstones))
+            removed = self.index.remove_ids(labels)
+            for label in labels.tolist():
+                self.label_to_job.pop(label, None)
+            self.tombstones = set()
+            return int(removed)
+
+    # ------------------------------------------------------------------ query
+    def search_vector(self, vector: np.ndarray, k: int = 20) -> List[Tuple[UUID, float]]:
+        """Nearest jobs to a normalised query vector, tombstones filtered out"""
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0:
+                return []
+            # Over-fetch so tombstoned hits do not shrink the result list
+            fetch = min(self.index.ntotal, k + len(self.tombstones))
+            scores, labels = self.index.search(vector.reshape(1, -1).astype(np.float32), fetch)
+
+            results = []
+            for score, label in zip(scores[0].tolist(), labels[0].tolist()):
+                if label < 0 or label in self.tombstones:
+                    continue
+                job_id = self.label_to_job.get(label)
+                if job_id is not None:
+                    results.append((job_id, float(score)))
+                if len(results) >= k:
+                    break
+            return results
+
+    def search_text(self, text: str, k: int = 20) -> List[Tuple[UUID, float]]:
+        vectors, valid = embed_texts([text])
+        if not valid[0]:
+            return []
+        return self.search_vector(vectors[0], k)
+
+    # ------------------------------------------------------------ persistence
+    def _saved_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(os.path.join(self.index_dir, META_FILE))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @contextmanager
+    def writer(self) -> Iterator["SemanticJobIndex"]:
+        """
+        Exclusive write access across processes sharing index_dir
+
+        Holds a lock file for the block, after reloading the index if
+        another process saved it since this copy was loaded, so concurrent
+        scrape cycles (e.g. one per gunicorn worker) never overwrite each
+        other's updates. Update and save() inside the block.
+        """
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(os.path.join(self.index_dir, LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if self._saved_version() != self._version:
+                    self.load()
+                yield self
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def save(self) -> None:
+        """Write index and sidecar atomically (temp file + rename)"""
+        with self._lock:
+            if self.read_only or self.index is None:
+                return
+            if len(self.tombstones) > COMPACT_RATIO * max(self.index.ntotal, 1):
+                self.compact()
+
+            os.makedirs(self.index_dir, exist_ok=True)
+            index_path = os.path.join(self.index_dir, INDEX_FILE)
+            meta_path = os.path.join(self.index_dir, META_FILE)
+
+            faiss.write_index(self.index, index_path + ".tmp")
+            labels = np.fromiter(self.label_to_job.keys(), dtype=np.int64, count=len(self.label_to_job))
+            uuids = np.array([self.label_to_job[l].bytes for l in labels.tolist()], dtype="S16").view(np.uint8)
+            with open(meta_path + ".tmp", "wb") as f:
+                np.savez(
+                    f,
+                    labels=labels,
+                    uuids=uuids.reshape(-1, 16),
+                    tombstones=np.fromiter(self.tombstones, dtype=np.int64, count=len(self.tombstones)),
+                    next_label=np.int64(self.next_label),
+                    watermark=np.str_(self.watermark.isoformat() if self.watermark else ""),
+                )
+            os.replace(index_path + ".tmp", index_path)
+            os.replace(meta_path + ".tmp", meta_path)
+            self._version = self._saved_version()
+
+    def load(self, mmap: bool = False) -> bool:
+        """
+        Load a saved index
+
+        Args:
+            mmap: Memory-map the vectors read-only instead of reading them into RAM.
+                  Use in query-only processes; writers must load without mmap.
+
+        Returns:
+            False when no saved index exists
+        """
+        index_path = os.path.join(self.index_dir, INDEX_FILE)
+        meta_path = os.path.join(self.index_dir, META_FILE)
+        if not (os.path.exists(index_path) and os.path.exists(meta_path)):
+            return False
+
+        flags = 0
+        if mmap:
+            flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+
+        with self._lock:
+            self.index = faiss.read_index(index_path, flags)
+            if isinstance(self.index, faiss.IndexIVF):
+                self.index.nprobe = IVF_NPROBE
+            self.read_only = mmap
+
+            meta = np.load(meta_path)
+            labels = meta["labels"].tolist()
+            uuids = meta["uuids"]
+            self.label_to_job = {label: UUID(bytes=uuids[i].tobytes()) for i, label in enumerate(labels)}
+            self.tombstones = set(meta["tombstones"].tolist())
+            self.job_to_label = {
+                job_id: label for label, job_id in self.label_to_job.items() if label not in self.tombstones
+            }
+            self.next_label = int(meta["next_label"])
+            # Saved before watermarks: catch up from the start of the table
+            watermark = str(meta["watermark"]) if "watermark" in meta.files else ""
+            self.watermark = datetime.fromisoformat(watermark) if watermark else None
+            self._version = self._saved_version()
+        return True
+
+
+_index_lock = threading.Lock()
+_semantic_index: Optional[SemanticJobIndex] = None
+
+
+def get_semantic_index(mmap: bool = False) -> SemanticJobIndex:
+    """Process-wide semantic index, loaded from JOB_INDEX_DIR on first use"""
+    global _semantic_index
+    with _index_lock:
+        if _semantic_index is None:
+            index = SemanticJobIndex()
+            index.load(mmap=mmap)
+            _semantic_index = index
+        return _semantic_index
+
+
+def _db_now(db: Session) -> datetime:
+    """Database time, which jobs.updated_at is stamped with"""
+    return db.query(func.localtimestamp()).scalar()
+
+
+def _expiry_cutoff(max_age_days: int = None) -> datetime:
+    return datetime.now() - timedelta(days=max_age_days or settings.JOB_MAX_AGE_DAYS)
+
+
+def _unexpired(cutoff: datetime):
+    return or_(Job.posted_at.is_(None), Job.posted_at >= cutoff)
+
+
+def index_changed_jobs(db: Session) -> None:
+    """Scrape-cycle hook: embed jobs changed since the last sync, tombstone stale ones, persist"""
+    index = get_semantic_index()
+    if index.read_only:
+        return
+    try:
+        with index.writer():
+            added = index.sync_changed(db)
+            index.sync_tombstones(db)
+            index.save()
+        logger.info(f"Semantic job index: +{added} jobs, {len(index)} live")
+    except Exception as e:
+        logger.error(f"Semantic job index update failed: {e}")
+
+
+def profile_text(payload: Dict[str, Any]) -> str:
+    """Text used to embed a parsed CV for "jobs like my CV" queries"""
+    parts = []
+    for key in ("summary", "skills"):
+        value = payload.get(key)
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, list):
+            parts.append(" ".join(str(v) for v in value))
+        elif isinstance(value, dict):
+            parts.extend(" ".join(v) for v in value.values() if isinstance(v, list))
+    experience = payload.get("experience")
+    if isinstance(experience, dict):
+        for entry in experience.get("entries", []):
+            parts.append(f"{entry.get('title', '')} {entry.get('description', '')}")
+    return "\n".join(p for p in parts if p)
+
+
+def similar_jobs_for_user(db: Session, user_id: UUID, k: int = 20) -> List[Dict[str, Any]]:
+    """Jobs semantically closest to the user's current parsed CV"""
+    profile = (
+        db.query(ParsedProfile)
+        .join(UserParsedCV, UserParsedCV.document_id == ParsedProfile.document_id)
+        .filter(UserParsedCV.user_id == user_id)
+        .first()
+    )
+    if not profile:
+        return []
+
+    hits = get_semantic_index().search_text(profile_text(profile.payload or {}), k)
+    if not hits:
+        return []
+
+    jobs = {job.id: job for job in db.query(Job).filter(Job.id.in_([job_id for job_id, _ in hits]))}
+    return [
+        {
+            "job_id": str(job_id),
+            "title": jobs[job_id].title,
+            "company": jobs[job_id].company,
+            "location": jobs[job_id].location,
+            "url": jobs[job_id].url,
+            "similarity": round(score, 4),
+        }
+        for job_id, score in hits
+        if job_id in jobs
+    ]
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import Dict, Optional
@@ -7,45 +7,53 @@ from app.utils import dbSession, apiResponse
 from app.database.repositories import (
     get_current_user, user_uploads, update_document, 
     add_supporting_doc, delete_document, list_user_documents, 
-    get_document
+    get_document, get_parse_status, discard_stored
     )
 
 router = APIRouter()
 
-from fastapi import BackgroundTasks
-
 @router.post("/upload")
 def upload_documents(
-    background: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     cv: UploadFile = File(...),
     cover_letter: UploadFile = File(...),
     supporting: Optional[UploadFile] = File(None),
     db: Session = Depends(dbSession),
 ):
-    from app.database.repositories import parse_cv_task
+    from app.workers import enqueue_cv_parse
     # 1. save files (your existing helper)
-    saved = user_uploads(user_id=current_user.id,
+    saved = user_uploads(db, user_id=current_user.id,
                         file_map={"cv": cv, "cover_letter": cover_letter}
                                 | ({"supporting_document": supporting} if supporting else {}))
 
     docs_out = []
-    for meta in saved:
-        doc = Document(
-            user_id=current_user.id,
-            file_name=meta["original_name"],
-            file_type=meta["file_type"],
-            file_path=meta["file_path"],
-        )
-        db.add(doc)
-        db.flush()          # get doc.id without commit
-        docs_out.append(doc)
-
-        # 2. schedule parsing **only for CV**
+    try:
+        for meta in saved:
+            doc = Document(
+                user_id=current_user.id,
+                file_name=meta["original_name"],
+                file_type=meta["file_type"],
+                file_path=meta["file_path"],
+                content_hash=meta["content_hash"],
+            )
+            db.add(doc)
+            db.flush()          # get doc.id without commit
+            docs_out.append(doc)
+
+            # 2. mark for parsing **only for CV**
+            if doc.file_type == "cv":
+                doc.parse_status = "queued"
+
+        db.commit()
+    except Exception:
+        # No row will reference the stored blobs
+        discard_stored(db, saved)
+        raise
+
+    # 3. hand CVs to the parsing workers once the rows are visible to them
+    for doc in docs_out:
         if doc.file_type == "cv":
-            background.add_task(parse_cv_task, current_user.id, doc.id, doc.file_path)
-
-    db.commit()
+            enqueue_cv_parse(doc.id)
 
     return apiResponse(
         "success",
@@ -53,19 +61,18 @@ def upload_documents(
         [{"document_id": str(d.id),
           "file_name": d.file_name,
           "file_type": d.file_type,
+          "parse_status": d.parse_status,
           "is_parsed": bool(d.parsed_profile)} for d in docs_out]
     )
 
 @router.put("/document/{doc_id}")
-async def change_document(
+def change_document(
     doc_id: UUID,
-    background: BackgroundTasks,
     new_file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(dbSession),
 ):
     data = update_document(
-        background,
         db=db,
         doc_id=doc_id,
         user_id=current_user.id,
@@ -75,7 +82,7 @@ async def change_document(
 
 
 @router.post("/supporting")
-async def upsert_supporting_documents(
+def upsert_supporting_documents(
     current_user: User = Depends(get_current_user),
     file: UploadFile | None = File(None),   # None = remove supporting
     db: Session = Depends(dbSession),
@@ -85,7 +92,7 @@ async def upsert_supporting_documents(
 
 
 @router.delete("/document/{doc_id}")
-async def remove_document(
+def remove_document(
     doc_id: UUID,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(dbSession),
@@ -112,6 +119,17 @@ async def fetch_document(
     return apiResponse("success", None, meta)
 
 
+@router.get("/document/{doc_id}/parse-status")
+def fetch_parse_status(
+    doc_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(dbSession),
+):
+    """Where a CV is in the parsing queue: queued, parsing, parsed or failed."""
+    data = get_parse_status(db, doc_id, current_user.id)
+    return apiResponse("success", None, data)
+
+
 @router.get("/parsed-profile")
 def get_matching_payload(
     current_user: User = Depends(get_current_user),
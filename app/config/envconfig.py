@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import ClassVar, Dict
+from typing import ClassVar, Dict, Optional
 
 class Settings(BaseSettings):
     APP_NAME: str
@@ -46,6 +46,122 @@ class Settings(BaseSettings):
     SCRAPEOPS_API_KEY: str
     SCRAPEOPS_PROXY_ENABLED: bool=True
 
+    SCRAPER_CONCURRENT_SITES: int = Field(
+        default=25,
+        description="Sites inspected at once by one scraper process"
+    )
+    SCRAPER_PER_DOMAIN_CONCURRENCY: int = 4
+    SCRAPER_DOMAIN_RATE: float = Field(
+        default=2.0,
+        description="Requests per second per domain (token bucket refill rate)"
+    )
+    SCRAPER_DOMAIN_BURST: int = 4
+    SCRAPER_OBEY_ROBOTS: bool = True
+    SCRAPER_MAX_CONNECTIONS: int = 100
+    SCRAPER_RATE_LIMIT: float = Field(
+        default=20.0,
+        description="Requests per second across all domains, per scraper process"
+    )
+    SCRAPER_HTTP_CACHE_DIR: str = Field(
+        default="cache/http",
+        description="ETag/Last-Modified cache of listing pages and their analysis"
+    )
+    SCRAPER_SITECONFIG_DIR: str = "proxy_siteconfigs"
+    SCRAPER_ARCHIVE_DIR: str = Field(
+        default="",
+        description="zstd segment archive of fetched pages for offline replay (e.g. archive/pages); empty disables it"
+    )
+    SCRAPER_ARCHIVE_SEGMENT_MB: int = 256
+    SCRAPER_ARCHIVE_RETENTION_DAYS: int = Field(
+        default=14,
+        description="Archive segments not written to for this long are deleted; 0 keeps them all"
+    )
+    SCRAPER_JOB_QUEUE_PAGES: int = Field(
+        default=50,
+        description="Extracted pages buffered between the crawl and the job writer"
+    )
+    SCRAPER_BROWSER_POOL_SIZE: int = Field(
+        default=2,
+        description="Headless Chrome instances for JS-rendered boards, per scraper process"
+    )
+    SCRAPER_BROWSER_MAX_PAGES: int = Field(
+        default=50,
+        description="Pages a browser serves before it is quit and replaced"
+    )
+    SCRAPER_BROWSER_BLOCK_RESOURCES: bool = True
+    SCRAPER_BROWSER_CAPTURE_REQUESTS: bool = False
+    SCRAPER_FRONTIER_REVISIT_MINUTES: int = Field(
+        default=10,
+        description="Revisit interval of a board's first page; page n of its pagination waits n times longer"
+    )
+    SCRAPER_FRONTIER_MAX_FAILURES: int = 5
+    SCRAPER_CYCLE_MINUTES: int = Field(
+        default=10,
+        description="How often each board is scraped"
+    )
+    SCRAPER_WORKER_PROCESSES: int = Field(
+        default=0,
+        description="Scraper worker processes started by start_scraper_scheduler; 0 keeps the single in-process cycle"
+    )
+    SCRAPER_LEASE_SECONDS: int = Field(
+        default=900,
+        description="Lifetime of a worker's claim on a board; renewed while it works, so a crashed worker's boards free up after this"
+    )
+    SCRAPER_LEASE_BATCH: int = Field(
+        default=5,
+        description="Boards a worker claims at a time"
+    )
+    SCRAPER_REPLAY_MIN_YIELD: float = Field(
+        default=0.5,
+        description="Replayed selectors must find this fraction of the jobs originally detected, else the site is re-inspected"
+    )
+
+    NLP_MODEL: str = "en_core_web_md"
+    NLP_FALLBACK_MODEL: str = "en_core_web_sm"
+    NLP_PRELOAD: bool = Field(
+        default=False,
+        description="Load the spaCy model in the gunicorn master so workers share it copy-on-write"
+    )
+
+    JOB_INDEX_DIR: str = Field(
+        default="indexes/jobs",
+        description="Directory holding the FAISS semantic job index"
+    )
+    JOB_DEDUP_THRESHOLD: float = Field(
+        default=0.7,
+        description="Estimated Jaccard similarity (MinHash) above which two scraped jobs are the same posting"
+    )
+    JOB_MAX_AGE_DAYS: int = Field(
+        default=60,
+        description="Jobs posted longer ago than this are tombstoned in the semantic index"
+    )
+
+    BLOB_STORE: str = Field("local", pattern="^(local|s3)$")
+    BLOB_STORE_ROOT: str = Field(
+        default="uploaded_files",
+        description="Local blob directory; with BLOB_STORE=s3, staging and download cache"
+    )
+    BLOB_S3_BUCKET: str = ""
+    BLOB_S3_PREFIX: str = "documents"
+    BLOB_S3_ENDPOINT_URL: Optional[str] = Field(
+        default=None,
+        description="Endpoint of an S3-compatible service (e.g. MinIO); None for AWS"
+    )
+    MAX_UPLOAD_BYTES: int = Field(
+        default=10 * 1024 * 1024,
+        description="Largest accepted document upload"
+    )
+
+    CELERY_BROKER_URL: str = Field(
+        default="redis://localhost:6379/0",
+        description="Broker for the CV parsing worker queue"
+    )
+    PARSE_MAX_RETRIES: int = 3
+    PARSE_STALE_AFTER_MINUTES: int = Field(
+        default=15,
+        description="A CV stuck in 'parsing' this long (e.g. worker killed) may be claimed again"
+    )
+
 
     @property
     def is_production(self):
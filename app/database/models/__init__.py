@@ -1,4 +1,4 @@
-from .document import Document, ParsedProfile, UserParsedCV
+from .document import Document, ParsedProfile, UserParsedCV, ParseCache
 from .user import Permission, Role, User
 from .user_otp import UserOtp, OtpTypeEnum
-from .scraped_jobs import Job
\ No newline at end of file
+from .scraped_jobs import Job, JobLshBand, CrawlFrontier, ScrapeLease
\ No newline at end of file
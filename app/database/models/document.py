@@ -1,6 +1,6 @@
 # app/models/document.py
 from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy import Column, String, JSON, DateTime, Boolean, Float
+from sqlalchemy import Column, String, JSON, DateTime, Boolean, Float, Text
 from sqlalchemy.orm import relationship
 from app.database import Base
 from sqlalchemy.sql import func
@@ -17,6 +17,10 @@ class Document(Base):
     file_name           = Column(String, nullable=False)
     file_type           = Column(String, nullable=False, index=True)  # 'cv', 'cover_letter', 'certificate'
     file_path           = Column(String, nullable=False)  # path on disk or cloud
+    content_hash        = Column(String(64), nullable=True, index=True)  # sha256 of the file bytes
+    parse_status        = Column(String, nullable=True, index=True)  # 'queued', 'parsing', 'parsed', 'failed'; CVs only
+    parse_error         = Column(Text, nullable=True)
+    parse_started_at    = Column(DateTime, nullable=True)
 
     user                = relationship("User", back_populates="documents")
     parsed_profile      = relationship("ParsedProfile", back_populates="document", uselist=False, cascade="all, delete-orphan",)
@@ -44,3 +48,12 @@ class UserParsedCV(Base):
 
     document            = relationship("Document", backref="current_parse")
 
+
+
+class ParseCache(Base):
+    __tablename__ = "parse_cache"
+
+    content_hash        = Column(String(64), primary_key=True)      # sha256 of the file bytes
+    parser_version      = Column(String, primary_key=True)
+    payload             = Column(JSONB, nullable=False)             # ParsedProfile.payload for that file
+    created_at          = Column(DateTime, default=func.now())
@@ -1,11 +1,11 @@
 # app/models/document.py
 from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy import Column, String, JSON, DateTime, Boolean, Float, Text
+from sqlalchemy import Column, String, JSON, DateTime, Boolean, Float, Text, LargeBinary, BigInteger, or_
 from sqlalchemy.orm import relationship
 from app.database import Base
 from sqlalchemy.sql import func
 from sqlalchemy import DateTime
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
 import uuid
 
@@ -22,4 +22,50 @@ class Job(Base):
     board       = Column(String, index=True)  # "remote_ok", "github", etc.
     posted_at     = Column(DateTime)
     raw_payload   = Column(JSONB)           # full ad as json
-    created_at    = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    created_at    = Column(DateTime, server_default=func.now())
+    updated_at    = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now(), index=True)  # semantic index watermark
+    minhash       = Column(LargeBinary)     # MinHash signature of title + company + description
+    canonical_job_id = Column(PG_UUID(as_uuid=True), ForeignKey("jobs.id", ondelete="SET NULL"), index=True)  # first-seen copy of a cross-board duplicate; own id if none
+
+    @classmethod
+    def is_canonical(cls):
+        """Filter keeping one job per cluster of cross-board duplicates"""
+        return or_(cls.canonical_job_id.is_(None), cls.canonical_job_id == cls.id)
+
+
+class JobLshBand(Base):
+    __tablename__ = "job_lsh_bands"
+
+    bucket        = Column(BigInteger, primary_key=True)     # MinHash LSH band key (see app.utils.minhash)
+    job_id        = Column(PG_UUID(as_uuid=True), ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+class CrawlFrontier(Base):
+    __tablename__ = "crawl_frontier"
+    __table_args__ = (
+        Index("ix_crawl_frontier_board_due", "board", "next_due_at"),
+    )
+
+    board           = Column(String, primary_key=True)      # base_url of the site the page belongs to
+    url             = Column(String, primary_key=True)
+    depth           = Column(Integer, nullable=False, default=0)   # pagination hops from the board's base_url
+    next_due_at     = Column(DateTime, nullable=False, server_default=func.now())
+    last_fetched_at = Column(DateTime)
+    last_status     = Column(Integer)                       # HTTP status, NULL for network errors
+    failures        = Column(Integer, nullable=False, default=0)   # consecutive failed fetches
+    discovered_at   = Column(DateTime, server_default=func.now())
+
+
+class ScrapeLease(Base):
+    __tablename__ = "scrape_leases"
+    __table_args__ = (
+        Index("ix_scrape_leases_due", "next_due_at"),
+    )
+
+    board           = Column(String, primary_key=True)      # base_url from get_comprehensive_job_websites
+    owner           = Column(String)                        # "host:pid" of the worker scraping it, NULL when free
+    leased_until    = Column(DateTime)                      # claim expires here unless the worker renews it
+    next_due_at     = Column(DateTime, nullable=False, server_default=func.now())
+    last_started_at = Column(DateTime)
+    last_finished_at = Column(DateTime)
+    failures        = Column(Integer, nullable=False, default=0)   # consecutive failed scrapes
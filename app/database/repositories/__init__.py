@@ -1,6 +1,6 @@
 from .user_document import (
     user_uploads, update_document, add_supporting_doc, delete_document,
-    list_user_documents, get_document
+    list_user_documents, get_document, get_parse_status, discard_stored
     )
 # from .permission import require_admin, require_superadmin
 from .document_parser import parse_cv_task
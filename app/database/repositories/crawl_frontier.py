@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import case, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database.models import CrawlFrontier
+
+# A page fetched a little into the previous cycle is still due at the same
+# point of this one, instead of slipping a whole cycle
+DUE_GRACE = timedelta(minutes=1)
+
+
+def due_pages(db: Session, board: str, limit: int, exclude: Sequence[str] = (), now: Optional[datetime] = None) -> List[Tuple[str, int]]:
+    """
+    Pages of a board that are due for a fetch, shallowest first
+
+    The board's base_url is seeded at depth 0 the first time it is seen, so
+    a new board starts from page 1 and an interrupted crawl resumes with
+    whatever it had not reached. A base_url dropped before roots were kept
+    (nothing links back to it) is revived here.
+
+    Returns:
+        [(url, depth), ...] of at most limit pages not in exclude
+    """
+    now = now or datetime.utcnow()
+    db.execute(
+        pg_insert(CrawlFrontier)
+        .values(board=board, url=board, depth=0, failures=0, next_due_at=now)
+        .on_conflict_do_update(
+            index_elements=[CrawlFrontier.board, CrawlFrontier.url],
+            set_={"deleted_at": None, "failures": 0, "next_due_at": now},
+            where=CrawlFrontier.deleted_at.isnot(None),
+        )
+    )
+    db.commit()
+
+    query = db.query(CrawlFrontier.url, CrawlFrontier.depth).filter(
+        CrawlFrontier.board == board,
+        CrawlFrontier.deleted_at.is_(None),
+        CrawlFrontier.next_due_at <= now + DUE_GRACE,
+    )
+    if exclude:
+        query = query.filter(CrawlFrontier.url.notin_(list(exclude)))
+    return [(row.url, row.depth) for row in query.order_by(CrawlFrontier.depth, CrawlFrontier.url).limit(limit)]
+
+
+def record_pages(db: Session, board: str, fetched: Iterable[Tuple[str, Optional[int], bool]],
+                 discovered: Iterable[Tuple[str, int]], now: Optional[datetime] = None) -> None:
+    """
+    Store the outcome of one crawl level
+
+    Args:
+        fetched: (url, HTTP status or None, ok) per fetched page. Successful
+                 pages are due again after SCRAPER_FRONTIER_REVISIT_MINUTES
+                 times (depth + 1), as deep pages change least. Failures back
+                 off exponentially and a page failing
+                 SCRAPER_FRONTIER_MAX_FAILURES times in a row is dropped,
+                 except the board's base_url (depth 0), which only keeps
+                 backing off: nothing would ever bring it back.
+        discovered: (url, depth) of pagination links; new ones are due now,
+                    dropped ones are revived
+    """
+    now = now or datetime.utcnow()
+    revisit = timedelta(minutes=settings.SCRAPER_FRONTIER_REVISIT_MINUTES)
+
+    for url, status, ok in fetched:
+        row = db.query(CrawlFrontier).filter(CrawlFrontier.board == board, CrawlFrontier.url == url).first()
+        if row is None:
+            continue
+        row.last_fetched_at = now
+        row.last_status = status
+        if ok:
+            row.failures = 0
+            row.next_due_at = now + revisit * (row.depth + 1)
+        else:
+            row.failures += 1
+            row.next_due_at = now + revisit * 2 ** min(row.failures, 6)
+            if row.depth > 0 and row.failures >= settings.SCRAPER_FRONTIER_MAX_FAILURES:
+                row.deleted_at = now
+
+    rows = {url: depth for url, depth in discovered}
+    if rows:
+        stmt = pg_insert(CrawlFrontier).values([
+            {"board": board, "url": url, "depth": depth, "failures": 0, "next_due_at": now}
+            for url, depth in rows.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CrawlFrontier.board, CrawlFrontier.url],
+            set_={
+                # A shorter path to a known page wins; a dropped page linked again comes back
+                "depth": case((stmt.excluded.depth < CrawlFrontier.depth, stmt.excluded.depth), else_=CrawlFrontier.depth),
+                "deleted_at": None,
+                "failures": case((CrawlFrontier.deleted_at.isnot(None), 0), else_=CrawlFrontier.failures),
+                "next_due_at": case((CrawlFrontier.deleted_at.isnot(None), now), else_=CrawlFrontier.next_due_at),
+            },
+            where=or_(CrawlFrontier.deleted_at.isnot(None), stmt.excluded.depth < CrawlFrontier.depth),
+        )
+        db.execute(stmt)
+    db.commit()
+
+
+class DbFrontier:
+    """
+    Crawl frontier backed by the crawl_frontier table, for the scraper
+
+    Each call uses its own short-lived session, so it can be called from the
+    scraper's worker threads (asyncio.to_thread).
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+
+    def due(self, board: str, limit: int, exclude: Sequence[str] = ()) -> List[Tuple[str, int]]:
+        db = self.session_factory()
+        try:
+            return due_pages(db, board, limit, exclude)
+        finally:
+            db.close()
+
+    def record(self, board: str, fetched: Iterable[Tuple[str, Optional[int], bool]], discovered: Iterable[Tuple[str, int]]) -> None:
+        db = self.session_factory()
+        try:
+            record_pages(db, board, fetched, discovered)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -1,25 +1,72 @@
 import re
-import spacy
 import pypdfium2 as pdfium
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Iterator
 from collections import Counter
+from itertools import chain, islice
 import docx
 from datetime import datetime
 import io
 import os
+import hashlib
 # services/document_parser_service.py
-from typing import Dict, Any
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import datetime
 from uuid import UUID
 from app.utils import dbSession
-from app.database.models import Document, ParsedProfile, UserParsedCV
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_md")
-except:
-    # Fallback to small model if medium is not available
-    nlp = spacy.load("en_core_web_sm")
+from app.utils.nlp import get_nlp, disabled_for, NER, NOUN_CHUNKS, LEMMAS
+from app.utils.keywords import KeywordAutomaton, KeywordMatch
+from app.utils.blobstore import get_blob_store
+from app.database.models import Document, ParsedProfile, UserParsedCV, ParseCache
+
+
+class ParseContext:
+    """
+    A CV being parsed: cleaned text, its sections and one spaCy Doc.
+
+    The Doc is built once for the whole cleaned text; name, location,
+    noun-chunk and lemma extraction read spans of it instead of
+    re-tokenising slices of the same text.
+    """
+
+    def __init__(self, file_path: str, text: str, sections: Dict[str, Any],
+                 section_spans: Dict[str, Tuple[int, int]]):
+        self.file_path = file_path
+        self.text = text
+        self.sections = sections
+        self.section_spans = section_spans
+        self.doc = None
+
+    def span(self, section: str):
+        """Doc span covering a section, or None if the section was not found"""
+        if self.doc is None or section not in self.section_spans:
+            return None
+        start, end = self.section_spans[section]
+        return self.doc.char_span(start, end, alignment_mode="expand")
+
+    def within(self, section: str, matches: List[KeywordMatch]) -> List[KeywordMatch]:
+        """Keyword matches that fall inside a section"""
+        if section not in self.section_spans:
+            return []
+        start, end = self.section_spans[section]
+        return [m for m in matches if m.start >= start and m.end <= end]
+
+    def keyword_tokens(self):
+        """Tokens of the summary and experience sections (lemma keywords)"""
+        return chain(*(span for span in (self.span("summary"), self.span("experience")) if span is not None))
+
+# Longest line still considered a candidate section header
+MAX_HEADER_LENGTH = 40
+
+# Limits for PDF text extraction; a CV is rarely more than a few pages, a
+# portfolio uploaded as a CV can be dozens
+MAX_PDF_PAGES = 10
+MAX_TEXT_CHARS = 60_000
+
+# Once these section headers have been seen, one more page is read and the
+# rest of the PDF is skipped
+REQUIRED_SECTIONS = ("experience", "education", "skills")
+
 
 class UniversalResumeParser:
     def __init__(self, use_advanced_parsing: bool = True):
@@ -31,19 +78,22 @@ class UniversalResumeParser:
         """
         self.use_advanced_parsing = use_advanced_parsing
         
-        # Common section headers across different professions
+        # Common section headers across different professions. Each pattern
+        # must match a whole header line; they are combined into one regex
+        # in _compile_section_header().
         self.section_patterns = {
-            "contact": r"(?i)^(?:contact\s*(?:info|details)?|personal\s*(?:info|details)|contact)$",
-            "summary": r"(?i)(summary|profile\s*summary|about|overview)",
-            "skills": r"(?i)(skills|skill\s*set|soft\s*skill|tech\s*skill|tech\s*stack|competencies|expertise|technical\s*skills|proficiencies|)",
-            "experience": r"(?i)(experience|work\s*experience|employment|professional)",
-            "education": r"(?i)^(?:education|qualifications|academic\s*background|degrees)$",
-            "certifications": r"(?i)^(?:certifications|licenses|certificates|professional\s*certifications)$",
-            "projects": r"(?i)^(?:projects|portfolio|selected\s*projects|project\s*experience)$",
-            "languages": r"(?i)^(?:languages|language\s*skills)$",
-            "awards": r"(?i)^(?:awards|honors|achievements|recognition)$",
-            "interests": r"(?i)^(?:interests|hobbies|personal\s*interests)$", 
+            "contact": r"contact(?:\s*(?:info(?:rmation)?|details))?|personal\s*(?:info(?:rmation)?|details)",
+            "summary": r"(?:profile\s*|professional\s*|career\s*)?summary|profile|about(?:\s*me)?|overview|(?:career\s*)?objective",
+            "skills": r"(?:technical\s*|tech\s*|soft\s*|core\s*|key\s*)?skills?|skill\s*set|tech\s*stack|(?:core\s*)?competencies|expertise|proficiencies",
+            "experience": r"(?:work\s*|professional\s*)?experience|employment(?:\s*history)?|work\s*history|professional",
+            "education": r"education|qualifications|academic\s*background|degrees",
+            "certifications": r"certifications|licenses|certificates|professional\s*certifications",
+            "projects": r"projects|portfolio|selected\s*projects|project\s*experience",
+            "languages": r"languages|language\s*skills",
+            "awards": r"awards|honors|achievements|recognition",
+            "interests": r"interests|hobbies|personal\s*interests",
         }
+        self.section_header = self._compile_section_header()
         
         # Industry-specific keywords for better categorization
         self.industry_keywords = {
@@ -172,6 +222,53 @@ class UniversalResumeParser:
             ]
         }
         
+        # Skill vocabularies used by extract_skills
+        self.skill_keywords = {
+            "technical": [
+                "python", "java", "c++", "javascript", "typescript", "react", "angular", "vue", "node.js", "nodejs", "express",
+                "sql", "mysql", "postgresql", "mongodb", "redis", "elasticsearch", "oracle",
+                "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "ansible", "jenkins",
+                "machine learning", "ai", "data science", "deep learning", "nlp", "computer vision",
+                "html", "css", "sass", "less", "bootstrap", "tailwind", "responsive design"
+            ],
+            "soft": [
+                "leadership", "communication", "teamwork", "collaboration", "problem solving",
+                "critical thinking", "adaptability", "creativity", "innovation", "time management",
+                "project management", "agile", "scrum", "kanban", "waterfall",
+                "presentation", "public speaking", "negotiation", "conflict resolution"
+            ],
+            "tools": [
+                "git", "github", "gitlab", "jira", "confluence", "slack", "teams", "zoom", "notion",
+                "excel", "word", "powerpoint", "outlook", "sharepoint", "office 365",
+                "photoshop", "illustrator", "figma", "sketch", "adobe xd", "autocad", "solidworks"
+            ],
+            "languages": [
+                "english", "spanish", "french", "german", "chinese", "mandarin", "japanese", "korean", "arabic", "hindi"
+            ]
+        }
+        
+        # Certifications, reported as written here
+        self.certifications = [
+            "AWS Certified", "Azure Certified", "Google Cloud Certified",
+            "PMP", "PMI", "Scrum Master", "CSM", "PSM", "SAFe",
+            "CPA", "CFA", "FRM",
+            "Series 3", "Series 6", "Series 7", "Series 24", "Series 63", "Series 65", "Series 66", "Series 79",
+            "CISSP", "CEH", "Security+", "Network+", "A+"
+        ]
+        
+        # Industry, skill and certification keywords in one automaton, so a
+        # single scan of the CV yields every hit
+        self.keyword_automaton = KeywordAutomaton()
+        for industry, keywords in self.industry_keywords.items():
+            for keyword in keywords:
+                self.keyword_automaton.add(keyword, ("industry", industry))
+        for category, keywords in self.skill_keywords.items():
+            for keyword in keywords:
+                self.keyword_automaton.add(keyword, ("skill", category))
+        for cert in self.certifications:
+            self.keyword_automaton.add(cert, ("certification", None))
+        self.keyword_automaton.build()
+        
         # Education degree patterns
         self.degree_patterns = {
             "phd": r"\b(ph\.?d\.?|doctorate|doctoral)\b",
@@ -203,18 +300,8 @@ class UniversalResumeParser:
         
         try:
             if file_ext == '.pdf':
-                # Use pypdfium2 for PDF extraction
-                pdf = pdfium.PdfDocument(file_path)
-                
-                # Extract text from all pages
-                for i in range(len(pdf)):
-                    page = pdf[i]
-                    textpage = page.get_textpage()
-                    page_text = textpage.get_text_range()
-                    text += page_text + "\n"
-                
-                # Close the document
-                pdf.close()
+                # Use pypdfium2 for PDF extraction, page by page
+                text = self._read_pdf_pages(file_path)
                 
             elif file_ext == '.docx':
                 doc = docx.Document(file_path)
@@ -235,16 +322,76 @@ class UniversalResumeParser:
         
         return text
     
-    def _fallback_pdf_extraction(self, file_path: str) -> str:
-        """Fallback method for PDF extraction"""
+    def iter_pdf_pages(self, file_path: str, max_pages: int = MAX_PDF_PAGES) -> Iterator[str]:
+        """
+        Yield the text of each PDF page, releasing pdfium handles as it goes
+        
+        Args:
+            file_path: Path to the PDF
+            max_pages: Pages to read at most
+            
+        Yields:
+            Text of one page
+        """
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            for i in range(min(len(pdf), max_pages)):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                try:
+                    page_text = textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
+                yield page_text
+        finally:
+            pdf.close()
+    
+    def _read_pdf_pages(self, file_path: str, max_pages: int = MAX_PDF_PAGES,
+                        max_chars: int = MAX_TEXT_CHARS) -> str:
+        """
+        Text of a PDF, stopping early when enough has been read
+        
+        Reading stops at max_pages or max_chars, or one page after every
+        REQUIRED_SECTIONS header has been seen.
+        """
+        pages, chars = [], 0
+        missing = set(REQUIRED_SECTIONS)
+        complete = False
+        
+        pages_iter = self.iter_pdf_pages(file_path, max_pages)
+        try:
+            for page_text in pages_iter:
+                page_text = page_text[:max_chars - chars]
+                pages.append(page_text)
+                chars += len(page_text) + 1
+                if chars >= max_chars or complete:
+                    break
+                
+                missing.difference_update(
+                    self.section_of(line.strip()) for line in page_text.splitlines()
+                )
+                complete = not missing
+        finally:
+            pages_iter.close()  # release the document now, not at garbage collection
+        
+        return "\n".join(pages) + "\n" if pages else ""
+    
+    def _fallback_pdf_extraction(self, file_path: str, max_pages: int = MAX_PDF_PAGES,
+                                 max_chars: int = MAX_TEXT_CHARS) -> str:
+        """Fallback method for PDF extraction, capped like _read_pdf_pages"""
         try:
             import PyPDF2
             with open(file_path, 'rb') as file:
                 reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+                pages, chars = [], 0
+                for page in islice(reader.pages, max_pages):
+                    page_text = (page.extract_text() or "")[:max_chars - chars]
+                    pages.append(page_text)
+                    chars += len(page_text) + 1
+                    if chars >= max_chars:
+                        break
+                return "\n".join(pages) + "\n" if pages else ""
         except:
             return ""
     
@@ -328,6 +475,8 @@ class UniversalResumeParser:
                     "height": page.get_height(),
                     "width": page.get_width()
                 })
+                textpage.close()
+                page.close()
             
             pdf.close()
         
@@ -347,56 +496,99 @@ class UniversalResumeParser:
         Returns:
             Dictionary with section names as keys and content as values
         """
+        sections, _ = self._split_sections(text)
+        return sections
+    
+    def _compile_section_header(self) -> re.Pattern:
+        """
+        Combine section_patterns into a single header classifier
+        
+        One alternation with a named group per section, matched against the
+        whole line, so a line is classified with one regex call and
+        m.lastgroup names the section. Trailing ':' / '-' are tolerated.
+        """
+        alternatives = '|'.join(
+            f"(?P<{name}>{pattern})" for name, pattern in self.section_patterns.items()
+        )
+        return re.compile(rf"(?:{alternatives})\s*[:\-\u2013\u2014]?", re.IGNORECASE)
+    
+    def section_of(self, line: str) -> Optional[str]:
+        """
+        Section name if the line is a section header, else None
+        
+        Args:
+            line: One stripped line of resume text
+        """
+        # Headers are short; skip the regex for ordinary content lines
+        if len(line) > MAX_HEADER_LENGTH:
+            return None
+        m = self.section_header.fullmatch(line)
+        return m.lastgroup if m else None
+    
+    def _split_sections(self, text: str) -> Tuple[Dict[str, Any], Dict[str, Tuple[int, int]]]:
+        """
+        Split text into sections, also returning each section's character span
+        
+        Returns:
+            (sections as returned by identify_sections, {section: (start, end)} in text)
+        """
         sections = {section: "" for section in self.section_patterns.keys()}
         sections["other"] = []
+        spans: Dict[str, Tuple[int, int]] = {}
         
-        lines = text.split('\n')
         current_section = "other"
         buffer = []
+        block = None  # (start, end) of the buffered lines
+        
+        def flush():
+            if not buffer:
+                return
+            if current_section != "other":
+                sections[current_section] = ' '.join(buffer).strip()
+                spans[current_section] = block
+            else:
+                sections["other"].append(' '.join(buffer).strip())
         
-        for line in lines:
-            line = line.strip()
+        pos = 0
+        for raw_line in text.split('\n'):
+            line_start = pos + len(raw_line) - len(raw_line.lstrip())
+            pos += len(raw_line) + 1
+            line = raw_line.strip()
             if not line:
                 continue
             
             # Check if this line is a section header
-            section_found = False
-            for section_name, pattern in self.section_patterns.items():
-                if re.search(pattern, line, re.IGNORECASE):
-                    # Save previous section content
-                    if current_section != "other" and buffer:
-                        sections[current_section] = ' '.join(buffer).strip()
-                    elif current_section == "other" and buffer:
-                        sections["other"].append(' '.join(buffer).strip())
-                    
-                    # Start new section
-                    current_section = section_name
-                    buffer = []
-                    section_found = True
-                    break
-            
-            if not section_found:
+            section_name = self.section_of(line)
+            if section_name:
+                # Save previous section content
+                flush()
+                
+                # Start new section
+                current_section = section_name
+                buffer = []
+                block = None
+            else:
                 buffer.append(line)
+                line_end = line_start + len(line)
+                block = (block[0] if block else line_start, line_end)
         
         # Save the last section
-        if current_section != "other" and buffer:
-            sections[current_section] = ' '.join(buffer).strip()
-        elif current_section == "other" and buffer:
-            sections["other"].append(' '.join(buffer).strip())
+        flush()
         
         # Clean up sections
         for section in sections:
             if isinstance(sections[section], str):
                 sections[section] = sections[section].strip()
         
-        return sections
+        return sections, spans
     
-    def extract_contact_info(self, text: str) -> Dict[str, Any]:
+    def extract_contact_info(self, text: str, doc=None) -> Dict[str, Any]:
         """
         Extract contact information from resume text
         
         Args:
             text: Resume text
+            doc: Optional spaCy Doc of the same text (with NER), reused instead of re-running the model
             
         Returns:
             Dictionary with contact information
@@ -456,10 +648,14 @@ class UniversalResumeParser:
             else:
                 contact_info["other_links"].append(url)
         
+        if self.use_advanced_parsing and doc is None:
+            doc = get_nlp()(text[:1000], disable=disabled_for(NER))
+
         # Extract name using NER or pattern matching
         if self.use_advanced_parsing:
-            doc = nlp(text[:500])  # Only process first 500 chars for name
             for ent in doc.ents:
+                if ent.end_char > 500:  # Only look at first 500 chars for name
+                    break
                 if ent.label_ == "PERSON":
                     # Check if it looks like a name (has at least 2 parts)
                     parts = ent.text.split()
@@ -481,8 +677,9 @@ class UniversalResumeParser:
         
         # Extract location
         if self.use_advanced_parsing:
-            doc = nlp(text[:1000])
             for ent in doc.ents:
+                if ent.end_char > 1000:
+                    break
                 if ent.label_ in ["GPE", "LOC"]:
                     contact_info["location"] = ent.text
                     break
@@ -641,12 +838,14 @@ class UniversalResumeParser:
         
         return education_entries
     
-    def extract_skills(self, text: str) -> Dict[str, List[str]]:
+    def extract_skills(self, text: str, doc=None, matches: Optional[List[KeywordMatch]] = None) -> Dict[str, List[str]]:
         """
         Extract skills from text
         
         Args:
             text: Skills section text or full text
+            doc: Optional spaCy Doc of the same text (with parser), used for noun chunks
+            matches: Optional keyword_automaton matches for the same text
             
         Returns:
             Dictionary of categorized skills
@@ -660,56 +859,24 @@ class UniversalResumeParser:
             "other": []
         }
         
-        # Common skill patterns
-        skill_patterns = {
-            "technical": [
-                r'\b(python|java|c\+\+|javascript|typescript|react|angular|vue|node\.?js|express)',
-                r'\b(sql|mysql|postgresql|mongodb|redis|elasticsearch|oracle)',
-                r'\b(aws|azure|gcp|docker|kubernetes|terraform|ansible|jenkins)',
-                r'\b(machine\s+learning|ai|data\s+science|deep\s+learning|nlp|computer\s+vision)',
-                r'\b(html|css|sass|less|bootstrap|tailwind|responsive\s+design)'
-            ],
-            "soft": [
-                r'\b(leadership|communication|teamwork|collaboration|problem\s+solving)',
-                r'\b(critical\s+thinking|adaptability|creativity|innovation|time\s+management)',
-                r'\b(project\s+management|agile|scrum|kanban|waterfall)',
-                r'\b(presentation|public\s+speaking|negotiation|conflict\s+resolution)'
-            ],
-            "tools": [
-                r'\b(git|github|gitlab|jira|confluence|slack|teams|zoom|notion)',
-                r'\b(excel|word|powerpoint|outlook|sharepoint|office\s+365)',
-                r'\b(photoshop|illustrator|figma|sketch|adobe\s+xd|autocad|solidworks)'
-            ],
-            "languages": [
-                r'\b(english|spanish|french|german|chinese|mandarin|japanese|korean|arabic|hindi)'
-            ]
-        }
-        
-        # Extract skills using patterns
-        for category, patterns in skill_patterns.items():
-            found_skills = set()
-            for pattern in patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                found_skills.update([match.lower() for match in matches])
-            skills[category] = list(found_skills)
-        
-        # Look for certification patterns
-        cert_patterns = [
-            r'\b(AWS\s+Certified|Azure\s+Certified|Google\s+Cloud\s+Certified)',
-            r'\b(PMP|PMI|Scrum\s+Master|CSM|PSM|SAFe)',
-            r'\b(CPA|CFA|FRM|Series\s+\d+)',
-            r'\b(CISSP|CEH|Security\+|Network\+|A\+)\b'
-        ]
+        if matches is None:
+            matches = self.keyword_automaton.find(text)
         
+        # Vocabulary and certification hits
         certs = set()
-        for pattern in cert_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            certs.update(matches)
+        for match in matches:
+            kind, category = match.label
+            if kind == "skill":
+                if match.keyword not in skills[category]:
+                    skills[category].append(match.keyword)
+            elif kind == "certification":
+                certs.add(match.keyword)
         skills["certifications"] = list(certs)
         
         # Extract other skills (noun phrases, capitalized terms)
-        if self.use_advanced_parsing:
-            doc = nlp(text)
+        if self.use_advanced_parsing and text:
+            if doc is None:
+                doc = get_nlp()(text, disable=disabled_for(NOUN_CHUNKS))
             for chunk in doc.noun_chunks:
                 if 1 <= len(chunk.text.split()) <= 3:
                     skill_text = chunk.text.lower()
@@ -835,24 +1002,30 @@ class UniversalResumeParser:
         
         return round(total_months / 12, 1)
     
-    def categorize_profession(self, text: str) -> Dict[str, float]:
+    def categorize_profession(self, text: str, matches: Optional[List[KeywordMatch]] = None) -> Dict[str, float]:
         """
         Categorize profession based on text content
         
         Args:
             text: Resume text
+            matches: Optional keyword_automaton matches for the same text
             
         Returns:
             Dictionary with profession categories and confidence scores
         """
-        scores = {}
-        text_lower = text.lower()
+        if matches is None:
+            matches = self.keyword_automaton.find(text)
         
+        # Distinct keyword entries found per industry
+        hits = {industry: set() for industry in self.industry_keywords}
+        for match in matches:
+            kind, industry = match.label
+            if kind == "industry":
+                hits[industry].add(match.entry)
+        
+        scores = {}
         for industry, keywords in self.industry_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    score += 1
+            score = len(hits[industry])
             
             # Normalize score
             normalized_score = score / len(keywords) if keywords else 0
@@ -870,15 +1043,15 @@ class UniversalResumeParser:
             "confidence": scores[primary] if primary in scores else 0
         }
     
-    def parse_resume(self, file_path: str) -> Dict[str, Any]:
+    def prepare(self, file_path: str) -> ParseContext:
         """
-        Main method to parse resume from file
+        Text extraction, cleaning and section detection (no spaCy)
         
         Args:
             file_path: Path to resume file
             
         Returns:
-            Parsed resume data
+            ParseContext without a Doc; see attach_docs()
         """
         # Extract text
         text = self.extract_text(file_path)
@@ -889,10 +1062,97 @@ class UniversalResumeParser:
         cleaned_text = self.preprocess_text(text)
         
         # Identify sections
-        sections = self.identify_sections(cleaned_text)
+        sections, spans = self._split_sections(cleaned_text)
+        
+        return ParseContext(file_path, cleaned_text, sections, spans)
+    
+    def attach_docs(self, contexts: List[ParseContext], needs=NER + NOUN_CHUNKS + LEMMAS,
+                    n_process: int = 1, batch_size: int = 16) -> List[ParseContext]:
+        """
+        Build one spaCy Doc per CV in a single nlp.pipe pass
+        
+        Args:
+            contexts: Prepared CVs
+            needs: Pipeline components the extractors will use; the rest are disabled
+            n_process: spaCy worker processes
+            batch_size: Texts per spaCy batch
+            
+        Returns:
+            The same contexts, with .doc set (left None when advanced parsing is off)
+        """
+        if not self.use_advanced_parsing or not contexts:
+            return contexts
+        
+        docs = get_nlp().pipe(
+            (context.text for context in contexts),
+            disable=disabled_for(needs),
+            n_process=n_process,
+            batch_size=batch_size,
+        )
+        for context, doc in zip(contexts, docs):
+            context.doc = doc
+        return contexts
+    
+    def parse_resume(self, file_path: str) -> Dict[str, Any]:
+        """
+        Main method to parse resume from file
+        
+        Args:
+            file_path: Path to resume file
+            
+        Returns:
+            Parsed resume data
+        """
+        context = self.prepare(file_path)
+        self.attach_docs([context])
+        return self.build_result(context)
+    
+    def parse_many(self, file_paths: List[str], n_process: int = 1, batch_size: int = 16) -> List[Dict[str, Any]]:
+        """
+        Parse many resumes with a single spaCy pass
+        
+        Args:
+            file_paths: Paths to resume files
+            n_process: spaCy worker processes for nlp.pipe
+            batch_size: Texts per spaCy batch
+            
+        Returns:
+            Parsed resume data per path, in order. Files that could not be
+            read yield {"metadata": {...}, "error": "..."} instead of raising.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(file_paths)
+        contexts, positions = [], []
+        
+        for i, file_path in enumerate(file_paths):
+            try:
+                contexts.append(self.prepare(file_path))
+                positions.append(i)
+            except Exception as e:
+                results[i] = {
+                    "metadata": {"file_name": os.path.basename(file_path), "file_type": os.path.splitext(file_path)[1]},
+                    "error": str(e),
+                }
+        
+        self.attach_docs(contexts, n_process=n_process, batch_size=batch_size)
+        for i, context in zip(positions, contexts):
+            try:
+                results[i] = self.build_result(context)
+            except Exception as e:
+                results[i] = {"metadata": {"file_name": os.path.basename(context.file_path)}, "error": str(e)}
+        
+        return results
+    
+    def build_result(self, context: ParseContext) -> Dict[str, Any]:
+        """Run the extractors over a prepared CV, reading spans of its Doc"""
+        file_path = context.file_path
+        cleaned_text = context.text
+        sections = context.sections
+        
+        # One keyword scan serves profession and skills
+        matches = self.keyword_automaton.find(cleaned_text)
         
         # Extract information
-        contact_info = self.extract_contact_info(cleaned_text)
+        contact_info = self.extract_contact_info(cleaned_text, doc=context.doc)
         
         # Use experience section if available, otherwise full text
         experience_text = sections.get("experience", cleaned_text)
@@ -904,10 +1164,11 @@ class UniversalResumeParser:
         
         # Use skills section if available
         skills_text = sections.get("skills", cleaned_text)
-        skills_info = self.extract_skills(skills_text)
+        skills_matches = context.within("skills", matches)
+        skills_info = self.extract_skills(skills_text, doc=context.span("skills"), matches=skills_matches)
         
         # Categorize profession
-        profession_info = self.categorize_profession(cleaned_text)
+        profession_info = self.categorize_profession(cleaned_text, matches=matches)
         
         # Extract summary
         summary = sections.get("summary", "").strip()
@@ -942,12 +1203,14 @@ class UniversalResumeParser:
         
         return result
     
-    def prepare_for_job_matching(self, parsed_data: Dict) -> Dict[str, Any]:
+    def prepare_for_job_matching(self, parsed_data: Dict, context: Optional[ParseContext] = None) -> Dict[str, Any]:
         """
         Prepare parsed data for job matching
         
         Args:
             parsed_data: Parsed resume data
+            context: Optional ParseContext of the same CV; its summary and
+                     experience spans are reused for lemmas
             
         Returns:
             Data optimized for job matching
@@ -973,7 +1236,11 @@ class UniversalResumeParser:
         )
         
         if self.use_advanced_parsing:
-            doc = nlp(keywords_text)
+            if context is not None and context.doc is not None and (
+                    "summary" in context.section_spans or "experience" in context.section_spans):
+                doc = context.keyword_tokens()
+            else:
+                doc = get_nlp()(keywords_text, disable=disabled_for(LEMMAS))
             keywords = [token.lemma_.lower() for token in doc 
                        if not token.is_stop and token.is_alpha and len(token.text) > 2]
             keyword_counts = Counter(keywords)
@@ -1127,59 +1394,97 @@ class DocumentParsingService:
     
 def parse_file(file_path: str) -> Dict[str, Any]:
     """Return structured payload or raise ValueError."""
-    data = resume_parser.parse_resume(file_path)
+    context = resume_parser.prepare(file_path)
+    resume_parser.attach_docs([context])
+    data = resume_parser.build_result(context)
     if not data.get("is_parsed"):
         raise ValueError(data.get("error", "Unknown parse error"))
-    return resume_parser.prepare_for_job_matching(data)
+    return resume_parser.prepare_for_job_matching(data, context=context)
 
 
 
+# Bump whenever build_cv_payload's output changes; cached payloads of other
+# versions are then ignored and the CVs re-parsed
+PARSER_VERSION = "1"
 
-def parse_cv_task(user_id: UUID, document_id: UUID, file_path: str):
-    db_gen = dbSession()  # ✅ FIX 1: real session instance
-    db = next(db_gen)
-    try:
-        parser = UniversalResumeParser()
 
-        raw_text = parser.extract_text(file_path)
-        clean_text = parser.preprocess_text(raw_text)
+def file_sha256(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Hex SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-        sections = parser.identify_sections(clean_text)
-        contact = parser.extract_contact_info(clean_text)
-        experience = parser.extract_experience(
-            sections.get("experience", clean_text)
-        )
-        education = parser.extract_education(
-            sections.get("education", clean_text)
+
+def _cached_payloads(db: Session, content_hashes) -> Dict[str, Dict[str, Any]]:
+    """Cached payloads of the current PARSER_VERSION, keyed by content hash"""
+    if not content_hashes:
+        return {}
+    rows = (
+        db.query(ParseCache.content_hash, ParseCache.payload)
+        .filter(
+            ParseCache.content_hash.in_(list(content_hashes)),
+            ParseCache.parser_version == PARSER_VERSION,
         )
+        .all()
+    )
+    return {content_hash: payload for content_hash, payload in rows}
 
-        payload = {
-            "contact": contact,
-            "summary": sections.get("summary"),
-            "skills": sections.get("skills"),
-            "experience": experience,
-            "education": education,
-            "raw_sections": sections,
-        }
 
-        # 🔄 UPSERT ParsedProfile
-        parsed = (
-            db.query(ParsedProfile)
-            .filter(ParsedProfile.document_id == document_id)
-            .first()
-        )
+def _cache_payload(db: Session, content_hash: str, payload: Dict[str, Any]) -> None:
+    # Concurrent parses of the same file both try to insert; first one wins
+    db.execute(
+        pg_insert(ParseCache)
+        .values(content_hash=content_hash, parser_version=PARSER_VERSION, payload=payload)
+        .on_conflict_do_nothing(index_elements=["content_hash", "parser_version"])
+    )
 
-        if parsed:
-            parsed.payload = payload
-        else:
-            parsed = ParsedProfile(
-                user_id=user_id,
-                document_id=document_id,
-                payload=payload,
-            )
-            db.add(parsed)
 
-        # 🔗 mark this CV as user's current parsed CV
+def build_cv_payload(parser: UniversalResumeParser, context: ParseContext) -> Dict[str, Any]:
+    """Canonical ParsedProfile.payload for a prepared CV"""
+    clean_text = context.text
+    sections = context.sections
+
+    contact = parser.extract_contact_info(clean_text, doc=context.doc)
+    experience = parser.extract_experience(
+        sections.get("experience", clean_text)
+    )
+    education = parser.extract_education(
+        sections.get("education", clean_text)
+    )
+
+    return {
+        "contact": contact,
+        "summary": sections.get("summary"),
+        "skills": sections.get("skills"),
+        "experience": experience,
+        "education": education,
+        "raw_sections": sections,
+    }
+
+
+def _store_cv_payload(db: Session, user_id: UUID, document_id: UUID, payload: Dict[str, Any],
+                      make_current: bool = True) -> None:
+    # 🔄 UPSERT ParsedProfile
+    parsed = (
+        db.query(ParsedProfile)
+        .filter(ParsedProfile.document_id == document_id)
+        .first()
+    )
+
+    if parsed:
+        parsed.payload = payload
+    else:
+        parsed = ParsedProfile(
+            user_id=user_id,
+            document_id=document_id,
+            payload=payload,
+        )
+        db.add(parsed)
+
+    # 🔗 mark this CV as user's current parsed CV
+    if make_current:
         db.merge(
             UserParsedCV(
                 user_id=user_id,
@@ -1187,6 +1492,35 @@ def parse_cv_task(user_id: UUID, document_id: UUID, file_path: str):
             )
         )
 
+
+def parse_cv_document(db: Session, user_id: UUID, document_id: UUID, file_path: str,
+                      content_hash: Optional[str] = None) -> None:
+    """
+    Parse one CV (or copy its cached payload) into ParsedProfile
+
+    Does not commit; the caller owns the transaction. content_hash is the
+    Document's stored hash; the file is hashed only if it is missing.
+    """
+    file_path = get_blob_store().local_path(file_path)
+    content_hash = content_hash or file_sha256(file_path)
+    payload = _cached_payloads(db, [content_hash]).get(content_hash)
+
+    if payload is None:
+        context = resume_parser.prepare(file_path)
+        resume_parser.attach_docs([context], needs=NER)
+        payload = build_cv_payload(resume_parser, context)
+        _cache_payload(db, content_hash, payload)
+
+    _store_cv_payload(db, user_id, document_id, payload)
+
+
+def parse_cv_task(user_id: UUID, document_id: UUID, file_path: str):
+    """Parse a CV in-process; the API enqueues app.workers.tasks.parse_cv instead"""
+    db_gen = dbSession()  # ✅ FIX 1: real session instance
+    db = next(db_gen)
+    try:
+        parse_cv_document(db, user_id, document_id, file_path)
+
         db.commit()  # ✅ works now
 
     except Exception as e:
@@ -1200,4 +1534,85 @@ def parse_cv_task(user_id: UUID, document_id: UUID, file_path: str):
         try:
             next(db_gen, None)
         except:
-            pass
\ No newline at end of file
+            pass
+
+
+def reparse_cv_documents(document_ids: Optional[List[UUID]] = None, batch_size: int = 64, n_process: int = 2,
+                         nlp_batch_size: int = 16) -> Dict[str, int]:
+    """
+    Bulk re-parse every stored CV (or those in document_ids), e.g. after a parser upgrade
+
+    CVs are processed in chunks of batch_size: text extraction per file, then
+    one multi-process nlp.pipe pass for the whole chunk, then one commit.
+    Files already in the parse cache for PARSER_VERSION, and repeats of the
+    same file, are not parsed again, so an interrupted run resumes cheaply.
+
+    Returns:
+        {"parsed": n, "cached": n, "failed": n}
+    """
+    db_gen = dbSession()
+    db = next(db_gen)
+    parser = resume_parser
+    stats = {"parsed": 0, "cached": 0, "failed": 0}
+    try:
+        query = db.query(Document.id, Document.user_id, Document.file_path).filter(
+            Document.file_type == "cv", Document.deleted_at.is_(None)
+        )
+        if document_ids is not None:
+            query = query.filter(Document.id.in_(document_ids))
+        rows = query.order_by(Document.id).all()
+
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            owners = []
+            for document_id, user_id, file_path in chunk:
+                try:
+                    file_path = get_blob_store().local_path(file_path)
+                    owners.append((user_id, document_id, file_path, file_sha256(file_path)))
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"CV re-parse failed for {document_id}: {e}")
+
+            payloads = _cached_payloads(db, {content_hash for *_, content_hash in owners})
+            cached = set(payloads)
+
+            # Parse each uncached file once
+            contexts, hashes = [], []
+            for _, document_id, file_path, content_hash in owners:
+                if content_hash in payloads or content_hash in hashes:
+                    continue
+                try:
+                    contexts.append(parser.prepare(file_path))
+                    hashes.append(content_hash)
+                except Exception as e:
+                    print(f"CV re-parse failed for {document_id}: {e}")
+
+            parser.attach_docs(contexts, needs=NER, n_process=n_process, batch_size=nlp_batch_size)
+            for content_hash, context in zip(hashes, contexts):
+                try:
+                    payloads[content_hash] = build_cv_payload(parser, context)
+                    _cache_payload(db, content_hash, payloads[content_hash])
+                except Exception as e:
+                    print(f"CV re-parse failed for {context.file_path}: {e}")
+
+            for user_id, document_id, _, content_hash in owners:
+                payload = payloads.get(content_hash)
+                if payload is None:
+                    stats["failed"] += 1
+                    continue
+                # Re-parsing must not change which CV is the user's current one
+                _store_cv_payload(db, user_id, document_id, payload, make_current=False)
+                stats["cached" if content_hash in cached else "parsed"] += 1
+
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        try:
+            next(db_gen, None)
+        except:
+            pass
+
+    return stats
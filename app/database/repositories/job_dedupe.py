@@ -0,0 +1,148 @@
+import logging
+from typing import Dict, List, Tuple
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database.models import Job, JobLshBand
+from app.utils.minhash import MinHasher
+
+logger = logging.getLogger(__name__)
+
+# Jobs resolved per round trip
+DEDUPE_BATCH_SIZE = 500
+# Advisory lock serialising band lookups and inserts across processes
+DEDUPE_LOCK_KEY = "job_dedupe"
+
+_hasher = MinHasher()
+
+
+def job_text(job: Job) -> str:
+    """What two postings of the same job have in common across boards"""
+    return " ".join(filter(None, [job.title, job.company, job.description]))
+
+
+def assign_canonical_jobs(db: Session, jobs: List[Job]) -> Dict[str, int]:
+    """
+    Cluster new or updated jobs with their cross-board near-duplicates
+
+    Each job gets a MinHash signature and its LSH band keys; jobs already
+    stored under any of those keys (plus earlier jobs of the same call) are
+    the only candidates compared, so the cost does not grow with the table.
+    A candidate whose estimated Jaccard similarity reaches
+    JOB_DEDUP_THRESHOLD makes the job a duplicate: canonical_job_id points
+    at the candidate's canonical job. Otherwise the job is its own canonical
+    job. When a canonical job's text changes (or it turns out to be a
+    duplicate itself), the jobs clustered under it are clustered again.
+
+    Returns:
+        {"canonical": n, "duplicates": n}
+    """
+    stats = {"canonical": 0, "duplicates": 0}
+    jobs = list(jobs)
+    start = 0
+    while start < len(jobs):
+        batch = jobs[start:start + DEDUPE_BATCH_SIZE]
+        orphans = _assign_batch(db, batch, stats)
+        db.commit()
+        start += DEDUPE_BATCH_SIZE
+        queued = {job.id for job in jobs[start:]}
+        jobs.extend(job for job in orphans if job.id not in queued)
+    if stats["duplicates"]:
+        logger.info(f"🧬 {stats['duplicates']} cross-board duplicates, {stats['canonical']} distinct jobs")
+    return stats
+
+
+def _assign_batch(db: Session, batch: List[Job], stats: Dict[str, int]) -> List[Job]:
+    """Cluster one batch; returns the members of clusters it dissolved, to cluster again"""
+    # Workers cluster in parallel: without this, the same posting written by
+    # two of them at once misses the other's uncommitted band rows and both
+    # copies stay canonical. Held until the caller commits the batch.
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": DEDUPE_LOCK_KEY})
+
+    signatures, keys = {}, {}
+    for job in batch:
+        signature = _hasher.signature(job_text(job))
+        if signature is not None:
+            signatures[job.id] = signature
+            keys[job.id] = _hasher.band_keys(signature)
+
+    batch_ids = [job.id for job in batch]
+    all_keys = {key for job_keys in keys.values() for key in job_keys}
+
+    # Stored jobs sharing a bucket with anything in the batch
+    bucket_jobs: Dict[int, List[UUID]] = {}
+    if all_keys:
+        rows = (
+            db.query(JobLshBand.bucket, JobLshBand.job_id)
+            .filter(JobLshBand.bucket.in_(all_keys), JobLshBand.job_id.notin_(batch_ids))
+            .all()
+        )
+        for bucket, job_id in rows:
+            bucket_jobs.setdefault(bucket, []).append(job_id)
+
+    candidates: Dict[UUID, Tuple] = {}  # id -> (signature, canonical id)
+    stored_ids = {job_id for ids in bucket_jobs.values() for job_id in ids}
+    if stored_ids:
+        for job_id, minhash, canonical_id in (
+            db.query(Job.id, Job.minhash, Job.canonical_job_id)
+            .filter(Job.id.in_(stored_ids), Job.minhash.isnot(None))
+        ):
+            candidates[job_id] = (MinHasher.from_bytes(minhash), canonical_id or job_id)
+
+    # Replace the batch's old band keys (updated jobs may have changed text)
+    db.query(JobLshBand).filter(JobLshBand.job_id.in_(batch_ids)).delete(synchronize_session=False)
+
+    band_rows = []
+    dissolved = []  # canonical jobs whose duplicates no longer necessarily match them
+    for job in batch:
+        signature = signatures.get(job.id)
+        was_canonical = job.canonical_job_id == job.id
+        old_minhash = job.minhash
+        if signature is None:
+            job.minhash = None
+            job.canonical_job_id = job.id
+            stats["canonical"] += 1
+            if was_canonical and old_minhash is not None:
+                dissolved.append(job.id)
+            continue
+
+        best_id, best_score = None, settings.JOB_DEDUP_THRESHOLD
+        for job_id in {job_id for key in keys[job.id] for job_id in bucket_jobs.get(key, ())}:
+            if job_id == job.id or job_id not in candidates:
+                continue
+            score = MinHasher.similarity(signature, candidates[job_id][0])
+            if score >= best_score:
+                best_id, best_score = job_id, score
+
+        job.minhash = MinHasher.to_bytes(signature)
+        # A match may itself point back at this job (it was our duplicate)
+        job.canonical_job_id = candidates[best_id][1] if best_id is not None else job.id
+        if job.canonical_job_id == job.id:
+            stats["canonical"] += 1
+        else:
+            stats["duplicates"] += 1
+        if was_canonical and (job.minhash != old_minhash or job.canonical_job_id != job.id):
+            dissolved.append(job.id)
+
+        # Later jobs of this batch can match this one
+        candidates[job.id] = (signature, job.canonical_job_id)
+        for key in keys[job.id]:
+            bucket_jobs.setdefault(key, []).append(job.id)
+            band_rows.append({"bucket": key, "job_id": job.id})
+
+    if band_rows:
+        db.execute(pg_insert(JobLshBand).values(band_rows).on_conflict_do_nothing())
+
+    if not dissolved:
+        return []
+    # Detach the members so they are compared as jobs of their own, not through the old cluster
+    members = (
+        db.query(Job)
+        .filter(Job.canonical_job_id.in_(dissolved), Job.id.notin_(batch_ids))
+        .all()
+    )
+    for member in members:
+        member.canonical_job_id = None
+    return members
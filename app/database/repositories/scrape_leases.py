@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database.models import ScrapeLease
+
+
+def db_now(db: Session) -> datetime:
+    """
+    The database's clock (naive, like the lease columns)
+
+    Workers on different hosts compare each other's lease times, so they
+    are all computed from this one clock rather than each host's own.
+    """
+    return db.query(func.localtimestamp()).scalar()
+
+
+def sync_boards(db: Session, boards: Sequence[str], now: Optional[datetime] = None) -> None:
+    """
+    Make the lease table match the board list
+
+    New boards are due at once, boards dropped from the list are
+    soft-deleted (and revived if they come back). Safe to run from every
+    orchestrator: it only ever converges on the same rows.
+    """
+    now = now or db_now(db)
+    boards = list(dict.fromkeys(boards))
+    if boards:
+        stmt = pg_insert(ScrapeLease).values([
+            {"board": board, "failures": 0, "next_due_at": now} for board in boards
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[ScrapeLease.board],
+            set_={"deleted_at": None, "next_due_at": now},
+            where=ScrapeLease.deleted_at.isnot(None),
+        ))
+    db.execute(
+        update(ScrapeLease)
+        .where(ScrapeLease.board.notin_(boards), ScrapeLease.deleted_at.is_(None))
+        .values(deleted_at=now)
+    )
+    db.commit()
+
+
+def claim_boards(db: Session, owner: str, limit: int, now: Optional[datetime] = None) -> List[str]:
+    """
+    Lease up to limit due boards to owner, most overdue first
+
+    A board is free when nobody holds it or its lease ran out (the worker
+    died). Candidate rows are locked with FOR UPDATE SKIP LOCKED, so workers
+    claiming at the same moment, on any host, each get different boards
+    without waiting on one another.
+
+    Returns:
+        The claimed base_urls
+    """
+    now = now or db_now(db)
+    due = (
+        select(ScrapeLease.board)
+        .where(
+            ScrapeLease.deleted_at.is_(None),
+            ScrapeLease.next_due_at <= now,
+            or_(ScrapeLease.leased_until.is_(None), ScrapeLease.leased_until < now),
+        )
+        .order_by(ScrapeLease.next_due_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = db.execute(
+        update(ScrapeLease)
+        .where(ScrapeLease.board.in_(due.scalar_subquery()))
+        .values(
+            owner=owner,
+            leased_until=now + timedelta(seconds=settings.SCRAPER_LEASE_SECONDS),
+            last_started_at=now,
+        )
+        .returning(ScrapeLease.board)
+    ).scalars().all()
+    db.commit()
+    return list(claimed)
+
+
+def renew_leases(db: Session, owner: str, boards: Sequence[str], now: Optional[datetime] = None) -> int:
+    """Extend owner's leases on boards; returns how many it still holds"""
+    now = now or db_now(db)
+    renewed = db.execute(
+        update(ScrapeLease)
+        .where(ScrapeLease.board.in_(list(boards)), ScrapeLease.owner == owner)
+        .values(leased_until=now + timedelta(seconds=settings.SCRAPER_LEASE_SECONDS))
+    ).rowcount
+    db.commit()
+    return renewed
+
+
+def release_boards(db: Session, owner: str, outcomes: Dict[str, bool], now: Optional[datetime] = None) -> None:
+    """
+    Hand boards back after a scrape
+
+    Args:
+        outcomes: base_url -> scraped successfully. Boards are due again
+                  SCRAPER_CYCLE_MINUTES after they finish; failing boards
+                  back off exponentially. Leases owner no longer holds
+                  (expired and claimed by another worker) are left alone.
+    """
+    now = now or db_now(db)
+    cycle = timedelta(minutes=settings.SCRAPER_CYCLE_MINUTES)
+    rows = db.query(ScrapeLease).filter(
+        ScrapeLease.board.in_(list(outcomes)), ScrapeLease.owner == owner
+    )
+    for row in rows:
+        if outcomes[row.board]:
+            row.failures = 0
+            row.next_due_at = now + cycle
+        else:
+            row.failures += 1
+            row.next_due_at = now + cycle * 2 ** min(row.failures, 4)
+        row.owner = None
+        row.leased_until = None
+        row.last_finished_at = now
+    db.commit()
@@ -0,0 +1,224 @@
+"""
+Multi-process scraping: boards are leased to worker processes
+
+The scrape_leases table is the shared work queue. Each worker claims a few
+due boards (claim_boards, FOR UPDATE SKIP LOCKED), scrapes them with its own
+scraper, HTTP client and browser pool, and hands them back with their next
+due time. Workers on any number of hosts can pull from the same table, so
+throughput grows with workers and a cycle takes as long as the slowest
+batch, not the whole board list.
+
+Run a node with:
+    python -m app.database.repositories.scrape_orchestrator --workers 4
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence
+from app.config import settings
+from app.utils.session import SessionLocal
+from .scrape_leases import claim_boards, release_boards, renew_leases, sync_boards
+
+logger = logging.getLogger(__name__)
+
+# Seconds an idle worker waits before asking for due boards again
+IDLE_POLL_SECONDS = 30
+# Seconds between the orchestrator's semantic index syncs
+INDEX_INTERVAL_SECONDS = 60
+# Seconds between checks that every worker is alive
+SUPERVISE_SECONDS = 5
+
+
+def worker_owner() -> str:
+    """Lease owner id of this process, unique across hosts"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@contextmanager
+def _lease_heartbeat(owner: str, boards: Sequence[str]) -> Iterator[None]:
+    """Renew owner's leases on boards every third of their lifetime while the block runs"""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(settings.SCRAPER_LEASE_SECONDS / 3):
+            db = SessionLocal()
+            try:
+                held = renew_leases(db, owner, boards)
+                if held < len(boards):
+                    logger.warning(f"⚠️ {owner} lost {len(boards) - held} board leases")
+            except Exception as e:
+                logger.warning(f"Lease renewal failed: {e}")
+            finally:
+                db.close()
+
+    thread = threading.Thread(target=beat, name="lease-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_scrape_worker(stop) -> None:
+    """
+    Worker process loop: claim due boards, scrape them, release them
+
+    Args:
+        stop: multiprocessing.Event ending the loop after the current batch
+    """
+    # Imported here: it builds this process's own scraper
+    from .scraped_jobs import scrape_boards, scraper
+
+    # Ctrl+C reaches the whole process group; the orchestrator decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    owner = worker_owner()
+    logger.info(f"👷 Scrape worker {owner} started")
+    try:
+        while not stop.is_set():
+            db = SessionLocal()
+            try:
+                boards = claim_boards(db, owner, settings.SCRAPER_LEASE_BATCH)
+                if not boards:
+                    db.close()
+                    stop.wait(IDLE_POLL_SECONDS)
+                    continue
+
+                logger.info(f"📋 {owner} claimed {len(boards)} boards")
+                succeeded = set()
+                with _lease_heartbeat(owner, boards):
+                    try:
+                        successful, _, _ = scrape_boards(db, boards, index=False)
+                        succeeded = {config["base_url"] for config in successful}
+                    except Exception as e:
+                        db.rollback()
+                        logger.exception(f"❌ Scrape batch failed: {e}")
+                release_boards(db, owner, {board: board in succeeded for board in boards})
+            except Exception as e:
+                # Database trouble: the leases expire and other workers take over
+                logger.exception(f"❌ Scrape worker {owner} error: {e}")
+                stop.wait(IDLE_POLL_SECONDS)
+            finally:
+                db.close()
+    finally:
+        scraper.close()
+        logger.info(f"👋 Scrape worker {owner} stopped")
+
+
+class ScrapeOrchestrator:
+    """
+    Starts and supervises the scrape worker processes of one host
+
+    Workers are spawned (not forked) so each gets fresh database
+    connections, event loops and browsers. A worker that dies is replaced;
+    its boards free up when their leases expire. The orchestrator is also
+    the host's single writer of the semantic job index: it periodically
+    pulls the jobs changed since the index's watermark from the database,
+    so what any worker (on any host) wrote is indexed without IPC.
+    """
+
+    def __init__(self, processes: int, index: bool = True):
+        self.processes = processes
+        self.index = index
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._workers: List[multiprocessing.Process] = []
+
+    def _spawn(self):
+        worker = self._context.Process(target=run_scrape_worker, args=(self._stop,), name="scrape-worker")
+        worker.start()
+        return worker
+
+    def _index_changed(self) -> None:
+        from app.agents.matchingagent.semantic_index import index_changed_jobs
+
+        db = SessionLocal()
+        try:
+            index_changed_jobs(db)
+        except Exception as e:
+            logger.error(f"❌ Indexing changed jobs failed: {e}")
+        finally:
+            db.close()
+
+    def sync_boards(self, boards: Optional[Sequence[str]] = None) -> None:
+        """Register the board list in the lease table (default: the scraper's list)"""
+        if boards is None:
+            from .scraped_jobs import scraper
+            boards = scraper.get_comprehensive_job_websites()
+        db = SessionLocal()
+        try:
+            sync_boards(db, boards)
+        finally:
+            db.close()
+        logger.info(f"📚 {len(boards)} boards registered for leasing")
+
+    def run(self) -> None:
+        """Start the workers and supervise them until stop() is called"""
+        self._workers = [self._spawn() for _ in range(self.processes)]
+        logger.info(f"🚀 Scrape orchestrator started {self.processes} workers on {socket.gethostname()}")
+
+        last_indexed = time.monotonic()
+        while not self._stop.wait(SUPERVISE_SECONDS):
+            if self.index and time.monotonic() - last_indexed >= INDEX_INTERVAL_SECONDS:
+                self._index_changed()
+                last_indexed = time.monotonic()
+
+            for i, worker in enumerate(self._workers):
+                if not worker.is_alive() and not self._stop.is_set():
+                    logger.warning(f"⚠️ Scrape worker {worker.pid} exited ({worker.exitcode}), restarting")
+                    self._workers[i] = self._spawn()
+
+        # Workers finish their current batch first; leases cover any killed
+        deadline = time.monotonic() + settings.SCRAPER_LEASE_SECONDS
+        for worker in self._workers:
+            worker.join(max(0, deadline - time.monotonic()))
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        if self.index:
+            self._index_changed()
+        logger.info("🛑 Scrape orchestrator stopped")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def start_orchestrator_thread(processes: int) -> ScrapeOrchestrator:
+    """Run an orchestrator in the background of the current process (the API server)"""
+    orchestrator = ScrapeOrchestrator(processes)
+
+    def run():
+        try:
+            orchestrator.sync_boards()
+            orchestrator.run()
+        except Exception as e:
+            logger.exception(f"❌ Scrape orchestrator failed: {e}")
+
+    threading.Thread(target=run, name="scrape-orchestrator", daemon=True).start()
+    return orchestrator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scrape workers that lease boards from the database")
+    parser.add_argument("--workers", type=int, default=settings.SCRAPER_WORKER_PROCESSES or os.cpu_count())
+    parser.add_argument("--no-sync", action="store_true", help="Do not register the board list (another node does)")
+    parser.add_argument("--no-index", action="store_true", help="Do not update this host's semantic job index")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    orchestrator = ScrapeOrchestrator(args.workers, index=not args.no_index)
+    signal.signal(signal.SIGTERM, lambda *_: orchestrator.stop())
+    signal.signal(signal.SIGINT, lambda *_: orchestrator.stop())
+    if not args.no_sync:
+        orchestrator.sync_boards()
+    orchestrator.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,181 @@
 # app/services/scraper/agent.py
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import and_, func, or_, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.config import settings
 from app.database.models import Job
 from app.utils import dbSession
+from app.utils.session import SessionLocal
 import logging
-from sqlalchemy.exc import IntegrityError
 # app/scraper/agent.py
-import logging
-from apscheduler.schedulers.background import BackgroundScheduler
 from app.agents.jobscraper import ProxyEnhancedJobScraper
+from .crawl_frontier import DbFrontier
+from .job_dedupe import assign_canonical_jobs
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-scraper = ProxyEnhancedJobScraper()
+scraper = ProxyEnhancedJobScraper(frontier=DbFrontier(SessionLocal))
+
+# Rows per INSERT ... ON CONFLICT statement (and per transaction)
+UPSERT_BATCH_SIZE = 1000
+
+# Columns refreshed when a known url is scraped again
+UPSERT_COLUMNS = ("title", "company", "location", "description", "external_id", "board", "raw_payload")
+
+
+def _as_datetime(value: Any) -> Any:
+    # Extracted records carry ISO strings so they can be cached as JSON
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return value
+
+
+def _job_row(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": job.get("title") or "N/A",
+        "company": job.get("company") or "N/A",
+        "location": job.get("location"),
+        "description": job.get("description"),
+        "url": job["url"],
+        "external_id": job.get("external_id"),
+        "board": job.get("board"),
+        "posted_at": _as_datetime(job.get("posted_at")),
+        # JSONB-safe copy (scrapers may put datetimes in the dict)
+        "raw_payload": json.loads(json.dumps(job, default=str)),
+    }
+
+
+def _row_batches(jobs: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Rows for up to batch_size jobs at a time, one per url"""
+    jobs = (job for job in jobs if job.get("url"))
+    while True:
+        chunk = list(islice(jobs, batch_size))
+        if not chunk:
+            return
+        # ON CONFLICT cannot touch the same row twice in one statement
+        yield list({job["url"]: _job_row(job) for job in chunk}.values())
+
+
+def bulk_upsert_jobs(db: Session, jobs: Iterable[Dict[str, Any]], batch_size: int = UPSERT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Insert or refresh scraped jobs in batches keyed on the unique url
+
+    jobs may be a generator (see ProxyEnhancedJobScraper.iter_scraped_jobs);
+    it is consumed batch_size records at a time, so only one batch is in
+    memory. Each batch is one INSERT ... ON CONFLICT (url) DO UPDATE and one
+    commit. A row is only rewritten when one of UPSERT_COLUMNS actually
+    changed, or it gains a posted_at, so re-scraping an unchanged board
+    costs no writes. The first posted_at seen is kept: relative dates
+    ("3 days ago") drift by a unit between scrapes.
+
+    Returns:
+        {"inserted": n, "updated": n, "unchanged": n, "failed": n,
+         "changed_ids": [ids of inserted or updated jobs]}
+    """
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0, "changed_ids": []}
+    for batch in _row_batches(jobs, batch_size):
+        stmt = pg_insert(Job).values(batch)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Job.url],
+            set_={
+                **{column: excluded[column] for column in UPSERT_COLUMNS},
+                "posted_at": func.coalesce(Job.posted_at, excluded.posted_at),
+                # onupdate does not apply to ON CONFLICT; the semantic index syncs on it
+                "updated_at": func.now(),
+            },
+            where=or_(
+                *(getattr(Job, column).is_distinct_from(excluded[column]) for column in UPSERT_COLUMNS),
+                and_(Job.posted_at.is_(None), excluded.posted_at.isnot(None)),
+            ),
+        ).returning(Job.id, literal_column("(xmax = 0)").label("inserted"))  # xmax = 0: row was inserted, not updated
+
+        try:
+            written = db.execute(stmt).all()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            stats["failed"] += len(batch)
+            logger.error(f"❌ Failed to save {len(batch)} jobs: {e}")
+            continue
+
+        inserted = sum(1 for row in written if row.inserted)
+        stats["inserted"] += inserted
+        stats["updated"] += len(written) - inserted
+        stats["unchanged"] += len(batch) - len(written)
+        stats["changed_ids"].extend(row.id for row in written)
+
+    return stats
+
+
+def scrape_boards(db: Session, websites: List[str], index: bool = True) -> Tuple[list, list, Dict[str, Any]]:
+    """
+    Scrape websites into the jobs table, then cluster (and index) what changed
+
+    Args:
+        index: Update the semantic index here. Worker processes pass False
+               and leave it to their orchestrator, the host's index writer,
+               which picks the changes up from the table.
+
+    Returns:
+        (successful_configs, failed_sites, bulk_upsert_jobs stats)
+    """
+    # Jobs stream from the crawl thread straight into batched upserts
+    stats = bulk_upsert_jobs(db, scraper.iter_scraped_jobs(websites=websites, max_workers=5))
+    successful, failed = scraper.last_run
+    logger.info(
+        f"💾 Jobs saved: {stats['inserted']} new, {stats['updated']} updated, "
+        f"{stats['unchanged']} unchanged, {stats['failed']} failed"
+    )
+
+    # Cluster cross-board reposts so matching scores each posting once; a
+    # batch at a time, so memory stays bounded as in bulk_upsert_jobs
+    for changed_jobs in iter_job_batches(db, stats["changed_ids"]):
+        assign_canonical_jobs(db, changed_jobs)
+    if index:
+        # Keep the semantic ("jobs like my CV") index in step with the table
+        from app.agents.matchingagent.semantic_index import index_changed_jobs
+        index_changed_jobs(db)
+    return successful, failed, stats
+
+
+def iter_job_batches(db: Session, ids: List[Any], batch_size: int = UPSERT_BATCH_SIZE) -> Iterator[List[Job]]:
+    """Jobs by id, fetched and yielded batch_size ids at a time"""
+    for start in range(0, len(ids), batch_size):
+        yield db.query(Job).filter(Job.id.in_(ids[start:start + batch_size])).all()
+
 
 def scrape_job_cycle():
     logger.info("🔄 Starting scraping cycle...")
-    db = dbSession()
+    db_gen = dbSession()
+    db = next(db_gen)
     try:
         websites = scraper.get_comprehensive_job_websites()
-        successful, failed = scraper.process_sites_with_proxy(websites=websites, max_workers=5)
-        
-        # Process scraped jobs and save to DB
-        for config in successful:
-            for job in config.get("jobs", []):
-                try:
-                    # Example: insert job into your Job table
-                    if not db.query(Job).filter_by(url=job['url']).first():
-                        db.add(Job(
-                            title=job.get("title") or "N/A",
-                            company=job.get("company") or "N/A",
-                            location=job.get("location"),
-                            description=job.get("description"),
-                            url=job.get("url"),
-                            external_id=job.get("external_id"),
-                            board=job.get("board"),
-                            posted_at=job.get("posted_at"),
-                            raw_payload=job
-                        ))
-                        db.commit()
-                except Exception as e:
-                    db.rollback()
-                    logger.error(f"❌ Failed to save job {job.get('url')}: {e}")
-        
+        successful, failed, _ = scrape_boards(db, websites)
         logger.info(f"✅ Scraping cycle completed: {len(successful)} sites, {len(failed)} failed")
     except Exception as e:
         logger.exception(f"❌ Scraping cycle failed: {e}")
     finally:
         db.close()
+        next(db_gen, None)
 
 def start_scraper_scheduler():
+    if settings.SCRAPER_WORKER_PROCESSES > 0:
+        # Boards are leased to worker processes instead (see scrape_orchestrator)
+        from .scrape_orchestrator import start_orchestrator_thread
+        start_orchestrator_thread(settings.SCRAPER_WORKER_PROCESSES)
+        return
     scheduler = BackgroundScheduler()
-    scheduler.add_job(scrape_job_cycle, "interval", minutes=10, max_instances=1)
+    scheduler.add_job(scrape_job_cycle, "interval", minutes=settings.SCRAPER_CYCLE_MINUTES, max_instances=1)
     scheduler.start()
-    logger.info("🚀 Scraper scheduler started (every 10 mins)")
\ No newline at end of file
+    logger.info(f"🚀 Scraper scheduler started (every {settings.SCRAPER_CYCLE_MINUTES} mins)")
@@ -1,46 +1,159 @@
 import os
-from uuid import uuid4
+import hashlib
 from fastapi import HTTPException, status
 from typing import Dict, List
 from uuid import UUID
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
 from app.database.models import Document
-from sqlalchemy import func 
-from fastapi import BackgroundTasks
-
-UPLOAD_DIR = "uploaded_files"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+from sqlalchemy import func, text
+from app.config import settings
+from app.utils.blobstore import get_blob_store
 
 ALLOWED_EXT = {".pdf", ".doc", ".docx"}
 
-def user_uploads(user_id: UUID, file_map: Dict[str, UploadFile]) -> List[dict]:
+CHUNK_SIZE = 1024 * 1024  # bytes copied per read while streaming an upload
+
+
+def _stream_to_disk(upload: UploadFile, dest: str) -> dict:
+    """
+    Copy an upload to dest in fixed-size chunks
+
+    The file is written to a temporary name next to dest and renamed into
+    place once complete, so a half-written file never appears at dest. The
+    SHA-256 is computed during the copy. Raises 413 once the upload grows
+    past MAX_UPLOAD_BYTES.
+    """
+    tmp = f"{dest}.part"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp, "wb") as f:
+            while chunk := upload.file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        413,
+                        f"{upload.filename} exceeds the {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit",
+                    )
+                digest.update(chunk)
+                f.write(chunk)
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return {"file_path": dest, "size": size, "content_hash": digest.hexdigest()}
+
+
+def _lock_blobs(db: Session, *content_hashes: str) -> None:
+    """
+    Serialise blob writes and garbage collection per content hash
+
+    Transaction-scoped Postgres advisory locks, taken in a fixed order: an
+    upload holds the lock from put() until its Document row is committed,
+    and a delete holds it from the reference count until commit, so a blob
+    cannot be collected while a new reference to it is being added.
+    """
+    for content_hash in sorted({h for h in content_hashes if h}):
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:h))"), {"h": content_hash})
+
+
+def _remove_staged(*staged: dict) -> None:
+    """Delete staging files that did not make it into the store"""
+    for meta in staged:
+        if os.path.isfile(meta["file_path"]):
+            os.remove(meta["file_path"])
+
+
+def _store_staged(staged: dict, ext: str) -> dict:
+    """
+    Move a staged upload into the blob store; file_path becomes its locator
+
+    The caller must already hold _lock_blobs for its hash (taken together
+    with any other hash of the transaction, so the order stays fixed).
+    The staging file is gone afterwards, even when put() fails.
+    """
+    try:
+        locator = get_blob_store().put(staged["file_path"], staged["content_hash"], ext)
+    finally:
+        _remove_staged(staged)
+    return {**staged, "file_path": locator}
+
+
+def discard_stored(db: Session, stored: List[dict]) -> None:
+    """
+    Roll back a transaction that failed to commit its Document rows, then
+    delete the blobs it put unless a committed document references them
+    """
+    db.rollback()
+    try:
+        _lock_blobs(db, *(meta["content_hash"] for meta in stored))
+        for meta in stored:
+            _release_blob(db, meta["file_path"])
+        db.commit()
+    except Exception:
+        # Left for later: an unreferenced blob wastes space, nothing more
+        db.rollback()
+
+
+def _release_blob(db: Session, file_path: str) -> None:
+    """
+    Delete a blob once no document references it
+
+    Call after the referencing row was deleted or repointed and flushed,
+    while still holding _lock_blobs for its hash, before commit.
+    """
+    refs = db.query(func.count(Document.id)).filter(Document.file_path == file_path).scalar()
+    if not refs:
+        get_blob_store().delete(file_path)
+
+
+def user_uploads(db: Session, user_id: UUID, file_map: Dict[str, UploadFile]) -> List[dict]:
     """
     file_map keys:  'cv', 'cover_letter', 'supporting_document'(optional)
     Returns list of metadata dicts for each saved file.
+
+    Files are stored content-addressed; the caller must commit the Document
+    rows in the same session (that releases the blob locks).
     """
     required = {"cv", "cover_letter"}
     if not required.issubset(file_map.keys()):
         raise HTTPException(400, "CV and Cover Letter are mandatory.")
 
-    saved: List[dict] = []
-    for doc_type, upload_file in file_map.items():
+    # Reject bad extensions before anything is written
+    for upload_file in file_map.values():
         ext = os.path.splitext(upload_file.filename)[1].lower()
         if ext not in ALLOWED_EXT:
             raise HTTPException(400, f"Forbidden file type: {ext}")
 
-        unique_name = f"{uuid4().hex}{ext}"
-        dest = os.path.join(UPLOAD_DIR, unique_name)
-
-        with open(dest, "wb") as f:
-            f.write(upload_file.file.read())
+    # Stage everything first; blobs may be shared, so nothing is put into
+    # the store until every file of the request has arrived intact
+    store = get_blob_store()
+    staged: List[tuple] = []
+    try:
+        for doc_type, upload_file in file_map.items():
+            ext = os.path.splitext(upload_file.filename)[1].lower()
+            staged.append((doc_type, upload_file, ext, _stream_to_disk(upload_file, store.staging_path(ext))))
+    except Exception:
+        _remove_staged(*(meta for *_, meta in staged))
+        raise
 
-        saved.append({
-            "user_id": str(user_id),
-            "file_type": doc_type,
-            "original_name": upload_file.filename,
-            "file_path": dest,
-        })
+    saved: List[dict] = []
+    try:
+        _lock_blobs(db, *(meta["content_hash"] for *_, meta in staged))
+        for doc_type, upload_file, ext, meta in staged:
+            stored = _store_staged(meta, ext)
+            saved.append({
+                "user_id": str(user_id),
+                "file_type": doc_type,
+                "original_name": upload_file.filename,
+                **stored,
+            })
+    except Exception:
+        _remove_staged(*(meta for *_, meta in staged))
+        discard_stored(db, saved)
+        raise
     return  saved
 
 def _validate_ext(filename: str) -> str:
@@ -49,13 +162,19 @@ def _validate_ext(filename: str) -> str:
         raise HTTPException(400, f"Forbidden extension: {ext}")
     return ext
 
-def _save_upload(upload: UploadFile) -> str:
+def _stage_upload(upload: UploadFile) -> tuple:
+    """Stream an upload to staging (no lock held); returns (staged meta, ext)"""
     ext = _validate_ext(upload.filename)
-    unique = f"{uuid4().hex}{ext}"
-    path = os.path.join(UPLOAD_DIR, unique)
-    with open(path, "wb") as f:
-        f.write(upload.file.read())
-    return path
+    return _stream_to_disk(upload, get_blob_store().staging_path(ext)), ext
+
+def _save_upload(db: Session, upload: UploadFile) -> dict:
+    staged, ext = _stage_upload(upload)
+    try:
+        _lock_blobs(db, staged["content_hash"])
+    except Exception:
+        _remove_staged(staged)
+        raise
+    return _store_staged(staged, ext)
 
 def _guard_last_required(db: Session, user_id: UUID, doc: Document) -> None:
     """
@@ -83,14 +202,15 @@ def delete_document(db: Session, doc_id: UUID, user_id: UUID) -> None:
     _guard_last_required(db, user_id, doc)   # <-- guard
 
     path = doc.file_path
+    _lock_blobs(db, doc.content_hash)
     db.delete(doc)
+    db.flush()
+    _release_blob(db, path)
     db.commit()
-    if os.path.isfile(path):
-        os.remove(path)
 
 
-def update_document(background: BackgroundTasks, db: Session, doc_id: UUID, user_id: UUID, new_file: UploadFile) -> dict:
-    from .document_parser import parse_cv_task
+def update_document(db: Session, doc_id: UUID, user_id: UUID, new_file: UploadFile) -> dict:
+    from app.workers import enqueue_cv_parse
     
     doc = db.get(Document, doc_id)
     if not doc or doc.user_id != user_id:
@@ -100,17 +220,36 @@ def update_document(background: BackgroundTasks, db: Session, doc_id: UUID, user
 
     _guard_last_required(db, user_id, doc)   # <-- guard
 
-    old_path = doc.file_path
-    new_path = _save_upload(new_file)
+    old_path, old_hash = doc.file_path, doc.content_hash
+    # Both hashes in one call: two updates swapping files lock in the same order
+    staged, ext = _stage_upload(new_file)
+    try:
+        _lock_blobs(db, old_hash, staged["content_hash"])
+    except Exception:
+        _remove_staged(staged)
+        raise
+    stored = _store_staged(staged, ext)
 
-    if doc.file_type == "cv":
-        background.add_task(parse_cv_task, db, user_id, doc.id, new_path)
-    doc.file_name = new_file.filename
-    doc.file_path  = new_path
-    db.commit()
+    try:
+        doc.file_name = new_file.filename
+        doc.file_path  = stored["file_path"]
+        doc.content_hash = stored["content_hash"]
+        if doc.file_type == "cv":
+            doc.parse_status = "queued"
+            doc.parse_error = None
+        db.commit()
+    except Exception:
+        discard_stored(db, [stored])
+        raise
 
-    if os.path.isfile(old_path):
-        os.remove(old_path)
+    if old_path != stored["file_path"]:
+        # Only once the row points at the new blob, so a failed commit keeps the old one
+        _lock_blobs(db, old_hash)
+        _release_blob(db, old_path)
+        db.commit()
+
+    if doc.file_type == "cv":
+        enqueue_cv_parse(doc.id)
 
     return {"doc_id": doc.id, "file_name": doc.file_name, "file_type": doc.file_type}
 
@@ -149,20 +288,39 @@ def add_supporting_doc(db: Session, user_id: UUID, file: UploadFile | None) -> d
     if exists:
         raise HTTPException(409, f"A supporting document named '{file.filename}' already exists.")
 
-    new_path = _save_upload(file)
-    doc = Document(
-        user_id=user_id,
-        file_name=file.filename,
-        file_type="supporting_document",
-        file_path=new_path,
-    )
-    db.add(doc)
-    db.commit()
+    stored = _save_upload(db, file)
+    try:
+        doc = Document(
+            user_id=user_id,
+            file_name=file.filename,
+            file_type="supporting_document",
+            file_path=stored["file_path"],
+            content_hash=stored["content_hash"],
+        )
+        db.add(doc)
+        db.commit()
+    except Exception:
+        discard_stored(db, [stored])
+        raise
     db.refresh(doc)
 
     return {"doc_id": str(doc.id), "file_name": doc.file_name, "file_type": doc.file_type}
 
 
+def get_parse_status(db: Session, doc_id: UUID, user_id: UUID) -> dict:
+    doc = db.get(Document, doc_id)
+    if not doc or doc.user_id != user_id:
+        raise HTTPException(404, "Document not found")
+    if doc.file_type != "cv":
+        raise HTTPException(400, "Only CVs are parsed")
+    return {
+        "doc_id": str(doc.id),
+        "parse_status": doc.parse_status,
+        "parse_error": doc.parse_error,
+        "is_parsed": doc.parse_status == "parsed",
+    }
+
+
 def get_document(db: Session, doc_id: UUID, user_id: UUID) -> dict:
     doc = db.get(Document, doc_id)
     if not doc or doc.user_id != user_id:
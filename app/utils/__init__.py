@@ -1,3 +1,7 @@
 from .session import apiResponse, dbSession, engine
 from .security import create_jwt, verify_jwt, verify_password, generate_temp_password, get_password_hash, create_access_token, create_temp_token
-from .mail import send_account_verification_email, send_reset_email, admin_send_reset_email
\ No newline at end of file
+from .mail import send_account_verification_email, send_reset_email, admin_send_reset_email
+from .nlp import get_nlp, disabled_for, preload_models
+from .keywords import KeywordAutomaton, tokenize
+from .blobstore import get_blob_store, BlobStore, LocalBlobStore, S3BlobStore
+from .minhash import MinHasher
@@ -0,0 +1,171 @@
+import os
+import logging
+from abc import ABC, abstractmethod
+from uuid import uuid4
+from typing import Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def blob_key(content_hash: str, ext: str) -> str:
+    """Sharded, content-addressed key, e.g. 'ab/cd/abcd...ef.pdf'"""
+    return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{ext}"
+
+
+class BlobStore(ABC):
+    """
+    Content-addressed document storage
+
+    Uploads are streamed to a staging file, then put() under a key derived
+    from their SHA-256, so identical files are stored once. put() returns a
+    locator that is saved in Document.file_path; documents sharing a
+    locator share the blob, and the caller deletes it when the last such
+    document goes (see user_document.delete_document).
+    """
+
+    def __init__(self, staging_dir: str):
+        self.staging_dir = os.path.join(staging_dir, ".staging")
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def staging_path(self, ext: str) -> str:
+        """Fresh local path to stream an upload into before put()"""
+        return os.path.join(self.staging_dir, f"{uuid4().hex}{ext}")
+
+    @abstractmethod
+    def put(self, staged_path: str, content_hash: str, ext: str) -> str:
+        """Move a staged file into the store (a no-op copy if the blob exists); returns its locator"""
+
+    @abstractmethod
+    def exists(self, locator: str) -> bool:
+        """Whether the blob is in the store"""
+
+    @abstractmethod
+    def delete(self, locator: str) -> None:
+        """Remove the blob; the caller checks nothing references it"""
+
+    @abstractmethod
+    def local_path(self, locator: str) -> str:
+        """Filesystem path of a blob for readers that need one (parsers)"""
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs under root/ab/cd/<sha256><ext>; locators are filesystem paths"""
+
+    def __init__(self, root: str):
+        super().__init__(root)
+        self.root = root
+
+    def put(self, staged_path: str, content_hash: str, ext: str) -> str:
+        path = os.path.join(self.root, blob_key(content_hash, ext))
+        if os.path.exists(path):
+            # Deduplicated: nothing to write
+            os.remove(staged_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(staged_path, path)
+        return path
+
+    def exists(self, locator: str) -> bool:
+        return os.path.isfile(locator)
+
+    def delete(self, locator: str) -> None:
+        if os.path.isfile(locator):
+            os.remove(locator)
+
+    def local_path(self, locator: str) -> str:
+        # Also covers files stored before the blob store (flat uuid names)
+        return locator
+
+
+class S3BlobStore(BlobStore):
+    """
+    Blobs in an S3-compatible bucket (AWS, MinIO, ...); locators are s3:// URLs
+
+    Parsers get a locally cached copy via local_path(). Locators that are not
+    s3:// URLs are treated as local paths written before the switch.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", cache_dir: str = "uploaded_files",
+                 endpoint_url: Optional[str] = None):
+        try:
+            import boto3
+        except ImportError as e:
+            raise RuntimeError("BLOB_STORE=s3 requires boto3 (pip install boto3)") from e
+
+        super().__init__(cache_dir)
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.cache_dir = os.path.join(cache_dir, ".cache")
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def _key(self, locator: str) -> str:
+        return locator[len(f"s3://{self.bucket}/"):]
+
+    def _exists_key(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put(self, staged_path: str, content_hash: str, ext: str) -> str:
+        key = "/".join(filter(None, [self.prefix, blob_key(content_hash, ext)]))
+        try:
+            if not self._exists_key(key):
+                self.client.upload_file(staged_path, self.bucket, key)
+        finally:
+            os.remove(staged_path)
+        return f"s3://{self.bucket}/{key}"
+
+    def exists(self, locator: str) -> bool:
+        if not locator.startswith("s3://"):
+            return os.path.isfile(locator)
+        return self._exists_key(self._key(locator))
+
+    def delete(self, locator: str) -> None:
+        if not locator.startswith("s3://"):
+            if os.path.isfile(locator):
+                os.remove(locator)
+            return
+        key = self._key(locator)
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        cached = os.path.join(self.cache_dir, key)
+        if os.path.isfile(cached):
+            os.remove(cached)
+
+    def local_path(self, locator: str) -> str:
+        if not locator.startswith("s3://"):
+            return locator
+        key = self._key(locator)
+        path = os.path.join(self.cache_dir, key)
+        if not os.path.isfile(path):
+            # Blobs are immutable, so a cached copy never goes stale
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{uuid4().hex}.part"
+            self.client.download_file(self.bucket, key, tmp)
+            os.replace(tmp, path)
+        return path
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store selected by settings.BLOB_STORE"""
+    global _store
+    if _store is None:
+        if settings.BLOB_STORE == "s3":
+            _store = S3BlobStore(
+                bucket=settings.BLOB_S3_BUCKET,
+                prefix=settings.BLOB_S3_PREFIX,
+                cache_dir=settings.BLOB_STORE_ROOT,
+                endpoint_url=settings.BLOB_S3_ENDPOINT_URL,
+            )
+        else:
+            _store = LocalBlobStore(settings.BLOB_STORE_ROOT)
+    return _store
@@ -0,0 +1,136 @@
+import re
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional
+
+# Words are runs of letters/digits; '+' and '#' stay attached so c++, c#
+# and security+ survive. Everything else ('-', '/', '.', whitespace) splits,
+# so "ci/cd" matches "CI/CD" and "ci cd", and "front-end" matches "front end".
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*", re.IGNORECASE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens as seen by KeywordAutomaton"""
+    return [m.group(0).lower() for m in TOKEN_PATTERN.finditer(text or "")]
+
+
+class KeywordMatch(NamedTuple):
+    keyword: str
+    label: Hashable
+    start: int  # character offsets in the scanned text
+    end: int
+    entry: int  # position of the keyword in add() order
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over word tokens
+
+    Keywords are added with a label (e.g. an industry or skill category) and
+    compiled once; find() then reports every keyword in a text with a single
+    left-to-right scan, whatever the number of keywords. Matching works on
+    whole tokens, so "java" does not fire inside "javascript".
+    """
+
+    def __init__(self, keywords: Optional[Dict[Hashable, Iterable[str]]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._entries: List[tuple] = []  # (keyword, label, n_tokens)
+        self._built = False
+        for label, words in (keywords or {}).items():
+            for word in words:
+                self.add(word, label)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, keyword: str, label: Hashable = None) -> int:
+        """Register a keyword; returns its entry number"""
+        tokens = tokenize(keyword)
+        if not tokens:
+            raise ValueError(f"Keyword {keyword!r} has no word tokens")
+
+        node = 0
+        for token in tokens:
+            nxt = self._goto[node].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+
+        entry = len(self._entries)
+        self._entries.append((keyword, label, len(tokens)))
+        self._out[node].append(entry)
+        self._built = False
+        return entry
+
+    def build(self) -> "KeywordAutomaton":
+        """Compute failure links; called lazily by find()"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                # Inherit the outputs of the longest proper suffix
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+        self._built = True
+        return self
+
+    def find(self, text: Optional[str], overlapping: bool = True) -> List[KeywordMatch]:
+        """
+        All keyword occurrences in text
+
+        Args:
+            text: Text to scan
+            overlapping: If False, keep only the leftmost-longest matches,
+                         e.g. "machine learning" but not "learning" inside it
+
+        Returns:
+            Matches ordered by end position
+        """
+        if not text:
+            return []
+        if not self._built:
+            self.build()
+
+        goto, fail, out, entries = self._goto, self._fail, self._out, self._entries
+        starts: List[int] = []
+        matches: List[KeywordMatch] = []
+        node = 0
+
+        for m in TOKEN_PATTERN.finditer(text):
+            token = m.group(0).lower()
+            starts.append(m.start())
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+
+            for entry in out[node]:
+                keyword, label, n_tokens = entries[entry]
+                matches.append(KeywordMatch(keyword, label, starts[-n_tokens], m.end(), entry))
+
+        if not overlapping:
+            matches = self.longest(matches)
+        return matches
+
+    @staticmethod
+    def longest(matches: List[KeywordMatch]) -> List[KeywordMatch]:
+        """Greedy leftmost-longest, non-overlapping subset of matches"""
+        kept, last_end = [], -1
+        for match in sorted(matches, key=lambda m: (m.start, -m.end)):
+            if match.start >= last_end:
+                kept.append(match)
+                last_end = match.end
+        return kept
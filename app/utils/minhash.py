@@ -0,0 +1,80 @@
+import zlib
+import hashlib
+from typing import List, Optional
+import numpy as np
+from .keywords import tokenize
+
+# 2**61 - 1; a * x + b stays below 2**64 because a, b and x are all 32-bit
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHasher:
+    """
+    MinHash signatures and LSH band keys for near-duplicate text
+
+    Texts are reduced to word shingles (shingle_size consecutive tokens);
+    two signatures agree in a fraction of positions that estimates the
+    Jaccard similarity of the shingle sets. Signatures are split into bands
+    of rows values each and every band is hashed to one bucket key, so
+    near-duplicates share at least one bucket with high probability and
+    candidates are found by key lookup instead of comparing against every
+    stored text. With 128 permutations in 32 bands of 4 the S-curve turns
+    at a similarity of about 0.4, so reposts with trimmed or extended
+    descriptions still become candidates; callers verify them with
+    similarity().
+
+    Parameters must stay fixed once signatures are stored; they are part of
+    what the stored keys mean.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: Optional[str]) -> np.ndarray:
+        """32-bit hashes of the text's distinct word shingles"""
+        tokens = tokenize(text)
+        if not tokens:
+            return np.zeros(0, dtype=np.uint64)
+        size = min(self.shingle_size, len(tokens))
+        grams = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, text: Optional[str]) -> Optional[np.ndarray]:
+        """uint32 signature of length num_perm, None for text without words"""
+        shingles = self.shingles(text)
+        if not len(shingles):
+            return None
+        # (num_perm x n_shingles) permuted hashes, min per permutation
+        hashed = (self._a[:, np.newaxis] * shingles[np.newaxis, :] + self._b[:, np.newaxis]) % _MERSENNE_PRIME
+        return (hashed & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit bucket key per band (the band index is hashed in)"""
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(band.to_bytes(2, "little") + chunk.astype("<u4").tobytes(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(a == b))
+
+    @staticmethod
+    def to_bytes(signature: np.ndarray) -> bytes:
+        return signature.astype("<u4").tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> np.ndarray:
+        return np.frombuffer(data, dtype="<u4")
@@ -0,0 +1,95 @@
+import gc
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+from app.config import settings
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+
+logger = logging.getLogger(__name__)
+
+# What each call site actually needs from the pipeline. Everything else is
+# disabled for that call, except components these depend on (e.g. a shared
+# tok2vec that the tagger/parser listen to).
+NER = ("ner",)
+NOUN_CHUNKS = ("tagger", "attribute_ruler", "parser")
+LEMMAS = ("tagger", "attribute_ruler", "lemmatizer")
+TOKENS = ()  # tokenizer only, e.g. static doc.vector
+
+_models: Dict[str, "Language"] = {}
+_disabled: Dict[Tuple[str, Tuple[str, ...]], List[str]] = {}
+_lock = threading.Lock()
+
+
+def _load(name: str):
+    import spacy
+
+    try:
+        return spacy.load(name)
+    except OSError:
+        if name == settings.NLP_FALLBACK_MODEL:
+            raise
+        # Fallback to small model if medium is not available
+        logger.warning(f"spaCy model {name} not available, falling back to {settings.NLP_FALLBACK_MODEL}")
+        return spacy.load(settings.NLP_FALLBACK_MODEL)
+
+
+def get_nlp(name: str = None):
+    """
+    Return the process-wide spaCy pipeline, loading it on first use
+
+    Args:
+        name: Model package name, defaults to settings.NLP_MODEL
+
+    Returns:
+        Loaded spacy Language object shared by every caller in the process
+    """
+    name = name or settings.NLP_MODEL
+    nlp = _models.get(name)
+    if nlp is None:
+        with _lock:
+            nlp = _models.get(name)
+            if nlp is None:
+                nlp = _load(name)
+                _models[name] = nlp
+                logger.info(f"Loaded spaCy model {nlp.meta.get('name', name)} ({', '.join(nlp.pipe_names)})")
+    return nlp
+
+
+def disabled_for(needs: Iterable[str], name: str = None) -> List[str]:
+    """
+    Pipeline components a call site can skip
+
+    Pass the result as `disable=` to nlp(...) or nlp.pipe(...). Unlike
+    nlp.select_pipes this is per call, so it is safe with threads.
+    """
+    nlp = get_nlp(name)
+    key = (name or settings.NLP_MODEL, tuple(needs))
+    disabled = _disabled.get(key)
+    if disabled is None:
+        keep = set(needs)
+        for pipe_name, proc in nlp.pipeline:
+            listeners = getattr(proc, "listening_components", None) or []
+            if keep.intersection(listeners):
+                keep.add(pipe_name)
+        disabled = [pipe_name for pipe_name in nlp.pipe_names if pipe_name not in keep]
+        _disabled[key] = disabled
+    return disabled
+
+
+def is_loaded(name: str = None) -> bool:
+    return (name or settings.NLP_MODEL) in _models
+
+
+def preload_models(names: Iterable[str] = None) -> None:
+    """
+    Load models up front, e.g. in the gunicorn master before workers fork
+
+    Objects loaded before fork() are shared copy-on-write by the workers.
+    gc.freeze() moves them out of the collector's generations so the
+    garbage collector does not touch (and thereby copy) their pages.
+    """
+    for name in names or [settings.NLP_MODEL]:
+        get_nlp(name)
+    gc.freeze()
@@ -0,0 +1,2 @@
+from .celery_app import celery_app, PRIORITY_UPLOAD, PRIORITY_BULK
+from .tasks import parse_cv, reparse_cvs, reparse_cv_chunk, enqueue_cv_parse, enqueue_reparse_all
@@ -0,0 +1,38 @@
+from celery import Celery
+from celery.signals import worker_init
+from kombu import Queue
+from app.config import settings
+
+# Redis priorities: 0 is served first
+PRIORITY_UPLOAD = 0   # a user is waiting on this CV
+PRIORITY_BULK = 9     # re-parses and other batch work
+
+celery_app = Celery("applicant", broker=settings.CELERY_BROKER_URL, include=["app.workers.tasks"])
+
+celery_app.conf.update(
+    task_default_queue="parsing",
+    task_queues=[Queue("parsing")],
+    task_default_priority=PRIORITY_UPLOAD,
+    # Ack only after the task finished, so a CV is redelivered instead of
+    # lost if the worker dies or is restarted mid-parse
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Parses are long and CPU-bound; don't let one process reserve a backlog
+    worker_prefetch_multiplier=1,
+    # Progress is tracked on documents.parse_status, not in a result backend
+    task_ignore_result=True,
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+        "visibility_timeout": 3600,
+    },
+)
+
+
+@worker_init.connect
+def preload_nlp(**kwargs):
+    # Same as gunicorn's on_starting: load spaCy before the pool forks
+    if settings.NLP_PRELOAD:
+        from app.utils.nlp import preload_models
+        preload_models()
@@ -0,0 +1,140 @@
+import logging
+from datetime import timedelta
+from typing import List
+from uuid import UUID
+from sqlalchemy import update, or_, and_
+from sqlalchemy.sql import func
+from app.config import settings
+from app.database.models import Document
+from app.database.repositories.document_parser import parse_cv_document, reparse_cv_documents
+from app.utils.session import SessionLocal
+from .celery_app import celery_app, PRIORITY_UPLOAD, PRIORITY_BULK
+
+logger = logging.getLogger(__name__)
+
+# CVs per re-parse task: minutes of work, well under the broker's visibility timeout
+REPARSE_CHUNK_SIZE = 200
+
+
+def _claim(db, document_id: UUID):
+    """
+    Move a CV to 'parsing' if nobody else is on it
+
+    Returns (user_id, file_path, content_hash) or None when the CV is already parsed, is
+    being parsed by another worker, or no longer exists. This is what makes
+    duplicate deliveries of the same task harmless.
+    """
+    # Database clock on both sides: parse_started_at is written with now()
+    stale = func.now() - timedelta(minutes=settings.PARSE_STALE_AFTER_MINUTES)
+    return db.execute(
+        update(Document)
+        .where(
+            Document.id == document_id,
+            Document.file_type == "cv",
+            Document.deleted_at.is_(None),
+            or_(
+                Document.parse_status.is_(None),
+                Document.parse_status.in_(("queued", "failed")),
+                and_(Document.parse_status == "parsing", Document.parse_started_at < stale),
+            ),
+        )
+        .values(parse_status="parsing", parse_started_at=func.now(), parse_error=None)
+        .returning(Document.user_id, Document.file_path, Document.content_hash)
+    ).first()
+
+
+def _finish(db, document_id: UUID, file_path: str, status: str, error: str = None) -> bool:
+    """Record the outcome unless the CV was replaced while we parsed it"""
+    result = db.execute(
+        update(Document)
+        .where(
+            Document.id == document_id,
+            Document.file_path == file_path,
+            Document.parse_status == "parsing",
+        )
+        .values(parse_status=status, parse_error=error)
+    )
+    return result.rowcount == 1
+
+
+@celery_app.task(bind=True, name="documents.parse_cv", max_retries=settings.PARSE_MAX_RETRIES)
+def parse_cv(self, document_id: str):
+    document_id = UUID(document_id)
+    db = SessionLocal()
+    try:
+        claimed = _claim(db, document_id)
+        db.commit()
+        if claimed is None:
+            logger.info(f"CV {document_id} already parsed or in progress, skipping")
+            return
+        user_id, file_path, content_hash = claimed
+
+        try:
+            parse_cv_document(db, user_id, document_id, file_path, content_hash)
+        except Exception as e:
+            db.rollback()
+            retrying = self.request.retries < self.max_retries
+            _finish(db, document_id, file_path, "queued" if retrying else "failed", str(e))
+            db.commit()
+            if retrying:
+                raise self.retry(exc=e, countdown=30 * 2 ** self.request.retries)
+            logger.error(f"CV parsing failed for {document_id}: {e}")
+            return
+
+        if _finish(db, document_id, file_path, "parsed"):
+            db.commit()
+        else:
+            # Replaced mid-parse; the task queued for the new file wins
+            db.rollback()
+    finally:
+        db.close()
+
+
+@celery_app.task(name="documents.reparse_cvs")
+def reparse_cvs():
+    """
+    Fan a full re-parse out into one task per REPARSE_CHUNK_SIZE CVs
+
+    A single task re-parsing everything would outlive the broker's
+    visibility timeout and be redelivered to a second worker mid-run.
+    """
+    db = SessionLocal()
+    try:
+        ids = [
+            str(document_id) for (document_id,) in
+            db.query(Document.id)
+            .filter(Document.file_type == "cv", Document.deleted_at.is_(None))
+            .order_by(Document.id)
+        ]
+    finally:
+        db.close()
+
+    for start in range(0, len(ids), REPARSE_CHUNK_SIZE):
+        reparse_cv_chunk.apply_async(args=[ids[start:start + REPARSE_CHUNK_SIZE]], priority=PRIORITY_BULK)
+    logger.info(f"CV re-parse queued: {len(ids)} CVs in {-(-len(ids) // REPARSE_CHUNK_SIZE)} tasks")
+
+
+@celery_app.task(name="documents.reparse_cv_chunk")
+def reparse_cv_chunk(document_ids: List[str]):
+    # One process: the prefork pool already runs a worker per core
+    stats = reparse_cv_documents([UUID(document_id) for document_id in document_ids], n_process=1)
+    logger.info(f"CV re-parse chunk finished: {stats}")
+    return stats
+
+
+def enqueue_cv_parse(document_id: UUID, priority: int = PRIORITY_UPLOAD) -> None:
+    """
+    Queue a CV for parsing
+
+    Call after the transaction that set parse_status='queued' is committed,
+    otherwise a fast worker may not see the row yet.
+    """
+    try:
+        parse_cv.apply_async(args=[str(document_id)], priority=priority)
+    except Exception as e:
+        # The document stays 'queued' and can be re-enqueued
+        logger.error(f"Could not queue CV {document_id} for parsing: {e}")
+
+
+def enqueue_reparse_all() -> None:
+    reparse_cvs.apply_async(priority=PRIORITY_BULK)
@@ -0,0 +1,142 @@
+import os
+import random
+from html import escape
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+# Listing markups, one per detection strategy of ProxyEnhancedJobScraper
+MARKUPS = ("class_cards", "semantic", "microdata", "data_attributes", "table", "list")
+
+TITLES = ["Backend Engineer", "Data Analyst", "Product Designer", "DevOps Engineer", "Nurse Practitioner",
+          "Accountant", "Sales Manager", "Frontend Developer", "Machine Learning Engineer", "Support Specialist"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Tyrell"]
+LOCATIONS = ["Lagos", "Berlin", "Remote (EU)", "Toronto", "Dublin", "Nairobi", "Lisbon", "Austin, TX"]
+WORDS = ("design build ship maintain scale services platform customers team data pipelines cloud api "
+         "quality reliable growth mentor collaborate product users insight reporting agile ownership").split()
+
+
+def board_host(url: str) -> str:
+    """Corpus directory name of a board: its host without "www." """
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _description(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(25, 60))).capitalize() + "."
+
+
+def _job(markup: str, rng: random.Random, n: int) -> str:
+    title, company, location = rng.choice(TITLES), rng.choice(COMPANIES), rng.choice(LOCATIONS)
+    salary = f"${rng.randint(40, 180)}k"
+    href = f"/jobs/{n}-{title.lower().replace(' ', '-')}"
+    fields = (
+        f'<span class="company-name">{escape(company)}</span>'
+        f'<span class="location">{escape(location)}</span>'
+        f'<span class="salary">{salary}</span>'
+        f'<p class="description">{_description(rng)}</p>'
+    )
+    if markup == "class_cards":
+        return f'<div class="job-card"><h2><a href="{href}">{title}</a></h2>{fields}</div>'
+    if markup == "semantic":
+        return f'<article><h3><a href="{href}">{title}</a></h3>{fields}</article>'
+    if markup == "microdata":
+        return (f'<div itemscope itemtype="https://schema.org/JobPosting"><h3 itemprop="title">'
+                f'<a href="{href}">{title}</a></h3>{fields}</div>')
+    if markup == "data_attributes":
+        return f'<div data-job-id="{n}"><h3><a href="{href}">{title}</a></h3>{fields}</div>'
+    if markup == "table":
+        return (f'<tr><td><a href="{href}">{title}</a></td><td class="company-name">{escape(company)}</td>'
+                f'<td class="location">{escape(location)}</td><td class="salary">{salary}</td></tr>')
+    return f'<li><h4><a href="{href}">{title}</a></h4>{fields}</li>'
+
+
+def listing_page(markup: str, page: int, pages: int, jobs: int, seed: int) -> str:
+    """One synthetic listing page, with the chrome real boards wrap around results"""
+    rng = random.Random(f"{seed}-{markup}-{page}")
+    items = "".join(_job(markup, rng, page * 1000 + i) for i in range(jobs))
+    if markup == "table":
+        results = f'<table class="jobs-table"><thead><tr><th>Role</th></tr></thead><tbody>{items}</tbody></table>'
+    elif markup == "list":
+        results = f'<ul class="jobs-list">{items}</ul>'
+    elif markup == "semantic":
+        results = items
+    else:
+        results = f'<div class="results">{items}</div>'
+
+    nav = "".join(f'<a href="/{slug}">{slug.title()}</a>' for slug in ("about", "companies", "salaries", "blog", "help"))
+    filters = "".join(
+        f'<label><input type="checkbox" name="f{i}"> {escape(rng.choice(LOCATIONS))}</label>' for i in range(30)
+    )
+    pagination = "".join(f'<a href="?page={n}">{n}</a>' for n in range(1, pages + 1) if n != page)
+    script = "<script>window.__STATE__ = " + '{"k": "' + "x" * 4000 + '"};</script>'
+    return (
+        f"<!DOCTYPE html><html><head><title>Jobs - page {page}</title><style>body{{margin:0}}</style>{script}</head>"
+        f"<body><header><nav>{nav}</nav></header><aside><form>{filters}</form></aside>"
+        f"<main><h1>{jobs} jobs</h1>{results}</main><nav class=\"pagination\">{pagination}</nav>"
+        f"<footer><p>{_description(rng)}</p></footer></body></html>"
+    )
+
+
+def generate_corpus(directory: str, boards: Iterable[str], pages: int = 3, jobs: int = 25, seed: int = 7) -> Dict[str, int]:
+    """
+    Write a deterministic synthetic corpus: directory/<host>/page<N>.html
+
+    Boards cycle through MARKUPS so every detection strategy has pages it
+    should find. The same arguments always produce the same bytes, so runs
+    are comparable with a stored baseline.
+
+    Returns:
+        {host: pages written}
+    """
+    written = {}
+    for i, board in enumerate(boards):
+        host = board_host(board)
+        markup = MARKUPS[i % len(MARKUPS)]
+        os.makedirs(os.path.join(directory, host), exist_ok=True)
+        for page in range(1, pages + 1):
+            with open(os.path.join(directory, host, f"page{page}.html"), "w", encoding="utf-8") as f:
+                f.write(listing_page(markup, page, pages, jobs, seed))
+        written[host] = pages
+    return written
+
+
+def import_archive(archive_dir: str, directory: str, boards: Iterable[str], pages: int = 3) -> Dict[str, int]:
+    """
+    Build the corpus from real captures in a page archive (SCRAPER_ARCHIVE_DIR)
+
+    Takes up to pages of the newest captures per board, oldest URL first.
+    Pagination links in real pages usually point at the live board; the
+    benchmark never follows links outside the stand-in, so only pages in
+    the corpus are crawled.
+
+    Returns:
+        {host: pages written}, boards without captures omitted
+    """
+    from app.agents.jobscraper.page_archive import ArchiveReader
+
+    written = {}
+    with ArchiveReader(archive_dir) as archive:
+        for board in boards:
+            host = board_host(board)
+            captures: List = [page for page in archive.pages(hosts=[host]) if page.status == 200][:pages]
+            if not captures:
+                continue
+            os.makedirs(os.path.join(directory, host), exist_ok=True)
+            for n, page in enumerate(captures, start=1):
+                with open(os.path.join(directory, host, f"page{n}.html"), "wb") as f:
+                    f.write(page.content)
+            written[host] = len(captures)
+    return written
+
+
+def corpus_pages(directory: str, host: Optional[str] = None) -> List[str]:
+    """Paths of the corpus pages (of one host), in board then page order"""
+    hosts = [host] if host else sorted(os.listdir(directory))
+    paths = []
+    for name in hosts:
+        folder = os.path.join(directory, name)
+        if not os.path.isdir(folder):
+            continue
+        numbered = [f for f in os.listdir(folder) if f.startswith("page") and f.endswith(".html")]
+        paths.extend(os.path.join(folder, f) for f in sorted(numbered, key=lambda f: int(f[4:-5])))
+    return paths
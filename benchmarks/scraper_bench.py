@@ -0,0 +1,365 @@
+"""
+Offline benchmark of the job scraper's crawl and detection strategies
+
+Runs ProxyEnhancedJobScraper against a local stand-in of the boards in
+get_comprehensive_job_websites, so nothing touches the network or the
+proxies:
+
+- crawl: inspect_async over every board through the real fetch engine
+  (politeness limits lifted, HTTP cache empty), reported as pages/sec
+- parse: parse_html ms/page and RSS growth
+- one entry per _strategy_*: selector-eval ms/page (the strategy including
+  _analyze_job_elements), pages where it detected jobs, and RSS growth.
+  Each one is measured in its own process; RSS growth is its peak RSS
+  above the RSS once imports and the parsed corpus are loaded.
+
+Every metric is the median of --runs full runs. The result is compared
+with a baseline (benchmarks/baseline.json). Any metric worse than
+--threshold (or fewer detected pages at all) is a regression and the exit
+status is 1, which fails CI. The crawl and timings under SMALL_MS jitter
+the most, so they get wider margins. Timings depend on the machine, so
+record the baseline on the runner that enforces it:
+
+    python -m benchmarks.scraper_bench --update-baseline
+    python -m benchmarks.scraper_bench                   # exit 1 on regression
+    python -m benchmarks.scraper_bench --from-archive archive/pages
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import resource
+import tempfile
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+from .corpus import board_host, corpus_pages, generate_corpus, import_archive
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+STRATEGIES = (
+    "common_class_names", "semantic_html", "itemscope_microdata",
+    "data_attributes", "table_based", "list_based",
+)
+
+# Settings for the run, applied to the environment before app.config loads
+# (and inherited by the measuring processes)
+BENCH_SETTINGS = {
+    "SCRAPER_DOMAIN_RATE": "100000",
+    "SCRAPER_DOMAIN_BURST": "1000",
+    "SCRAPER_RATE_LIMIT": "100000",
+    "SCRAPER_PER_DOMAIN_CONCURRENCY": "16",
+    "SCRAPER_OBEY_ROBOTS": "false",
+    "SCRAPER_ARCHIVE_DIR": "",
+}
+
+# ms/page timings below this vary by tens of percent between identical runs
+SMALL_MS = 5.0
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _board_url(path: str) -> str:
+    # Same URL the stand-in serves the page under, so links resolve the same way
+    host, name = os.path.basename(os.path.dirname(path)), os.path.basename(path)
+    page = int(name[4:-5])
+    return f"http://127.0.0.1/{host}/jobs" + (f"?page={page}" if page > 1 else "")
+
+
+def _load(directory: str) -> List[Tuple[str, bytes]]:
+    pages = []
+    for path in corpus_pages(directory):
+        with open(path, "rb") as f:
+            pages.append((_board_url(path), f.read()))
+    return pages
+
+
+def _new_scraper():
+    from app.agents.jobscraper.scraper_bot import ProxyEnhancedJobScraper
+
+    # Proxies are off on purpose; per-page INFO logging would be timed too
+    logging.getLogger("app.agents.jobscraper").setLevel(logging.ERROR)
+    return ProxyEnhancedJobScraper(use_proxy=False)
+
+
+def measure_parse(directory: str, repeat: int) -> Dict[str, Any]:
+    """Best-of-repeat parse_html time per page (runs in its own process)"""
+    from app.agents.jobscraper.dom import parse_html
+
+    pages = _load(directory)
+    baseline_rss = peak_rss_mb()
+    total = 0.0
+    for _, content in pages:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            parse_html(content)
+            best = min(best, time.perf_counter() - started)
+        total += best
+    return {
+        "ms_per_page": round(total / len(pages) * 1000, 3),
+        "rss_growth_mb": round(peak_rss_mb() - baseline_rss, 1),
+    }
+
+
+def measure_strategy(directory: str, name: str, repeat: int) -> Dict[str, Any]:
+    """Best-of-repeat time of one _strategy_* per page (runs in its own process)"""
+    from app.agents.jobscraper.dom import parse_html
+
+    scraper = _new_scraper()
+    strategy = getattr(scraper, f"_strategy_{name}")
+    trees = [(url, parse_html(content)) for url, content in _load(directory)]
+    baseline_rss = peak_rss_mb()
+
+    total, detected = 0.0, 0
+    for url, tree in trees:
+        best, result = float("inf"), None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = strategy(tree, url)
+            best = min(best, time.perf_counter() - started)
+        total += best
+        detected += bool(result and result.get("total_jobs", 0) > 0)
+    scraper.close()
+    return {
+        "eval_ms_per_page": round(total / len(trees) * 1000, 3),
+        "detected_pages": detected,
+        "rss_growth_mb": round(peak_rss_mb() - baseline_rss, 1),
+    }
+
+
+def measure_crawl(directory: str, repeat: int, max_pages: int) -> Dict[str, Any]:
+    """Pages/sec of inspect_async over every board, through the stand-in"""
+    from app.agents.jobscraper.fetch import FetchResult
+    from app.agents.jobscraper.http_cache import HttpCache
+    from .standin import CorpusServer
+
+    server = CorpusServer(directory).start()
+    scraper = _new_scraper()
+
+    make_engine = scraper._make_fetch_engine
+
+    def stand_in_engine(retries=2):
+        engine = make_engine(retries=retries)
+        fetch = engine.fetch
+
+        async def guarded_fetch(url, retries=None, headers=None):
+            # Archived real pages link to the live boards; never follow those
+            if not url.startswith(server.base_url + "/"):
+                return FetchResult(url, error="Outside the benchmark corpus")
+            return await fetch(url, retries=retries, headers=headers)
+
+        engine.fetch = guarded_fetch
+        return engine
+
+    scraper._make_fetch_engine = stand_in_engine
+    boards = [server.board_url(host) for host in sorted(os.listdir(directory))]
+
+    async def crawl():
+        async with scraper._make_fetch_engine(retries=1) as engine:
+            return await asyncio.gather(*(
+                scraper.inspect_async(engine, url, allow_fallback=False, max_pages=max_pages) for url in boards
+            ))
+
+    best, pages, detected = float("inf"), 0, 0
+    try:
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as cache_dir:
+                # Empty cache: every page is fetched and analysed in full
+                scraper.http_cache = HttpCache(cache_dir, version="bench")
+                server.hits = 0
+                started = time.perf_counter()
+                results = asyncio.run(crawl())
+                elapsed = time.perf_counter() - started
+            if elapsed < best:
+                best, pages, detected = elapsed, server.hits, sum(1 for r in results if r)
+    finally:
+        scraper.close()
+        server.stop()
+    return {
+        "pages": pages,
+        "boards_detected": detected,
+        "pages_per_sec": round(pages / best, 1) if best else 0.0,
+    }
+
+
+def run(directory: str, repeat: int, max_pages: int) -> Dict[str, Any]:
+    pages = corpus_pages(directory)
+    report = {
+        "corpus": {
+            "boards": len(os.listdir(directory)),
+            "pages": len(pages),
+            "kb": round(sum(os.path.getsize(p) for p in pages) / 1024, 1),
+        },
+        "crawl": measure_crawl(directory, repeat, max_pages),
+    }
+    # A fresh process per measurement: peak RSS is not inherited from the others
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        report["parse"] = pool.submit(measure_parse, directory, repeat).result()
+    report["strategies"] = {}
+    for name in STRATEGIES:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            report["strategies"][name] = pool.submit(measure_strategy, directory, name, repeat).result()
+    return report
+
+
+def median_report(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Metric-wise median of several run() reports"""
+    first = reports[0]
+    if isinstance(first, dict):
+        return {key: median_report([report[key] for report in reports]) for key in first}
+    if isinstance(first, float):
+        return round(statistics.median(reports), 3)
+    if isinstance(first, int):
+        return int(statistics.median_low(reports))
+    return first
+
+
+def _flatten(report: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in report.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta_ms: float = 0.0,
+            crawl_threshold: float = None, min_delta_mb: float = 0.0) -> List[str]:
+    """
+    Regressions of report against baseline, as printable lines
+
+    Timings must be worse by more than threshold (a fraction) and, for
+    ms/page metrics, by more than min_delta_ms: sub-millisecond strategies
+    jitter by tens of percent between runs without anything changing.
+    Timings under SMALL_MS are allowed twice the threshold, the crawl rate
+    crawl_threshold (it shares the CPU with the stand-in server). RSS
+    growth must rise by more than min_delta_mb and the threshold.
+    """
+    crawl_threshold = threshold if crawl_threshold is None else crawl_threshold
+    current, previous = _flatten(report), _flatten(baseline)
+    regressions = []
+    for key, before in sorted(previous.items()):
+        if key.startswith("corpus.") or key not in current:
+            continue
+        after = current[key]
+        metric = key.rsplit(".", 1)[-1]
+        if metric in ("detected_pages", "boards_detected", "pages"):
+            # Functional, not timing: any loss is a regression
+            if after < before:
+                regressions.append(f"{key}: {before} -> {after}")
+            continue
+        if metric.endswith("_mb"):
+            # Growth is often ~0 MB, so judged in MB rather than as a fraction
+            if after - before > max(min_delta_mb, threshold * before):
+                regressions.append(f"{key}: {before} -> {after} (+{after - before:.1f} MB)")
+            continue
+        if not before:
+            continue
+        allowed = threshold
+        if metric.endswith("ms_per_page"):
+            if after - before <= min_delta_ms:
+                continue
+            if before < SMALL_MS:
+                allowed = 2 * threshold
+        higher_is_better = metric == "pages_per_sec"
+        if higher_is_better:
+            allowed = crawl_threshold
+        change = (before - after) / before if higher_is_better else (after - before) / before
+        if change > allowed:
+            regressions.append(f"{key}: {before} -> {after} ({change:+.0%} worse)")
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    corpus, crawl, parse = report["corpus"], report["crawl"], report["parse"]
+    print(f"Corpus: {corpus['boards']} boards, {corpus['pages']} pages, {corpus['kb']} KB")
+    print(f"Crawl:  {crawl['pages_per_sec']} pages/sec ({crawl['pages']} pages, {crawl['boards_detected']} boards detected)")
+    print(f"Parse:  {parse['ms_per_page']} ms/page, RSS +{parse['rss_growth_mb']} MB")
+    print(f"{'strategy':<22}{'eval ms/page':>14}{'detected':>10}{'RSS growth MB':>15}")
+    for name, stats in report["strategies"].items():
+        print(f"{name:<22}{stats['eval_ms_per_page']:>14}{stats['detected_pages']:>10}{stats['rss_growth_mb']:>15}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper benchmark; exits 1 on regressions")
+    parser.add_argument("--corpus", help="Existing corpus directory (default: generate one)")
+    parser.add_argument("--from-archive", help="Build the corpus from this page archive instead of generating it")
+    parser.add_argument("--pages", type=int, default=3, help="Pages per board")
+    parser.add_argument("--jobs", type=int, default=25, help="Jobs per generated page")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per page within a run (best is kept)")
+    parser.add_argument("--runs", type=int, default=3, help="Full runs; each metric is the median over them")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.3, help="Allowed slowdown, as a fraction")
+    parser.add_argument("--crawl-threshold", type=float, default=0.5, help="Allowed crawl pages/sec drop, as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=0.25, help="Ignore ms/page slowdowns smaller than this")
+    parser.add_argument("--min-delta-mb", type=float, default=5.0, help="Ignore RSS growth increases smaller than this")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", help="Also write the report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Settings are read from the environment when app.config is first
+        # imported; keep this run's caches and siteconfigs out of the tree
+        os.environ.update(BENCH_SETTINGS)
+        os.environ["SCRAPER_HTTP_CACHE_DIR"] = os.path.join(workdir, "http")
+        os.environ["SCRAPER_SITECONFIG_DIR"] = os.path.join(workdir, "siteconfigs")
+        logging.basicConfig(level=logging.WARNING)
+
+        directory = args.corpus
+        if not directory:
+            scraper = _new_scraper()
+            boards = scraper.get_comprehensive_job_websites()
+            scraper.close()
+            directory = os.path.join(workdir, "corpus")
+            if args.from_archive:
+                written = import_archive(args.from_archive, directory, boards, pages=args.pages)
+                missing = sorted({board_host(b) for b in boards} - set(written))
+                if missing:
+                    print(f"No archived pages for: {', '.join(missing)}")
+                if not written:
+                    sys.exit("The archive has no pages for any board")
+            else:
+                generate_corpus(directory, boards, pages=args.pages, jobs=args.jobs)
+
+        report = median_report([run(directory, args.repeat, max_pages=args.pages) for _ in range(max(1, args.runs))])
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("corpus") != report["corpus"]:
+        print("⚠️ Corpus differs from the baseline's; comparisons may not be meaningful")
+    regressions = compare(report, baseline, args.threshold, args.min_delta_ms, args.crawl_threshold, args.min_delta_mb)
+    if regressions:
+        print(f"❌ {len(regressions)} regressions beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+class CorpusServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the job boards, serving a corpus directory
+
+    GET /<host>/jobs?page=N answers with <corpus>/<host>/page<N>.html
+    (page 1 without ?page), anything else is a 404. hits counts the pages
+    served, so the crawl benchmark can compute pages/sec.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, directory: str, address: Tuple[str, int] = ("127.0.0.1", 0)):
+        super().__init__(address, CorpusHandler)
+        self.directory = directory
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def board_url(self, host: str) -> str:
+        return f"{self.base_url}/{host}/jobs"
+
+    def count_hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def start(self) -> "CorpusServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="corpus-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class CorpusHandler(BaseHTTPRequestHandler):
+    server: CorpusServer
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip("/").split("/")
+        page = parse_qs(parsed.query).get("page", ["1"])[0]
+        path = None
+        if len(parts) == 2 and parts[1] == "jobs" and page.isdigit() and ".." not in parts[0]:
+            path = os.path.join(self.server.directory, parts[0], f"page{int(page)}.html")
+
+        if path is None or not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count_hit()
+
+    def log_message(self, format, *args):
+        pass
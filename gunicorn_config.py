@@ -1,3 +1,14 @@
 bind = "0.0.0.0:3900"
 workers = 4
 reload = True
+
+
+def on_starting(server):
+    # With NLP_PRELOAD the spaCy model is loaded once here, in the master,
+    # and shared copy-on-write by the forked workers. Otherwise each worker
+    # loads it lazily on its first CV parse.
+    from app.config import settings
+
+    if settings.NLP_PRELOAD:
+        from app.utils.nlp import preload_models
+        preload_models()